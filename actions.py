@@ -1,26 +1,34 @@
 """
 Transcription action handlers / 轉錄動作處理模組
-Handles CoreML and CPU mode transcription / 處理 CoreML 和 CPU 模式的轉錄
+Handles CoreML and CPU mode transcription (engines in engines.py) / 處理 CoreML 和 CPU 模式的轉錄（引擎見 engines.py）
 """
+import logging
 import os
 import subprocess
-import wave
 import shutil
 import tempfile
 import signal
 import sys
+import time
 from pathlib import Path
 from config import config
 from logger import logger
+from cancellation import JobCancelled, raise_if_cancelled, watch_process
+from job_journal import BatchJournal, BATCH_CANCELLED, BATCH_COMPLETED, BATCH_FAILED
+import metrics
+import planner
+import scheduler
+from event_bus import bus, KEY_FILES_IN_FLIGHT, KEY_BATCH_ETA
 
 
-def get_unique_output_path(base_path, suffix):
+def get_unique_output_path(base_path, suffix, taken=None):
     """
     Generate unique output file path / 生成不重複的輸出檔案路徑
     
     Args:
         base_path: Base file path (without extension) / 基礎檔案路徑（不含副檔名）
         suffix: Suffix to add (e.g., 'coreml', 'cpu', 'English') / 要添加的後綴（例如 'coreml', 'cpu', '英文'）
+        taken: Set of paths already handed out but not written yet; the result is added to it (optional) / 已分配但尚未寫入的路徑集合，結果會加入其中（可選）
     
     Returns:
         str: Unique file path / 不重複的檔案路徑
@@ -41,50 +49,110 @@ def get_unique_output_path(base_path, suffix):
     # If file exists, add numeric suffix / 如果檔案已存在，添加數字後綴
     counter = 1
     original_output_path = output_path
-    while os.path.exists(output_path):
+    while os.path.exists(output_path) or (taken is not None and output_path in taken):
         base_name = os.path.basename(base_path_no_ext)
         output_path = os.path.join(output_dir, f"{base_name}_{suffix}_{counter}{ext}")
         counter += 1
     
     if counter > 1:
-        logger.info(f"檔案 {original_output_path} 已存在，使用新名稱: {output_path}")
+        logger.info(f"檔案 {original_output_path} 已存在或已分配，使用新名稱: {output_path}")
+    if taken is not None:
+        taken.add(output_path)
     
     return output_path
 
-def convert_mp4_to_wav(video_file_path, audio_file_path):
+def find_srt_file(file):
     """
-    Convert MP4 video to WAV audio file / 將 MP4 影片轉換為 WAV 音頻檔案
+    Find the transcript of an input file / 尋找輸入檔案的轉錄字幕
+    
+    Priority: _coreml.srt > _cpu.srt > _faster.srt > .srt (engine registry order); an .srt input is returned as is. / 優先順序：_coreml.srt > _cpu.srt > _faster.srt > .srt（引擎註冊順序）；輸入本身為 .srt 時直接返回。
+    
+    Args:
+        file: Audio/video or SRT file path / 音頻、影片或 SRT 檔案路徑
+    
+    Returns:
+        str: SRT file path, or None if not found / SRT 檔案路徑，找不到時返回 None
+    """
+    import engines
+
+    if file.lower().endswith('.srt'):
+        return file if os.path.exists(file) else None
+    base_name = os.path.basename(os.path.splitext(file)[0])
+    file_dir = os.path.dirname(file) if os.path.dirname(file) else '.'
+    for suffix in engines.srt_suffixes() + ('.srt',):
+        possible_srt = os.path.join(file_dir, base_name + suffix)
+        if os.path.exists(possible_srt):
+            return possible_srt
+    return None
+
+def _remove_partial_output(path, started_at):
+    """
+    Remove an output file written by an interrupted run / 移除被中斷的執行所寫入的輸出檔案
+    
+    Files older than started_at (e.g., a user's existing file) are left untouched. / 早於 started_at 的檔案（例如使用者既有檔案）不會被刪除。
     
     Args:
-        video_file_path: Path to input MP4 video file / 輸入 MP4 影片檔案路徑
+        path: Output file path / 輸出檔案路徑
+        started_at: Time the run started (time.time()) / 執行開始時間（time.time()）
+    """
+    try:
+        if path and os.path.exists(path) and os.path.getmtime(path) >= started_at - 1:
+            os.remove(path)
+            logger.info(f"已移除未完成的輸出檔案: {path}")
+    except OSError as e:
+        logger.warning(f"移除未完成的輸出檔案失敗: {e}")
+
+def convert_mp4_to_wav(video_file_path, audio_file_path, pause_flag=None):
+    """
+    Convert a video or compressed audio file to 16 kHz mono WAV with ffmpeg / 以 ffmpeg 將影片或壓縮音訊轉換為 16 kHz 單聲道 WAV
+    
+    Args:
+        video_file_path: Path to input file (mp4, m4a, mp3, flac, ...) / 輸入檔案路徑（mp4、m4a、mp3、flac 等）
         audio_file_path: Path to output WAV audio file / 輸出 WAV 音頻檔案路徑
+        pause_flag: Cancellation token, ffmpeg is killed when cancelled (optional) / 取消權杖，取消時終止 ffmpeg（可選）
     """
-    logger.info(f"開始轉換 MP4 為 WAV: {os.path.basename(video_file_path)}")
+    logger.info(f"開始轉換為 WAV: {os.path.basename(video_file_path)}")
     # Check if input file exists / 檢查輸入檔案是否存在
     if not os.path.exists(video_file_path):
         logger.error(f"影片檔案不存在: {video_file_path}")
         raise FileNotFoundError(f"影片檔案不存在: {video_file_path}")
     
-    extract_audio_cmd = ['ffmpeg', '-y', '-i', video_file_path, '-acodec', 'pcm_s16le', '-ar', '16000', audio_file_path]
+    extract_audio_cmd = ['ffmpeg', '-y', '-i', video_file_path, '-vn', '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1',
+                         audio_file_path]
     logger.debug(f"執行 ffmpeg 指令: {' '.join(extract_audio_cmd)}")
     
+    started_at = time.time()
     try:
-        result = subprocess.run(
+        process = subprocess.Popen(
             extract_audio_cmd,
-            check=True,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=600  # 10 minute timeout / 10 分鐘超時
+            start_new_session=True  # Own process group, so cancellation can kill it / 獨立進程組，取消時可以終止
         )
+        with watch_process(pause_flag, process):
+            try:
+                stdout, stderr = process.communicate(timeout=600)  # 10 minute timeout / 10 分鐘超時
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise
+        if pause_flag is not None and pause_flag.is_set():
+            _remove_partial_output(audio_file_path, started_at)
+            raise_if_cancelled(pause_flag)
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, extract_audio_cmd, output=stdout, stderr=stderr)
         # Check if output file was successfully created / 檢查輸出檔案是否成功建立
         if not os.path.exists(audio_file_path):
             logger.error(f"轉換失敗：輸出檔案不存在: {audio_file_path}")
             raise RuntimeError(f"轉換失敗：輸出檔案不存在: {audio_file_path}")
         logger.info(f"✓ 轉換完成: {os.path.basename(audio_file_path)}")
     except subprocess.TimeoutExpired:
+        _remove_partial_output(audio_file_path, started_at)
         logger.error(f"ffmpeg 轉換超時（超過 10 分鐘）: {video_file_path}")
         raise RuntimeError(f"ffmpeg 轉換超時（超過 10 分鐘）: {video_file_path}")
     except subprocess.CalledProcessError as e:
+        _remove_partial_output(audio_file_path, started_at)
         error_msg = f"ffmpeg 轉換失敗 (退出碼: {e.returncode})"
         if e.stderr:
             # ffmpeg error messages are usually in stderr / ffmpeg 的錯誤訊息通常在 stderr
@@ -102,13 +170,13 @@ def get_audio_duration(file_path):
     Returns:
         float: Duration in seconds, 0 if unable to determine / 時長（秒），無法確定時返回 0
     """
-    if file_path.endswith(".wav"):
-        with wave.open(file_path, 'r') as audio:
-            frames = audio.getnframes()
-            rate = audio.getframerate()
-            duration = frames / float(rate)
-            return duration
-    elif file_path.endswith(".mp4"):
+    import audio_decode
+
+    # PCM WAV from its header, anything else from ffmpeg / PCM WAV 讀取標頭，其他格式使用 ffmpeg
+    wav_format = audio_decode.read_wav_format(file_path)
+    if wav_format is not None:
+        return wav_format.frames / float(wav_format.rate)
+    if os.path.exists(file_path):
         command = f"ffmpeg -i \"{file_path}\" 2>&1 | grep 'Duration'"
         result = subprocess.run(command, shell=True, capture_output=True, text=True)
         duration_str = result.stdout.split(",")[0].split("Duration:")[1].strip()
@@ -117,7 +185,8 @@ def get_audio_duration(file_path):
         return duration
     return 0
 
-def coreml_whisper(files, language, update_progress, pause_flag, update_status=None):
+def coreml_whisper(files, language, update_progress, pause_flag, update_status=None, journal=None, policy=None,
+                   profile=None):
     """
     Execute CoreML Whisper transcription / 執行 CoreML Whisper 轉錄
     
@@ -125,72 +194,27 @@ def coreml_whisper(files, language, update_progress, pause_flag, update_status=N
         files: List of files / 檔案列表
         language: Language code / 語言代碼
         update_progress: Progress update callback / 進度更新回調
-        pause_flag: Pause flag / 暫停標誌
+        pause_flag: Cancellation token (CancelToken or threading.Event) / 取消權杖（CancelToken 或 threading.Event）
         update_status: Status update callback (optional) / 狀態更新回調（可選）
-    """
-    logger.info(f"開始 CoreML Whisper 轉錄，共 {len(files)} 個檔案，語言: {language}")
-    total_duration = sum(get_audio_duration(file) for file in files)
-    logger.info(f"總音頻時長: {total_duration:.2f} 秒")
-    
-    # Initial progress / 初始進度
-    update_progress(0)
-    if update_status:
-        update_status(f"開始轉錄 {len(files)} 個檔案...", "INFO")
+        journal: Batch journal to record into / resume from (optional, created if None) / 要寫入或恢復的批次日誌（可選，None 時自動建立）
+        policy: Scheduling policy (default: SCHEDULE_POLICY) / 排程策略（預設為 SCHEDULE_POLICY）
+        profile: Speed profile (default: SPEED_PROFILE) / 速度設定檔（預設為 SPEED_PROFILE）
     
-    for i, file in enumerate(files):
-        if pause_flag.is_set():
-            logger.warning("任務已暫停")
-            if update_status:
-                update_status("任務已暫停", "WARNING")
-            break
-        
-        # Calculate progress range for current file / 計算當前檔案的進度範圍
-        file_start_progress = (i / len(files)) * 100
-        file_end_progress = ((i + 1) / len(files)) * 100
-        
-        logger.info(f"[{i+1}/{len(files)}] 處理檔案: {os.path.basename(file)}")
-        if update_status:
-            update_status(f"處理檔案 [{i+1}/{len(files)}]: {os.path.basename(file)}", "INFO")
-        update_progress(file_start_progress + 5)  # Start processing, show 5% progress / 開始處理，顯示 5% 進度
-        
-        if file.endswith(".mp4"):
-            audio_file_path = f"{os.path.splitext(file)[0]}.wav"
-            convert_mp4_to_wav(file, audio_file_path)
-            file = audio_file_path
-            update_progress(file_start_progress + 5)  # Conversion complete, show 5% progress / 轉換完成，顯示 5% 進度
-        
-        # Generate unique output file path (with coreml suffix) / 生成不重複的輸出檔案路徑（使用 coreml 後綴）
-        base_path = os.path.splitext(file)[0]
-        output_srt_path = get_unique_output_path(base_path, 'coreml')
-        
-        # 計算轉錄的進度範圍（從 10% 到 95%，保留 5% 給完成）
-        transcription_start = file_start_progress + 10
-        transcription_end = file_end_progress - 5
-        
-        # 傳遞進度回調和範圍給轉錄函數
-        if update_status:
-            update_status(f"正在轉錄 [{i+1}/{len(files)}]...", "INFO")
-        generate_srt_with_coreml_whisper(
-            file, 
-            output_srt_path, 
-            language,
-            update_progress=update_progress,
-            progress_range=(transcription_start, transcription_end)
-        )
-        
-        # 檔案處理完成，更新到該檔案的結束進度
-        update_progress(file_end_progress)
-        logger.info(f"✓ [{i+1}/{len(files)}] 完成: {os.path.basename(output_srt_path)}")
-        if update_status:
-            update_status(f"✓ 完成 [{i+1}/{len(files)}]: {os.path.basename(output_srt_path)}", "INFO")
+    Returns:
+        dict: Batch summary, see _run_batch() (failed files are listed, not raised) / 批次摘要，見 _run_batch()（失敗的檔案會列出，不會拋出）
     
-    # 確保進度條顯示 100%
-    update_progress(100)
+    Raises:
+        JobCancelled: If cancelled, files finished before cancellation are kept / 被取消時拋出，取消前已完成的檔案會保留
+    """
+    logger.info(f"開始 CoreML Whisper 轉錄，共 {len(files)} 個檔案，語言: {language}")
+    params = {'language': language, 'policy': policy or config.SCHEDULE_POLICY,
+              'profile': profile or config.SPEED_PROFILE}
+    summary = _run_batch('coreml', files, params, update_progress, pause_flag, update_status, journal)
     logger.info("CoreML Whisper 轉錄全部完成")
-    if update_status:
-        update_status(f"✓ 全部完成，共處理 {len(files)} 個檔案", "INFO")
+    return summary
 
-def cpu_whisper(files, language, translate_to, update_progress, pause_flag, update_status=None):
+def cpu_whisper(files, language, translate_to, update_progress, pause_flag, update_status=None, journal=None, policy=None,
+                engine=None, profile=None):
     """
     Execute CPU Whisper transcription / 執行 CPU Whisper 轉錄
     
@@ -199,60 +223,548 @@ def cpu_whisper(files, language, translate_to, update_progress, pause_flag, upda
         language: Language code / 語言代碼
         translate_to: Target language for translation (unused, kept for backward compatibility) / 翻譯目標語言（未使用，保留向後兼容）
         update_progress: Progress update callback / 進度更新回調
-        pause_flag: Pause flag / 暫停標誌
+        pause_flag: Cancellation token (CancelToken or threading.Event) / 取消權杖（CancelToken 或 threading.Event）
+        update_status: Status update callback (optional) / 狀態更新回調（可選）
+        journal: Batch journal to record into / resume from (optional, created if None) / 要寫入或恢復的批次日誌（可選，None 時自動建立）
+        policy: Scheduling policy (default: SCHEDULE_POLICY) / 排程策略（預設為 SCHEDULE_POLICY）
+        engine: CPU engine name, 'cpu' or 'faster' (default: CPU_ENGINE) / CPU 引擎名稱，'cpu' 或 'faster'（預設為 CPU_ENGINE）
+        profile: Speed profile (default: SPEED_PROFILE) / 速度設定檔（預設為 SPEED_PROFILE）
+    
+    Returns:
+        dict: Batch summary, see _run_batch() (failed files are listed, not raised) / 批次摘要，見 _run_batch()（失敗的檔案會列出，不會拋出）
+    
+    Raises:
+        JobCancelled: If cancelled, files finished before cancellation are kept / 被取消時拋出，取消前已完成的檔案會保留
+    """
+    import engines
+
+    mode = engine or config.CPU_ENGINE
+    logger.info(f"開始 CPU Whisper 轉錄（{engines.get_engine(mode).description}），共 {len(files)} 個檔案，語言: {language}")
+    params = {'language': language, 'policy': policy or config.SCHEDULE_POLICY,
+              'profile': profile or config.SPEED_PROFILE}
+    summary = _run_batch(mode, files, params, update_progress, pause_flag, update_status, journal)
+    logger.info("CPU Whisper 轉錄全部完成")
+    return summary
+
+def resume_batch(journal, update_progress, pause_flag, update_status=None):
+    """
+    Resume an interrupted transcription batch from its journal / 從批次日誌恢復被中斷的轉錄批次
+    
+    Finished files are skipped, in-flight files are processed again. The journal is locked and / 已完成的檔案會略過，處理中的檔案會重新處理。
+    reloaded first: the batch may have been finished or resumed by another job since it was listed. / 會先鎖定並重新載入日誌：列出之後批次可能已被其他工作完成或恢復。
+    
+    Args:
+        journal: BatchJournal of the interrupted batch / 被中斷批次的 BatchJournal
+        update_progress: Progress update callback / 進度更新回調
+        pause_flag: Cancellation token / 取消權杖
+        update_status: Status update callback (optional) / 狀態更新回調（可選）
+    
+    Returns:
+        dict: Batch summary (see _run_batch), None if nothing was left to resume / 批次摘要（見 _run_batch），沒有需要恢復的檔案時為 None
+    
+    Raises:
+        RuntimeError: If another job is running the batch / 批次正由其他工作執行時
+    """
+    import engines
+
+    if journal.action not in engines.engine_names():
+        raise ValueError(f"無法恢復的批次類型: {journal.action}")
+    batch_id = journal.batch_id
+    journal = BatchJournal.claim(journal.path)
+    if journal is None:
+        raise RuntimeError(f"批次 {batch_id} 正由其他工作執行中")
+    try:
+        if journal.is_complete or not journal.remaining_files():
+            logger.info(f"批次 {batch_id} 已完成，不需要恢復")
+            return None
+        files = journal.start_resume()
+        logger.info(f"恢復批次 {journal.batch_id}（{journal.action}），剩餘 {len(files)} 個檔案")
+        return _run_batch(journal.action, files, journal.params, update_progress, pause_flag, update_status, journal)
+    finally:
+        journal.release()
+
+def _transcribe_file(mode, file, output_srt_path, params, update_progress, progress_range, pause_flag, timeout=None,
+                     reservation=None):
+    """
+    Transcribe one audio file with the engine of the given mode / 使用指定模式的引擎轉錄單一音頻檔案
+    """
+    import engines
+
+    engines.get_engine(mode).transcribe_to_srt(
+        file,
+        output_srt_path,
+        params['language'],
+        pause_flag=pause_flag,
+        timeout=timeout,
+        reservation=reservation,
+        update_progress=update_progress,
+        progress_range=progress_range,
+        profile=params.get('profile')
+    )
+
+def _batch_group(engine, files, index, durations, journal):
+    """
+    The file at index plus the following files decoded together with it / index 處的檔案加上與其一起解碼的後續檔案
+
+    Short files are grouped until their 30-second windows fill one engine batch; a file that fills / 短檔案會被合併，直到其 30 秒視窗填滿一個引擎批次；
+    a batch on its own is batched by the engine across its own windows. / 自身就能填滿批次的檔案由引擎在其視窗之間批次處理。
+    """
+    import engines
+
+    group = [files[index]]
+    if engine.batch_size <= 1:
+        return group
+    windows = engines.window_count(durations[files[index]])
+    for file in files[index + 1:]:
+        if windows >= engine.batch_size:
+            break
+        if (journal and journal.is_done(file)) or not durations.get(file):
+            continue
+        group.append(file)
+        windows += engines.window_count(durations[file])
+    return group
+
+def _decode_input(engine, file, duration, labels, pause_flag):
+    """
+    Engine-ready audio for an input file, by the cheapest route / 以最便宜的路徑取得輸入檔案的引擎可用音訊
+
+    16 kHz mono WAV (or any file, for engines that decode input themselves) is used as is, other PCM / 16 kHz 單聲道 WAV（或自行解碼輸入的引擎收到的任何檔案）
+    WAV is resampled in process, and compressed formats go through ffmpeg. Decoded audio is kept in / 直接使用，其他 PCM WAV 在進程內重新取樣，壓縮格式交給 ffmpeg。
+    the scratch space and reused by later runs on the same file. / 解碼後的音訊保存在暫存空間，之後對同一檔案的執行會重用。
+
+    Returns:
+        tuple: (audio path, scratch.ScratchEntry to release afterwards or None) / （音訊路徑, 之後要釋放的 scratch.ScratchEntry 或 None）
+    """
+    import audio_decode
+    import scratch
+
+    route, wav_format = audio_decode.choose_route(file, engine.decodes_input)
+    if route == audio_decode.ROUTE_PASSTHROUGH:
+        logger.debug(f"直接送入引擎，不轉換: {os.path.basename(file)}")
+        return file, None
+
+    def produce(audio_path):
+        if route == audio_decode.ROUTE_RESAMPLE:
+            audio_decode.resample_wav(file, audio_path, wav_format, pause_flag)
+        else:
+            convert_mp4_to_wav(file, audio_path, pause_flag)
+
+    with metrics.stage(metrics.STAGE_DECODE, file=file, audio_seconds=duration, bytes_in=metrics.file_size(file),
+                       **labels) as record:
+        entry = scratch.get_scratch().acquire(file, produce)
+        record.extra['route'] = route
+        record.extra['scratch'] = 'hit' if entry.reused else 'miss'
+        record.bytes_out = metrics.file_size(entry.path)
+    return entry.path, entry
+
+def _trim_silence(file, audio_path, duration, params, labels, pause_flag):
+    """
+    Speech-only copy of audio_path when silence trimming is enabled / 啟用靜音裁切時產生 audio_path 的純語音副本
+
+    Returns:
+        vad.TrimmedAudio: Trimmed audio, or None (disabled, or too little to skip) / 裁切後的音訊，或 None（未啟用或可略過的部分太少）
+    """
+    import scratch
+    import vad
+
+    enabled = params.get('vad')
+    if not (config.VAD_ENABLED if enabled is None else enabled):
+        return None
+    with metrics.stage(metrics.STAGE_VAD, file=file, audio_seconds=duration, bytes_in=metrics.file_size(audio_path),
+                       **labels) as record:
+        trimmed = vad.trim_silence(audio_path, scratch.get_scratch().ensure_directory(), duration, pause_flag)
+        record.extra['skipped_s'] = round(trimmed.skipped_seconds, 1) if trimmed else 0.0
+        if trimmed:
+            record.bytes_out = metrics.file_size(trimmed.path)
+    return trimmed
+
+def _report_plan(plan, refined=False):
+    """
+    Log the batch prediction and publish the remaining time / 記錄批次預估並發布剩餘時間
+    """
+    remaining = plan.remaining_seconds()
+    finish = time.strftime('%H:%M', time.localtime(plan.eta()))
+    if refined:
+        logger.info(f"剩餘預估: {planner.format_duration(remaining)}（修正係數 {plan.correction():.2f}），預計完成: {finish}")
+    else:
+        for estimate in plan.estimates:
+            logger.debug(f"預估 {os.path.basename(estimate.file)}: {planner.format_duration(estimate.predicted_seconds)}"
+                         f"（超時 {planner.format_duration(estimate.timeout)}）")
+        logger.info(f"預估處理時間: {planner.format_duration(remaining)}，預計完成: {finish}")
+    bus.set(KEY_BATCH_ETA, plan.eta())
+
+def _report_policies(policy, files, durations, plan, priorities):
+    """
+    Log the simulated first-result time and mean latency of every policy / 記錄每個排程策略模擬的首個結果時間與平均延遲
+    """
+    if len(files) < 2:
+        return
+    predicted = {estimate.file: estimate.predicted_seconds for estimate in plan.estimates}
+    comparison = scheduler.compare_policies(files, durations, predicted, priorities)
+    logger.info(f"排程策略: {policy}（預估 首個結果/平均延遲）: " + " · ".join(
+        f"{name} {planner.format_duration(result['first_result_s'])}/{planner.format_duration(result['mean_latency_s'])}"
+        for name, result in comparison.items()
+    ))
+
+def _metric_labels(mode, params, journal):
+    """
+    Labels attached to every metric record of a batch / 批次中每筆指標記錄附帶的標籤
+    """
+    import engines
+    import profiles
+
+    model = engines.get_engine(mode).model_label()
+    profile = params.get('profile') or config.SPEED_PROFILE
+    if profile != profiles.PROFILE_BALANCED:
+        # Profiles decode at different speeds, keep their real-time factors apart / 不同設定檔的解碼速度不同，分開記錄即時率
+        model = f"{model}+{profile}"
+    return {
+        'engine': mode,
+        'model': model,
+        'language': params.get('language'),
+        'profile': profile,
+        'batch_id': journal.batch_id if journal else None,
+    }
+
+def _error_summary(error):
+    """
+    First line of an error message / 錯誤訊息的第一行
+    """
+    text = str(error).strip()
+    return text.splitlines()[0] if text else type(error).__name__
+
+def _is_retryable(error):
+    """
+    Check if trying a failed file again could help / 檢查重試失敗的檔案是否可能成功
+    """
+    return not isinstance(error, FileNotFoundError)
+
+def _report_file_failure(file, error, index, total, journal, update_status):
+    """
+    Log and journal a failed file; the batch goes on with the next one / 記錄失敗的檔案（日誌與批次日誌），批次繼續處理下一個
+    """
+    logger.error(f"✗ [{index+1}/{total}] 失敗: {os.path.basename(file)}: {_error_summary(error)}")
+    logger.debug(f"失敗詳情: {os.path.basename(file)}", exc_info=error)
+    if journal:
+        journal.mark_failed(file, error)
+    if update_status:
+        update_status(f"✗ 失敗 [{index+1}/{total}]: {os.path.basename(file)}", "ERROR")
+
+def _report_failures(failed, succeeded, update_status):
+    """
+    Final summary of the files a batch could not transcribe / 批次無法轉錄的檔案的最終摘要
+    """
+    logger.warning(f"批次結束: 完成 {succeeded} 個，失敗 {len(failed)} 個檔案")
+    for file, error in failed.items():
+        logger.warning(f"  ✗ {os.path.basename(file)}: {_error_summary(error)}")
+    if update_status:
+        update_status(f"完成 {succeeded} 個，失敗 {len(failed)} 個檔案（詳見日誌）", "WARNING")
+
+def _run_fallback(mode, fallback, files, params, update_progress, pause_flag, update_status):
+    """
+    Re-run files that failed on one engine on another engine / 以另一個引擎重新處理在某個引擎上失敗的檔案
+
+    Returns:
+        dict: file -> SRT of the files the fallback engine finished / file -> 備用引擎完成的檔案的 SRT
+    """
+    import engines
+
+    try:
+        reason = engines.get_engine(fallback).unavailable_reason()
+    except ValueError as e:
+        reason = str(e)
+    if reason:
+        logger.warning(f"備用引擎 {fallback} 無法使用，不重新處理: {reason}")
+        return {}
+    logger.warning(f"{len(files)} 個檔案在 {mode} 引擎上失敗，改用 {fallback} 引擎重新處理")
+    if update_status:
+        update_status(f"改用 {fallback} 引擎重新處理 {len(files)} 個失敗的檔案", "WARNING")
+    # No further fallback from the fallback engine; the parent journal records the results, so the / 備用引擎不再轉交其他引擎；結果由上層批次日誌記錄，
+    # fallback run must not create a journal of its own (it would show up as a separate resumable batch) / 備用執行不可建立自己的日誌（否則會成為另一個可恢復的批次）
+    summary = _run_batch(fallback, files, dict(params, fallback=''), update_progress, pause_flag, update_status, False)
+    return summary['outputs']
+
+def _run_batch(mode, files, params, update_progress, pause_flag, update_status, journal):
+    """
+    Run a transcription batch, recording every file transition in the journal / 執行轉錄批次，並在日誌中記錄每個檔案的狀態轉換
+    
+    A failing file does not stop the batch: it is recorded and the next file starts. Failed files are / 失敗的檔案不會停止批次：記錄後繼續下一個檔案。
+    retried up to BATCH_RETRIES times with a doubling pause (BATCH_RETRY_BACKOFF), then run on / 失敗的檔案最多重試 BATCH_RETRIES 次，間隔逐次加倍（BATCH_RETRY_BACKOFF），
+    BATCH_FALLBACK_ENGINE when one is set. Only cancellation and batch-level errors raise. / 之後若有設定 BATCH_FALLBACK_ENGINE 則改用該引擎。只有取消與批次層級的錯誤會拋出。
+    
+    Args:
+        mode: Engine name ('coreml', 'cpu' or 'faster') / 引擎名稱（'coreml'、'cpu' 或 'faster'）
+        files: Files to process / 要處理的檔案
+        params: Batch parameters (language, ...) / 批次參數
+        update_progress: Progress update callback / 進度更新回調
+        pause_flag: Cancellation token / 取消權杖
         update_status: Status update callback (optional) / 狀態更新回調（可選）
+        journal: BatchJournal, None (create one when JOURNAL_ENABLED) or False (no journal) / BatchJournal、None（JOURNAL_ENABLED 時建立）或 False（不使用日誌）
+    
+    Returns:
+        dict: Scheduling policy, files processed, time-to-first-result, mean completion latency, / 排程策略、處理的檔案數、首個結果時間、平均完成延遲、
+            failed count, failures (file -> error) and outputs (file -> SRT) / 失敗數、failures（file -> 錯誤）與 outputs（file -> SRT）
     """
-    logger.info(f"開始 CPU Whisper 轉錄，共 {len(files)} 個檔案，語言: {language}")
-    total_duration = sum(get_audio_duration(file) for file in files)
+    import engines
+    from memory_governor import get_governor
+
+    engine = engines.get_engine(mode)
+    reason = engine.unavailable_reason()
+    if reason:
+        raise RuntimeError(reason)
+    if journal is None and config.JOURNAL_ENABLED:
+        journal = BatchJournal.create(mode, files, params)
+    
+    labels = _metric_labels(mode, params, journal)
+    durations = {}
+    failed = {}  # file -> exception of files without an output so far / file -> 目前仍沒有輸出的檔案的例外
+    for i, file in enumerate(files):
+        try:
+            with metrics.stage(metrics.STAGE_PROBE, file=file, bytes_in=metrics.file_size(file), **labels) as record:
+                durations[file] = get_audio_duration(file)
+                record.audio_seconds = durations[file]
+        except Exception as e:
+            # An unreadable file must not stop the others / 無法讀取的檔案不應讓其他檔案停止
+            failed[file] = e
+            _report_file_failure(file, e, i, len(files), journal, update_status)
+    all_files = files
+    files = [file for file in files if file not in failed]
+    total_duration = sum(durations.values())
     logger.info(f"總音頻時長: {total_duration:.2f} 秒")
     
-    # 初始進度
+    # Order files once durations are known / 得知長度後決定處理順序
+    policy = params.get('policy') or config.SCHEDULE_POLICY
+    priorities = scheduler.parse_priorities(params.get('priorities') or config.SCHEDULE_PRIORITIES)
+    pending = [file for file in files if not (journal and journal.is_done(file))]
+    pending_set = set(pending)
+    files = scheduler.order_files(files, policy, durations, priorities)
+    
+    # Predict from real-time factor history, refined as files complete / 依即時率歷史預估，隨檔案完成而修正
+    history = planner.get_history()
+    plan = history.plan_batch(mode, labels['model'], params.get('language'),
+                              {file: durations[file] for file in files if file in pending_set})
+    _report_plan(plan)
+    _report_policies(policy, pending, durations, plan, priorities)
+    
+    # Initial progress / 初始進度
     update_progress(0)
     if update_status:
         update_status(f"開始轉錄 {len(files)} 個檔案...", "INFO")
     
-    for i, file in enumerate(files):
-        if pause_flag.is_set():
-            logger.warning("任務已暫停")
+    # Engine runs of concurrent batches share one memory budget / 同時執行的批次共用同一個記憶體預算
+    governor = get_governor()
+    model_ref = engine.model_ref()
+    
+    current_file = None
+    batch_started = time.monotonic()
+    completion_times = []
+    batched = {}  # Segments of files transcribed together with an earlier file / 與較早檔案一起轉錄的檔案段落
+    skipped_seconds = 0.0  # Non-speech audio not sent to the engine / 未送入引擎的非語音音訊
+    decoded = None  # Scratch entry of the current file, released once it is done / 當前檔案的暫存項目，完成後釋放
+    outputs = {}  # file -> SRT written / file -> 寫出的 SRT
+    retries = max(0, config.BATCH_RETRIES if params.get('retries') is None else params['retries'])
+    try:
+        queue, attempt = files, 0
+        while True:
+            failures = {}  # Files that failed in this pass / 本輪失敗的檔案
+            for i, file in enumerate(queue):
+                current_file = file
+                if pause_flag.is_set():
+                    logger.warning("任務已暫停")
+                    if update_status:
+                        update_status("任務已暫停", "WARNING")
+                    raise_if_cancelled(pause_flag)
+            
+                # Skip files already finished in a previous run / 略過先前執行中已完成的檔案
+                if journal and journal.is_done(file):
+                    logger.info(f"[{i+1}/{len(queue)}] 已完成，略過: {os.path.basename(file)}")
+                    continue
+            
+                # Calculate progress range for current file / 計算當前檔案的進度範圍
+                file_start_progress = (i / len(queue)) * 100
+                file_end_progress = ((i + 1) / len(queue)) * 100
+            
+                logger.info(f"[{i+1}/{len(queue)}] 處理檔案: {os.path.basename(file)}")
+                if update_status:
+                    update_status(f"處理檔案 [{i+1}/{len(queue)}]: {os.path.basename(file)}", "INFO")
+                update_progress(file_start_progress + 5)  # Start processing, show 5% progress / 開始處理，顯示 5% 進度
+            
+                output_srt_path = None
+                file_started = time.time()
+                try:
+                    with bus.track(KEY_FILES_IN_FLIGHT):
+                        audio_file_path = file
+                        if file not in batched:
+                            audio_file_path, decoded = _decode_input(engine, file, durations[file], labels, pause_flag)
+                            if audio_file_path != file:
+                                update_progress(file_start_progress + 10)  # Conversion complete, show 10% progress / 轉換完成，顯示 10% 進度
+            
+                        # Generate unique output file path (with mode suffix) / 生成不重複的輸出檔案路徑（使用模式後綴）
+                        base_path = os.path.splitext(file)[0]
+                        output_srt_path = get_unique_output_path(base_path, engine.suffix)
+                        if journal:
+                            journal.mark_running(file, output_srt_path)
+            
+                        # 計算轉錄的進度範圍（從 10% 到 95%，保留 5% 給完成）
+                        transcription_start = file_start_progress + 10
+                        transcription_end = file_end_progress - 5
+            
+                        if update_status:
+                            update_status(f"正在轉錄 [{i+1}/{len(queue)}]...", "INFO")
+                        group = [file] if file in batched else _batch_group(engine, queue, i, durations, journal)
+                        if file in batched:
+                            # Decoded in the batch of an earlier file / 已在較早檔案的批次中解碼
+                            engines.write_srt(batched.pop(file), output_srt_path)
+                        elif len(group) > 1:
+                            # Decode several queued files in shared forward passes / 以共用的前向運算解碼多個排隊中的檔案
+                            group_seconds = sum(durations[member] for member in group)
+                            group_end = ((i + len(group)) / len(queue)) * 100 - 5
+                            trims = []
+                            try:
+                                for member in group:
+                                    trims.append(_trim_silence(member, member, durations[member], params, labels, pause_flag))
+                                    skipped_seconds += trims[-1].skipped_seconds if trims[-1] else 0.0
+                                with governor.reserve(mode, model_ref, group_seconds, pause_flag,
+                                                      label=f"{os.path.basename(file)} +{len(group) - 1}") as reservation, \
+                                        metrics.stage(metrics.STAGE_ENGINE, file=file, audio_seconds=group_seconds,
+                                                      bytes_in=sum(metrics.file_size(member) or 0 for member in group),
+                                                      **labels) as record:
+                                    results = engine.transcribe_many(
+                                        [trim.path if trim else member for member, trim in zip(group, trims)],
+                                        params['language'], pause_flag=pause_flag,
+                                        timeout=sum(plan.get(member).timeout for member in group),
+                                        reservation=reservation, update_progress=update_progress,
+                                        progress_range=(transcription_start, group_end), profile=params.get('profile'))
+                                    record.extra['batch_files'] = len(group)
+                                    record.extra['batch_size'] = engine.batch_size
+                                for segments, trim in zip(results, trims):
+                                    if trim:
+                                        trim.time_map.remap_segments(segments)
+                            finally:
+                                for trim in filter(None, trims):
+                                    trim.cleanup()
+                            logger.info(f"批次解碼 {len(group)} 個檔案（{group_seconds:.0f} 秒音訊）: "
+                                        f"每秒 {group_seconds / max(record.wall_seconds, 1e-6):.1f} 音訊秒")
+                            engines.write_srt(results[0], output_srt_path)
+                            batched.update(zip(group[1:], results[1:]))
+                            # Share the wall time by audio length / 依音訊長度分攤耗時
+                            for member in group:
+                                plan.complete(member, record.wall_seconds * durations[member] / group_seconds)
+                        else:
+                            # Send only the speech spans when trimming is enabled / 啟用裁切時只送出語音區段
+                            trimmed = _trim_silence(file, audio_file_path, durations[file], params, labels, pause_flag)
+                            try:
+                                # Wait for memory before loading another model / 載入另一個模型前先等待記憶體
+                                with governor.reserve(mode, model_ref, durations[file], pause_flag,
+                                                      label=os.path.basename(file)) as reservation, \
+                                        metrics.stage(metrics.STAGE_ENGINE, file=file, audio_seconds=durations[file],
+                                                      bytes_in=metrics.file_size(audio_file_path), **labels) as record:
+                                    _transcribe_file(mode, trimmed.path if trimmed else audio_file_path, output_srt_path, params,
+                                                     update_progress, (transcription_start, transcription_end), pause_flag,
+                                                     timeout=plan.get(file).timeout, reservation=reservation)
+                                    record.bytes_out = metrics.file_size(output_srt_path)
+                                    if reservation.peak_rss:
+                                        record.extra['peak_rss_mb'] = round(reservation.peak_rss / 1024 / 1024)
+                                    if trimmed:
+                                        record.extra['speech_s'] = round(trimmed.time_map.speech_seconds, 1)
+                                if trimmed:
+                                    # Back to the original timeline / 對應回原始時間軸
+                                    trimmed.remap_srt(output_srt_path)
+                                    skipped_seconds += trimmed.skipped_seconds
+                            finally:
+                                if trimmed:
+                                    trimmed.cleanup()
+                            plan.complete(file, record.wall_seconds)
+                        # Commit the finished output (journal fsync) / 提交完成的輸出（日誌 fsync）
+                        with metrics.stage(metrics.STAGE_WRITE, file=file, audio_seconds=durations[file], **labels) as record:
+                            record.bytes_out = metrics.file_size(output_srt_path)
+                            if journal:
+                                journal.mark_done(file, output_srt_path)
+                        if decoded:
+                            decoded.release()
+                            decoded = None
+                except JobCancelled:
+                    raise
+                except Exception as e:
+                    raise_if_cancelled(pause_flag)  # Errors caused by cancelling / 取消所造成的錯誤
+                    # Record the failure and go on with the next file / 記錄失敗並繼續處理下一個檔案
+                    failures[file] = failed[file] = e
+                    _report_file_failure(file, e, i, len(queue), journal, update_status)
+                    _remove_partial_output(output_srt_path, file_started)
+                    if decoded:
+                        decoded.release()
+                        decoded = None
+                    update_progress(((i + 1) / len(queue)) * 100)
+                    continue
+                failed.pop(file, None)
+                outputs[file] = output_srt_path
+            
+                # 檔案處理完成，更新到該檔案的結束進度
+                update_progress(file_end_progress)
+                completion_times.append(time.monotonic() - batch_started)
+                logger.info(f"✓ [{i+1}/{len(queue)}] 完成: {os.path.basename(output_srt_path)}")
+                _report_plan(plan, refined=True)
+                if update_status:
+                    update_status(f"✓ 完成 [{i+1}/{len(queue)}]: {os.path.basename(output_srt_path)}", "INFO")
+
+            # Retry failed files after a growing pause / 等待逐次加長的時間後重試失敗的檔案
+            retry = [file for file in queue if file in failures and _is_retryable(failures[file])]
+            if not retry or attempt >= retries:
+                break
+            attempt += 1
+            delay = config.BATCH_RETRY_BACKOFF * 2 ** (attempt - 1)
+            logger.warning(f"{len(retry)} 個檔案失敗，{delay:.0f} 秒後重試（第 {attempt}/{retries} 次）")
             if update_status:
-                update_status("任務已暫停", "WARNING")
-            break
-        
-        # 計算當前檔案的進度範圍
-        file_start_progress = (i / len(files)) * 100
-        file_end_progress = ((i + 1) / len(files)) * 100
-        
-        logger.info(f"[{i+1}/{len(files)}] 處理檔案: {os.path.basename(file)}")
-        if update_status:
-            update_status(f"處理檔案 [{i+1}/{len(files)}]: {os.path.basename(file)}", "INFO")
-        update_progress(file_start_progress + 5)  # 開始處理，顯示 5% 進度
-        
-        if file.endswith(".mp4"):
-            audio_file_path = f"{os.path.splitext(file)[0]}.wav"
-            convert_mp4_to_wav(file, audio_file_path)
-            file = audio_file_path
-            update_progress(file_start_progress + 10)  # 轉換完成，顯示 10% 進度
-        
-        # 生成不重複的輸出檔案路徑（使用 cpu 後綴）
-        base_path = os.path.splitext(file)[0]
-        output_srt_path = get_unique_output_path(base_path, 'cpu')
-        update_progress(file_start_progress + 15)  # 開始轉錄，顯示 15% 進度
-        if update_status:
-            update_status(f"正在轉錄 [{i+1}/{len(files)}]...", "INFO")
-        
-        generate_srt_with_cpu_whisper(file, output_srt_path, language)
-        
-        # 檔案處理完成，更新到該檔案的結束進度
-        update_progress(file_end_progress)
-        logger.info(f"✓ [{i+1}/{len(files)}] 完成: {os.path.basename(output_srt_path)}")
-        if update_status:
-            update_status(f"✓ 完成 [{i+1}/{len(files)}]: {os.path.basename(output_srt_path)}", "INFO")
+                update_status(f"{len(retry)} 個檔案失敗，{delay:.0f} 秒後重試（第 {attempt}/{retries} 次）", "WARNING")
+            if pause_flag.wait(delay):
+                raise_if_cancelled(pause_flag)
+            queue = retry
+
+        # Re-run what is still failing on the fallback engine / 以備用引擎重新處理仍然失敗的檔案
+        fallback = config.BATCH_FALLBACK_ENGINE if params.get('fallback') is None else params['fallback']
+        if failed and fallback and fallback != mode:
+            for file, output in _run_fallback(mode, fallback, [file for file in all_files if file in failed], params,
+                                              update_progress, pause_flag, update_status).items():
+                failed.pop(file)
+                outputs[file] = output
+                completion_times.append(time.monotonic() - batch_started)
+                if journal:
+                    journal.mark_done(file, output)
+    except JobCancelled:
+        # In-flight file stays 'running' and is queued again on resume / 處理中的檔案保持 'running'，恢復時會重新排入
+        if journal:
+            journal.finish(BATCH_CANCELLED)
+        raise
+    except Exception as e:
+        if journal:
+            if current_file is not None:
+                journal.mark_failed(current_file, e)
+            journal.finish(BATCH_FAILED)
+        raise
+    finally:
+        bus.set(KEY_BATCH_ETA, None)
+        if decoded:
+            decoded.release()
+    
+    if journal:
+        journal.finish(BATCH_FAILED if failed else BATCH_COMPLETED)
+    
+    summary = dict(scheduler.latency_summary(completion_times), policy=policy, files=len(completion_times),
+                   failed=len(failed), failures={file: str(e) for file, e in failed.items()}, outputs=outputs)
+    if skipped_seconds:
+        logger.info(f"靜音裁切: 共略過 {skipped_seconds:.1f} 秒非語音（{skipped_seconds / max(total_duration, 1e-6):.0%}）")
+    if completion_times:
+        logger.info(f"排程 {policy}: 首個結果 {planner.format_duration(summary['first_result_s'])}，"
+                    f"平均完成延遲 {planner.format_duration(summary['mean_latency_s'])}")
+    
+    if failed:
+        _report_failures(failed, len(outputs), update_status)
     
     # 確保進度條顯示 100%
     update_progress(100)
-    logger.info("CPU Whisper 轉錄全部完成")
-    if update_status:
+    if update_status and not failed:
         update_status(f"✓ 全部完成，共處理 {len(files)} 個檔案", "INFO")
+    return summary
 
 def _sanitize_path_for_whisper(file_path):
     """
@@ -269,10 +781,10 @@ def _sanitize_path_for_whisper(file_path):
         # 路徑包含非 ASCII 字元，需要處理
         logger.warning(f"檔案路徑包含特殊字元，使用臨時檔案: {os.path.basename(file_path)}")
         
-        # 建立臨時檔案
-        temp_dir = tempfile.gettempdir()
+        # 建立臨時檔案（名稱不重複，同時執行的批次不會共用同一個檔案）
         file_ext = os.path.splitext(file_path)[1]
-        temp_file = os.path.join(temp_dir, f"whisper_input_{os.getpid()}{file_ext}")
+        fd, temp_file = tempfile.mkstemp(prefix="whisper_input_", suffix=file_ext)
+        os.close(fd)
         
         # 複製檔案到臨時位置
         logger.debug(f"複製檔案到臨時位置: {temp_file}")
@@ -281,7 +793,8 @@ def _sanitize_path_for_whisper(file_path):
         return temp_file, temp_file  # 返回臨時檔案路徑和清理標記
 
 
-def generate_srt_with_coreml_whisper(audio_file_path, output_srt_path, language, update_progress=None, progress_range=(0, 100)):
+def generate_srt_with_coreml_whisper(audio_file_path, output_srt_path, language, update_progress=None, progress_range=(0, 100), pause_flag=None, timeout=None, reservation=None,
+                                     profile=None):
     """
     生成 SRT 字幕檔案（CoreML Whisper）
     
@@ -291,7 +804,14 @@ def generate_srt_with_coreml_whisper(audio_file_path, output_srt_path, language,
         language: 語言代碼
         update_progress: 進度更新回調函數（可選）
         progress_range: 進度範圍 (start, end)，預設 (0, 100)
+        pause_flag: 取消權杖，取消時終止 whisper.cpp 進程組（可選）
+        timeout: 超時秒數，None 時使用 planner.DEFAULT_ENGINE_TIMEOUT（可選）
+        reservation: 記憶體預留，執行期間取樣進程 RSS（可選）
+        profile: 速度設定檔名稱，None 時使用 SPEED_PROFILE（可選）
     """
+    import profiles
+
+    timeout = timeout or planner.DEFAULT_ENGINE_TIMEOUT
     logger.info(f"開始 CoreML Whisper 轉錄: {os.path.basename(audio_file_path)} -> {os.path.basename(output_srt_path)}")
     output_dir = os.path.dirname(output_srt_path)
     # 注意：output_srt_path 已經包含 coreml 後綴，不需要再使用 audio_file_path 的基礎名稱
@@ -327,7 +847,8 @@ def generate_srt_with_coreml_whisper(audio_file_path, output_srt_path, language,
     
     # 處理特殊字元路徑（如果包含日文等）
     safe_audio_path, temp_file = _sanitize_path_for_whisper(audio_file_path)
-    safe_output_base = os.path.join(tempfile.gettempdir(), f"whisper_output_{os.getpid()}") if temp_file else output_file_base
+    # 輸出檔名沿用不重複的臨時輸入檔名（與 CPU Whisper 相同）
+    safe_output_base = os.path.splitext(temp_file)[0] if temp_file else output_file_base
     
     try:
         # whisper-cli 的參數格式：[options] file0 file1 ...
@@ -338,8 +859,14 @@ def generate_srt_with_coreml_whisper(audio_file_path, output_srt_path, language,
             '-osrt',  # 輸出為 srt 文件
             '-of', safe_output_base,  # 指定輸出文件基名
             '-l', language,  # 指定語言
-            safe_audio_path,  # 音頻檔案直接作為參數（不使用 -f）
         ]
+        # 線程數與處理器數（可由 cli.py autotune 調校）
+        if config.WHISPER_CPP_THREADS > 0:
+            whisper_cmd.extend(['-t', str(config.WHISPER_CPP_THREADS)])
+        if config.WHISPER_CPP_PROCESSORS > 1:
+            whisper_cmd.extend(['-p', str(config.WHISPER_CPP_PROCESSORS)])
+        whisper_cmd.extend(profiles.get_profile(profile).whisper_cpp_args())  # 速度設定檔的解碼參數
+        whisper_cmd.append(safe_audio_path)  # 音頻檔案直接作為參數（不使用 -f）
         
         logger.debug(f"執行指令: {' '.join(whisper_cmd)}")
         
@@ -351,54 +878,41 @@ def generate_srt_with_coreml_whisper(audio_file_path, output_srt_path, language,
         # 注意：segmentation fault 無法被 Python 直接捕獲，但我們可以檢查退出碼
         try:
             logger.info("啟動 Whisper.cpp 進程...")
-            # 使用 Popen 以便更好地控制進程
-            process = subprocess.Popen(
-                whisper_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                preexec_fn=os.setsid if hasattr(os, 'setsid') else None  # 建立新的進程組
-            )
-            logger.debug(f"Whisper.cpp 進程已啟動 (PID: {process.pid})")
-            
             # 在執行期間模擬進度更新（因為無法從 whisper.cpp 獲取實際進度）
-            import threading
-            import time
-            
+            progress_state = {'current': progress_start + (progress_end - progress_start) * 0.1}
+            max_progress = progress_start + (progress_end - progress_start) * 0.9
+            progress_step = (max_progress - progress_state['current']) / 60  # 60 次更新
+
             def simulate_progress():
                 """模擬進度更新，讓用戶知道程序正在運行"""
-                current_progress = progress_start + (progress_end - progress_start) * 0.1
-                max_progress = progress_start + (progress_end - progress_start) * 0.9
-                step = (max_progress - current_progress) / 60  # 60 次更新
-                
-                while process.poll() is None:  # 進程還在運行
-                    time.sleep(1)  # 每秒更新一次
-                    current_progress = min(current_progress + step, max_progress)
-                    if update_progress:
-                        update_progress(current_progress)
-            
-            progress_thread = threading.Thread(target=simulate_progress, daemon=True)
-            progress_thread.start()
+                progress_state['current'] = min(progress_state['current'] + progress_step, max_progress)
+                if update_progress:
+                    update_progress(progress_state['current'])
+
+            # 由共用的進程監管器執行：非阻塞讀取輸出、只保留尾端，超時與取消都由事件迴圈處理
+            # whisper.cpp 的輸出只以 DEBUG 級別記錄，並套用速率限制與相似行合併
+            from output_capture import OutputCapture
+            from process_supervisor import get_supervisor
+            logger.info("等待 Whisper.cpp 執行完成...")
+            with OutputCapture("Whisper.cpp", name=audio_file_path, level=logging.DEBUG,
+                               on_position=metrics.audio_position_reporter()) as capture:
+                result = get_supervisor().run(whisper_cmd, timeout=timeout, pause_flag=pause_flag, on_line=capture,
+                                              tail_lines=config.ENGINE_OUTPUT_TAIL_LINES,
+                                              tick=(1.0, simulate_progress), reservation=reservation)
+            started_at = result.started_at
+            stdout, stderr = result.stdout, result.stderr
+            return_code = result.returncode
+            logger.debug(f"Whisper.cpp 執行完成 (PID: {result.pid})，退出碼: {return_code}")
+            if result.timed_out:
+                logger.error(f"Whisper 執行超時（超過 {timeout:.0f} 秒）: {audio_file_path}")
+                _remove_partial_output(f"{safe_output_base}.srt", started_at)
+                raise RuntimeError(f"Whisper 執行超時（超過 {timeout:.0f} 秒）: {audio_file_path}")
             
-            try:
-                logger.info("等待 Whisper.cpp 執行完成...")
-                stdout, stderr = process.communicate(timeout=3600)  # 1 小時超時
-                return_code = process.returncode
-                logger.debug(f"Whisper.cpp 執行完成，退出碼: {return_code}")
-                if stdout:
-                    logger.debug(f"Whisper 輸出: {stdout[:500]}...")
-                if stderr:
-                    logger.debug(f"Whisper 錯誤輸出: {stderr[:500]}...")
-            except subprocess.TimeoutExpired:
-                logger.error(f"Whisper 執行超時（超過 1 小時）: {audio_file_path}")
-                # 超時，終止進程
-                process.kill()
-                if hasattr(os, 'setsid'):
-                    try:
-                        os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-                    except:
-                        pass
-                raise RuntimeError(f"Whisper 執行超時（超過 1 小時）: {audio_file_path}")
+            # 被取消：移除未完成的輸出，保留之前已完成的檔案
+            if pause_flag is not None and pause_flag.is_set():
+                _remove_partial_output(f"{safe_output_base}.srt", started_at)
+                logger.warning(f"Whisper.cpp 已被取消: {os.path.basename(audio_file_path)}")
+                raise_if_cancelled(pause_flag)
             
             # 檢查退出碼
             if return_code != 0:
@@ -417,21 +931,11 @@ def generate_srt_with_coreml_whisper(audio_file_path, output_srt_path, language,
                 )
                 
                 if is_segfault:
-                    logger.critical("Whisper 發生 Segmentation Fault（段錯誤）")
-                    error_msg = (
-                        f"❌ Whisper 發生 Segmentation Fault（段錯誤）\n\n"
-                        f"可能原因：\n"
-                        f"1. 檔案路徑包含特殊字元（已嘗試處理，但可能仍有問題）\n"
-                        f"2. whisper.cpp 執行檔編譯問題或與系統不兼容\n"
-                        f"3. 模型檔案損壞或格式不正確\n"
-                        f"4. 記憶體不足\n"
-                        f"5. whisper.cpp 版本問題\n\n"
-                        f"💡 建議解決方案：\n"
-                        f"• 使用「CPU 執行」模式（較穩定，功能相同）\n"
-                        f"• 檢查 whisper.cpp 是否正確編譯\n"
-                        f"• 檢查模型檔案是否完整\n"
-                        f"• 嘗試使用較小的模型（如 medium 或 small）"
-                    )
+                    logger.critical("Whisper 發生 Segmentation Fault（段錯誤）；可能原因：檔案路徑含特殊字元、"
+                                    "whisper.cpp 編譯問題、模型檔案損壞或記憶體不足")
+                    # One line, it ends up in the batch failure summary / 單行訊息，會列在批次失敗摘要中
+                    error_msg = (f"Whisper 發生 Segmentation Fault（段錯誤，退出碼: {return_code}）；"
+                                 f"設定 BATCH_FALLBACK_ENGINE=cpu 可自動改用 CPU 引擎重新處理")
                 else:
                     logger.error(f"Whisper 執行失敗，退出碼: {return_code}")
                     # 其他錯誤
@@ -476,11 +980,8 @@ def generate_srt_with_coreml_whisper(audio_file_path, output_srt_path, language,
                     logger.error(f"輸出檔案不存在: {expected_srt} 或 {output_srt_path}")
                     raise RuntimeError(f"輸出檔案不存在: {expected_srt} 或 {output_srt_path}")
                     
-        except subprocess.TimeoutExpired:
-            logger.error(f"Whisper 執行超時（超過 1 小時）: {audio_file_path}")
-            raise RuntimeError(f"Whisper 執行超時（超過 1 小時）: {audio_file_path}")
-        except RuntimeError:
-            # 重新拋出 RuntimeError
+        except (RuntimeError, JobCancelled):
+            # 重新拋出 RuntimeError 和取消
             raise
         except Exception as e:
             logger.exception(f"執行 Whisper 時發生未預期的錯誤: {e}")
@@ -494,7 +995,22 @@ def generate_srt_with_coreml_whisper(audio_file_path, output_srt_path, language,
             except Exception as e:
                 logger.warning(f"清理臨時檔案失敗: {e}")
 
-def generate_srt_with_cpu_whisper(audio_file_path, output_srt_path, language):
+def generate_srt_with_cpu_whisper(audio_file_path, output_srt_path, language, pause_flag=None, timeout=None, reservation=None,
+                                  profile=None):
+    """
+    生成 SRT 字幕檔案（CPU Whisper）
+    
+    Args:
+        audio_file_path: 音頻檔案路徑
+        output_srt_path: 輸出 SRT 檔案路徑
+        language: 語言代碼
+        pause_flag: 取消權杖，取消時終止 whisper 進程組（可選）
+        timeout: 超時秒數，None 時使用 planner.DEFAULT_ENGINE_TIMEOUT（可選）
+        reservation: 記憶體預留，執行期間取樣進程 RSS（可選）
+        profile: 速度設定檔名稱，None 時使用 SPEED_PROFILE（可選）
+    """
+    import profiles
+
     logger.info(f"開始 CPU Whisper 轉錄: {os.path.basename(audio_file_path)} -> {os.path.basename(output_srt_path)}")
     output_dir = os.path.dirname(output_srt_path)
     
@@ -524,6 +1040,9 @@ def generate_srt_with_cpu_whisper(audio_file_path, output_srt_path, language):
     ]
     if language != "auto":
         whisper_cmd.extend(['--language', language])  # 指定語言
+    if config.CPU_WHISPER_THREADS > 0:
+        whisper_cmd.extend(['--threads', str(config.CPU_WHISPER_THREADS)])  # torch 線程數（可由 cli.py autotune 調校）
+    whisper_cmd.extend(profiles.get_profile(profile).openai_whisper_args())  # 速度設定檔的解碼參數
     
     # 驗證模型名稱（確保不是錯誤的模型名稱）
     model_name = config.CPU_WHISPER_MODEL
@@ -539,86 +1058,37 @@ def generate_srt_with_cpu_whisper(audio_file_path, output_srt_path, language):
     # 執行 whisper，即時顯示 log
     try:
         logger.info("啟動 CPU Whisper 進程...")
-        # 使用 Popen 以便即時顯示輸出
-        process = subprocess.Popen(
-            whisper_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,  # 將 stderr 合併到 stdout
-            text=True,
-            bufsize=1,  # 行緩衝
-            env=os.environ.copy()  # 確保環境變數正確傳遞
-        )
-        logger.info(f"CPU Whisper 進程已啟動 (PID: {process.pid})")
+        timeout_seconds = timeout or planner.DEFAULT_ENGINE_TIMEOUT
         
-        # 即時讀取並顯示輸出
-        output_lines = []
+        # 由共用的進程監管器執行並即時顯示輸出；只保留最後幾行供錯誤訊息使用
+        # 輸出套用速率限制與相似行合併（進度條），可另外以 gzip 保存完整輸出
+        # stderr 合併到 stdout；取消時立即終止整個進程組（包含 ffmpeg 子進程）
+        from output_capture import OutputCapture
+        from process_supervisor import get_supervisor
         logger.info("等待 CPU Whisper 執行完成...")
-        
-        # 使用 threading 來即時讀取輸出
-        import threading
-        import queue
-        import time
-        
-        output_queue = queue.Queue()
-        read_complete = threading.Event()
-        
-        def read_output():
-            """在背景線程中讀取輸出"""
-            try:
-                for line in process.stdout:
-                    line = line.rstrip()
-                    if line:  # 忽略空行
-                        output_queue.put(line)
-                read_complete.set()
-            except Exception as e:
-                logger.error(f"讀取輸出時發生錯誤: {e}")
-                read_complete.set()
-        
-        reader_thread = threading.Thread(target=read_output, daemon=True)
-        reader_thread.start()
-        
-        # 主線程中即時顯示輸出，並監控超時
-        start_time = time.time()
-        timeout_seconds = 3600  # 1 小時超時
-        
-        while True:
-            # 檢查超時
-            if time.time() - start_time > timeout_seconds:
-                logger.error(f"Whisper 執行超時（超過 1 小時）: {audio_file_path}")
-                process.kill()
-                process.wait()
-                raise RuntimeError(f"Whisper 執行超時（超過 1 小時）: {audio_file_path}")
-            
-            # 檢查進程是否已結束
-            if process.poll() is not None:
-                # 進程已結束，等待讀取線程完成
-                read_complete.wait(timeout=5)
-                break
-            
-            # 嘗試讀取輸出
-            try:
-                line = output_queue.get(timeout=1)  # 1 秒超時
-                logger.info(f"Whisper: {line}")
-                output_lines.append(line)
-            except queue.Empty:
-                continue  # 繼續等待
-        
-        # 讀取剩餘輸出
-        while True:
-            try:
-                line = output_queue.get_nowait()
-                logger.info(f"Whisper: {line}")
-                output_lines.append(line)
-            except queue.Empty:
-                break
+        with OutputCapture("Whisper", name=audio_file_path, on_position=metrics.audio_position_reporter()) as capture:
+            result = get_supervisor().run(whisper_cmd, timeout=timeout_seconds, pause_flag=pause_flag, on_line=capture,
+                                          merge_stderr=True, tail_lines=config.ENGINE_OUTPUT_TAIL_LINES,
+                                          reservation=reservation,
+                                          env=os.environ.copy())  # 確保環境變數正確傳遞
+        started_at = result.started_at
+        if result.timed_out:
+            logger.error(f"Whisper 執行超時（超過 {timeout_seconds:.0f} 秒）: {audio_file_path}")
+            raise RuntimeError(f"Whisper 執行超時（超過 {timeout_seconds:.0f} 秒）: {audio_file_path}")
         
         # 獲取進程退出碼
-        return_code = process.returncode
-        logger.info(f"CPU Whisper 執行完成，退出碼: {return_code}")
+        return_code = result.returncode
+        logger.info(f"CPU Whisper 執行完成 (PID: {result.pid})，退出碼: {return_code}")
+        
+        # 被取消：移除未完成的輸出，保留之前已完成的檔案
+        if pause_flag is not None and pause_flag.is_set():
+            partial_dir = temp_output_dir if temp_file else output_dir
+            _remove_partial_output(os.path.join(partial_dir, os.path.splitext(os.path.basename(safe_audio_path))[0] + '.srt'), started_at)
+            logger.warning(f"CPU Whisper 已被取消: {os.path.basename(audio_file_path)}")
+            raise_if_cancelled(pause_flag)
         
         if return_code != 0:
-            error_output = '\n'.join(output_lines)
-            raise subprocess.CalledProcessError(return_code, whisper_cmd, output=error_output)
+            raise subprocess.CalledProcessError(return_code, whisper_cmd, output=result.stdout)
         
         logger.info("CPU Whisper 執行成功")
         
@@ -630,7 +1100,6 @@ def generate_srt_with_cpu_whisper(audio_file_path, output_srt_path, language):
             
             if os.path.exists(temp_output_file):
                 # 移動到最終位置
-                import shutil
                 shutil.move(temp_output_file, output_srt_path)
                 logger.info(f"✓ 已將輸出檔案移動到: {output_srt_path}")
             else:
@@ -645,13 +1114,14 @@ def generate_srt_with_cpu_whisper(audio_file_path, output_srt_path, language):
         else:
             # 檢查輸出檔案是否存在
             expected_srt = os.path.join(output_dir, os.path.splitext(os.path.basename(audio_file_path))[0] + '.srt')
-            if os.path.exists(expected_srt):
+            if os.path.exists(expected_srt) and expected_srt != output_srt_path:
+                # whisper 以輸入檔名命名輸出，移動到帶 cpu 後綴的目標位置
+                shutil.move(expected_srt, output_srt_path)
+                logger.info(f"✓ 已將輸出檔案移動到: {output_srt_path}")
+            elif os.path.exists(expected_srt):
                 logger.info(f"✓ 輸出檔案已生成: {expected_srt}")
             else:
                 logger.warning(f"輸出檔案可能不在預期位置: {expected_srt}")
-    except subprocess.TimeoutExpired:
-        logger.error(f"Whisper 執行超時（超過 1 小時）: {audio_file_path}")
-        raise RuntimeError(f"Whisper 執行超時（超過 1 小時）: {audio_file_path}")
     except subprocess.CalledProcessError as e:
         logger.error(f"Whisper 執行失敗 (退出碼: {e.returncode})")
         logger.error(f"執行命令: {' '.join(whisper_cmd)}")
@@ -680,6 +1150,8 @@ def generate_srt_with_cpu_whisper(audio_file_path, output_srt_path, language):
             error_msg += "\n- 嘗試手動執行命令查看詳細錯誤"
         
         raise RuntimeError(error_msg)
+    except JobCancelled:
+        raise
     except Exception as e:
         logger.exception(f"執行 Whisper 時發生未預期的錯誤: {e}")
         raise RuntimeError(f"執行 Whisper 時發生錯誤: {e}")
@@ -2,12 +2,11 @@
 AI translation module / AI 翻譯模組
 Provides translation functionality using OpenAI API / 使用 OpenAI API 提供翻譯功能
 """
-from openai import OpenAI
-import srt
 import datetime
 import os
 from config import config
 from logger import logger
+from cancellation import raise_if_cancelled
 
 
 def get_unique_output_path(base_path, suffix):
@@ -63,7 +62,11 @@ def get_openai_client():
             "請設定環境變數 OPENAI_API_KEY 或在 .env 檔案中設定。\n"
             "詳見 docs/CONFIGURATION.md"
         )
-    return OpenAI(api_key=api_key)
+    from openai import OpenAI, DefaultHttpxClient  # Imported on first use, keeps module import fast / 第一次使用時才匯入，讓模組匯入保持快速
+    import metrics
+    # Count every HTTP request, including the client's automatic retries / 計算每一次 HTTP 請求，包含客戶端自動重試
+    http_client = DefaultHttpxClient(event_hooks={'request': [lambda request: metrics.report_translate_request()]})
+    return OpenAI(api_key=api_key, http_client=http_client)
 
 def translate_text(text, target_language=None, pause_flag=None):
     """
@@ -124,26 +127,51 @@ def translate_srt(input_srt_path, output_srt_path=None, target_language=None, pa
         input_srt_path: Path to input SRT file / 輸入 SRT 檔案路徑
         output_srt_path: Path to output SRT file (if None, auto-generate) / 輸出 SRT 檔案路徑（如果為 None，自動生成）
         target_language: Target language / 目標語言
-        pause_flag: Pause flag / 暫停標誌
+        pause_flag: Cancellation token / 取消權杖
+    
+    Returns:
+        str: Path of the written file / 寫入的檔案路徑
+    
+    Raises:
+        JobCancelled: If cancelled, no partially translated file is written / 被取消時拋出，不會寫入翻譯不完整的檔案
     """
+    import srt
+    # Imported on first use like srt, keeps module import within its startup budget / 與 srt 相同在第一次使用時才匯入，讓模組匯入維持在啟動預算內
+    import metrics
+    import planner
+    from event_bus import bus, KEY_FILES_IN_FLIGHT
+
     logger.info(f"開始翻譯 SRT 檔案: {os.path.basename(input_srt_path)}")
-    with open(input_srt_path, 'r', encoding='utf-8') as f:
-        srt_content = f.read()
-        logger.debug(f"已讀取字幕檔案，大小: {len(srt_content)} 字元")
+    planner.get_history()  # Learn seconds per request from this file / 從此檔案學習每次請求的秒數
+    labels = {'engine': 'openai', 'model': config.OPENAI_MODEL, 'language': target_language}
+    with bus.track(KEY_FILES_IN_FLIGHT), \
+            metrics.stage(metrics.STAGE_TRANSLATE, file=input_srt_path,
+                          bytes_in=metrics.file_size(input_srt_path), **labels) as record:
+        with open(input_srt_path, 'r', encoding='utf-8') as f:
+            srt_content = f.read()
+            logger.debug(f"已讀取字幕檔案，大小: {len(srt_content)} 字元")
 
-    subtitles = list(srt.parse(srt_content))
-    logger.info(f"已解析字幕，共 {len(subtitles)} 條")
+        subtitles = list(srt.parse(srt_content))
+        logger.info(f"已解析字幕，共 {len(subtitles)} 條")
+        if subtitles:
+            record.audio_seconds = subtitles[-1].end.total_seconds()
 
-    for i, subtitle in enumerate(subtitles):
-        if pause_flag and pause_flag.is_set():
-            logger.warning("翻譯已暫停")
-            break
-        logger.info(f"翻譯字幕 [{i+1}/{len(subtitles)}]: {subtitle.content[:50]}...")
-        subtitle.content = translate_text(subtitle.content, target_language, pause_flag)
-        logger.debug(f"✓ 字幕 {subtitle.index} 翻譯完成")
+        record.extra['subtitles'] = len(subtitles)
+        # Counted by get_openai_client for every request actually sent / 由 get_openai_client 計算實際送出的每一次請求
+        record.extra['requests'] = 0
+        for i, subtitle in enumerate(subtitles):
+            if pause_flag and pause_flag.is_set():
+                logger.warning("翻譯已暫停")
+                break
+            logger.info(f"翻譯字幕 [{i+1}/{len(subtitles)}]: {subtitle.content[:50]}...")
+            subtitle.content = translate_text(subtitle.content, target_language, pause_flag)
+            logger.debug(f"✓ 字幕 {subtitle.index} 翻譯完成")
+
+        # Do not write a partially translated file / 不寫入翻譯不完整的檔案
+        raise_if_cancelled(pause_flag)
 
-    translated_srt_content = srt.compose(subtitles)
-    logger.debug("已合成翻譯後的字幕")
+        translated_srt_content = srt.compose(subtitles)
+        logger.debug("已合成翻譯後的字幕")
 
     if output_srt_path is None or output_srt_path.strip() == "":
         # Use translation language as suffix / 使用翻譯語言作為後綴
@@ -158,6 +186,9 @@ def translate_srt(input_srt_path, output_srt_path=None, target_language=None, pa
     output_dir = os.path.dirname(output_srt_path) if os.path.dirname(output_srt_path) else '.'
     os.makedirs(output_dir, exist_ok=True)
 
-    with open(output_srt_path, 'w', encoding='utf-8') as f:
-        f.write(translated_srt_content)
-        logger.info(f"✓ 已寫入翻譯後的字幕檔案: {os.path.basename(output_srt_path)}")
+    with metrics.stage(metrics.STAGE_WRITE, file=input_srt_path, audio_seconds=record.audio_seconds, **labels) as write_record:
+        with open(output_srt_path, 'w', encoding='utf-8') as f:
+            f.write(translated_srt_content)
+            logger.info(f"✓ 已寫入翻譯後的字幕檔案: {os.path.basename(output_srt_path)}")
+        write_record.bytes_out = metrics.file_size(output_srt_path)
+    return output_srt_path
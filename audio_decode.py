@@ -0,0 +1,233 @@
+"""
+Audio decode module / 音訊解碼模組
+Picks the cheapest way to turn an input file into engine-ready audio / 選擇將輸入檔案轉為引擎可用音訊的最便宜方式
+
+Routes / 路徑:
+    passthrough: 16 kHz mono 16-bit PCM WAV, or an engine that decodes any input itself / 16 kHz 單聲道 16 位元 PCM WAV，或引擎可自行解碼任何輸入
+    resample:    other PCM WAV at 16 kHz or above, downmixed and resampled in process with numpy (no ffmpeg) / 16 kHz 以上的其他 PCM WAV，在進程內以 numpy 混音與重新取樣（不啟動 ffmpeg）
+    ffmpeg:      compressed formats (mp4, m4a, mp3, flac, ...) and everything else / 壓縮格式（mp4、m4a、mp3、flac 等）及其他所有情況
+
+Only the WAV header is read to choose a route; numpy is imported when a file is resampled. / 選擇路徑時只讀取 WAV 標頭；重新取樣時才匯入 numpy。
+"""
+import os
+import wave
+from collections import namedtuple
+
+from cancellation import raise_if_cancelled
+from logger import logger
+
+# Format expected by whisper.cpp / whisper.cpp 需要的格式
+TARGET_RATE = 16000
+TARGET_CHANNELS = 1
+TARGET_SAMPLE_WIDTH = 2
+
+ROUTE_PASSTHROUGH = "passthrough"
+ROUTE_RESAMPLE = "resample"
+ROUTE_FFMPEG = "ffmpeg"
+
+# Input frames converted per step (about 5 s at 48 kHz) / 每步轉換的輸入幀數（48 kHz 約 5 秒）
+CHUNK_FRAMES = 1 << 18
+
+WavFormat = namedtuple('WavFormat', 'rate channels sample_width frames')
+
+
+def read_wav_format(path):
+    """
+    Format of a PCM WAV file from its header / 從標頭讀取 PCM WAV 檔案的格式
+
+    Returns:
+        WavFormat: Format, or None when the file is not a PCM WAV the wave module can read / 格式；不是 wave 模組可讀取的 PCM WAV 時為 None
+    """
+    if not path.lower().endswith('.wav'):
+        return None
+    try:
+        with wave.open(path, 'rb') as reader:
+            return WavFormat(reader.getframerate(), reader.getnchannels(), reader.getsampwidth(), reader.getnframes())
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def is_engine_ready(wav_format):
+    """
+    Check if a WAV format can be sent to the engine unchanged / 檢查 WAV 格式是否可直接送入引擎
+    """
+    return (wav_format is not None and wav_format.rate == TARGET_RATE
+            and wav_format.channels == TARGET_CHANNELS and wav_format.sample_width == TARGET_SAMPLE_WIDTH)
+
+
+def choose_route(path, engine_decodes=False):
+    """
+    Cheapest route for an input file / 輸入檔案最便宜的處理路徑
+
+    Args:
+        path: Audio or video file / 音訊或影片檔案
+        engine_decodes: The engine decodes any format and rate itself / 引擎可自行解碼任何格式與取樣率
+
+    Returns:
+        tuple: (route, WavFormat or None) / （路徑, WavFormat 或 None）
+    """
+    if engine_decodes:
+        return ROUTE_PASSTHROUGH, None
+    wav_format = read_wav_format(path)
+    if is_engine_ready(wav_format):
+        return ROUTE_PASSTHROUGH, wav_format
+    # Upsampling is left to ffmpeg: linear interpolation would dull the top of the band / 升取樣交給 ffmpeg：線性內插會削弱高頻
+    if (wav_format is not None and wav_format.rate >= TARGET_RATE and wav_format.sample_width in (1, 2, 3, 4)
+            and _numpy_available()):
+        return ROUTE_RESAMPLE, wav_format
+    return ROUTE_FFMPEG, wav_format
+
+
+def _numpy_available():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _to_mono(data, wav_format):
+    """
+    Interleaved PCM bytes to mono float samples in [-1, 1) / 交錯的 PCM 位元組轉為 [-1, 1) 的單聲道浮點取樣
+    """
+    import numpy as np
+
+    width = wav_format.sample_width
+    if width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = (np.where(values & 0x800000, values - 0x1000000, values)).astype(np.float32) / 8388608.0
+    else:
+        samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / 2147483648.0
+    channels = wav_format.channels
+    if channels > 1:
+        # Strided slices are much faster than reshape(...).mean(axis=1) / 跨步切片比 reshape(...).mean(axis=1) 快得多
+        samples = sum(samples[channel::channels] for channel in range(channels)) / channels
+    return samples
+
+
+def _lowpass_kernel(step):
+    """
+    Windowed-sinc anti-aliasing filter for downsampling by step / 降取樣 step 倍時的加窗 sinc 抗混疊濾波器
+    """
+    import numpy as np
+
+    half = int(8 * step)
+    cutoff = 0.475 / step  # Just below the new Nyquist frequency / 略低於新的奈奎斯特頻率
+    n = np.arange(-half, half + 1)
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(len(n))
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+class _Resampler:
+    """
+    Streaming low-pass + linear interpolation resampler / 串流式低通濾波加線性內插重新取樣器
+
+    The filter is evaluated only at the two input positions around each output sample, so the work / 濾波器只在每個輸出取樣兩側的輸入位置計算，
+    grows with the output rate rather than the input rate. Chunks keep the tail of the previous / 因此計算量隨輸出取樣率而非輸入取樣率增長。
+    chunk as context, so the output does not depend on the chunk size. / 每個區塊保留前一區塊的尾端作為上下文，輸出與區塊大小無關。
+    """
+
+    def __init__(self, rate, frames):
+        import numpy as np
+
+        self.step = rate / TARGET_RATE  # Input samples per output sample / 每個輸出取樣對應的輸入取樣數
+        self.kernel = _lowpass_kernel(self.step) if self.step > 1 else np.ones(1, dtype=np.float32)
+        self.delay = (len(self.kernel) - 1) // 2
+        self.total = int(round(frames / self.step))
+        # Zeros before the first sample, so the first windows are complete / 第一個取樣前補零，使最初的視窗完整
+        self._raw = np.zeros(len(self.kernel) - 1, dtype=np.float32)
+        self._raw_start = -(len(self.kernel) - 1)  # Input index of _raw[0] / _raw[0] 的輸入索引
+        self._next = 0  # Next output sample / 下一個輸出取樣
+
+    def _window_index(self, output_index):
+        # Window ending at the filtered sample left of the output / 結束於輸出左側濾波取樣的視窗
+        return int(output_index * self.step) + self.delay - (len(self.kernel) - 1) - self._raw_start
+
+    def feed(self, samples):
+        """
+        Add mono input samples and return the output samples they complete / 加入單聲道輸入取樣，返回因此完成的輸出取樣
+        """
+        import numpy as np
+        from numpy.lib.stride_tricks import sliding_window_view
+
+        self._raw = np.concatenate((self._raw, samples))
+        raw_end = self._raw_start + len(self._raw)
+        # Output k needs filtered samples floor(k * step) + delay and the one after / 輸出 k 需要 floor(k * step) + delay 及其後一個濾波取樣
+        available = raw_end - 2 - self.delay
+        last = min(self.total, int(available / self.step) + 1) if available >= 0 else 0
+        if last <= self._next:
+            return np.zeros(0, dtype=np.float32)
+        if self.step == int(self.step):
+            # Integer ratio (48 kHz, 32 kHz, ...): outputs fall on input samples, no interpolation / 整數比例：輸出落在輸入取樣上，不需內插
+            step, start = int(self.step), self._window_index(self._next)
+            output = np.zeros(last - self._next, dtype=np.float32)
+            for tap, weight in enumerate(self.kernel):
+                output += weight * self._raw[start + tap:start + tap + step * len(output):step]
+        else:
+            times = np.arange(self._next, last) * self.step
+            left = np.floor(times).astype(np.int64)
+            index = left + self.delay - (len(self.kernel) - 1) - self._raw_start
+            windows = sliding_window_view(self._raw, len(self.kernel))
+            before, after = windows[index] @ self.kernel, windows[index + 1] @ self.kernel
+            output = before + (times - left) * (after - before)
+        self._next = last
+        drop = min(len(self._raw), max(0, self._window_index(self._next)))
+        self._raw = self._raw[drop:]
+        self._raw_start += drop
+        return output
+
+    def flush(self):
+        """
+        Output samples left once the input has ended / 輸入結束後剩餘的輸出取樣
+        """
+        import numpy as np
+
+        output = self.feed(np.zeros(self.delay + int(self.step) + 2, dtype=np.float32))
+        missing = self.total - self._next
+        self._next = self.total
+        return np.concatenate((output, np.zeros(max(0, missing), dtype=np.float32)))
+
+
+def resample_wav(source_path, output_path, wav_format=None, pause_flag=None):
+    """
+    Write a PCM WAV as 16 kHz mono 16-bit PCM without ffmpeg / 不使用 ffmpeg 將 PCM WAV 寫為 16 kHz 單聲道 16 位元 PCM
+
+    Args:
+        source_path: PCM WAV file / PCM WAV 檔案
+        output_path: Output WAV path / 輸出 WAV 路徑
+        wav_format: Format of source_path (read if None) / source_path 的格式（None 時讀取）
+        pause_flag: Cancellation token, checked between chunks (optional) / 取消權杖，在區塊之間檢查（可選）
+    """
+    import numpy as np
+
+    wav_format = wav_format or read_wav_format(source_path)
+    logger.info(f"在進程內轉換 WAV（{wav_format.rate} Hz，{wav_format.channels} 聲道）: {os.path.basename(source_path)}")
+    resampler = _Resampler(wav_format.rate, wav_format.frames)
+
+    def write(writer, samples):
+        writer.writeframes((np.clip(samples * 32768.0, -32768, 32767)).astype('<i2').tobytes())
+
+    try:
+        with wave.open(source_path, 'rb') as reader, wave.open(output_path, 'wb') as writer:
+            writer.setnchannels(TARGET_CHANNELS)
+            writer.setsampwidth(TARGET_SAMPLE_WIDTH)
+            writer.setframerate(TARGET_RATE)
+            while True:
+                raise_if_cancelled(pause_flag)
+                data = reader.readframes(CHUNK_FRAMES)
+                if not data:
+                    break
+                write(writer, resampler.feed(_to_mono(data, wav_format)))
+            write(writer, resampler.flush())
+    except BaseException:
+        try:
+            os.remove(output_path)
+        except OSError:
+            pass
+        raise
+    logger.info(f"✓ 轉換完成: {os.path.basename(output_path)}")
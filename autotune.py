@@ -0,0 +1,225 @@
+"""
+Engine autotuning module / 引擎自動調校模組
+Benchmarks short sample clips across thread and processor combinations on this machine and / 以簡短的樣本片段在本機上測試線程數與處理器數的組合，
+picks the combination with the highest throughput (audio seconds per wall second). / 選出吞吐量（每秒牆鐘時間處理的音訊秒數）最高的組合。
+
+Tuned settings / 調校的設定:
+    coreml - WHISPER_CPP_THREADS (-t), WHISPER_CPP_PROCESSORS (-p)
+    cpu    - CPU_WHISPER_THREADS (--threads)
+    faster - FASTER_WHISPER_THREADS
+
+Trials run one engine at a time, like a batch processes its files, so the saved settings reach / 測試一次只執行一個引擎，與批次處理檔案的方式相同，
+the measured throughput. ENGINE_SLOTS only runs more batches side by side and is not tuned. / 因此儲存的設定能達到量測的吞吐量。ENGINE_SLOTS 只讓多個批次同時執行，不在調校範圍內。
+Combinations never use more threads than the machine has cores (threads x processors). The first / 組合使用的線程總數（線程 x 處理器）不超過核心數。
+trial runs the engine defaults and is the baseline for the reported speedups. / 第一個測試使用引擎預設值，作為回報加速比的基準。
+"""
+import os
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+import engines
+from cancellation import JobCancelled, raise_if_cancelled
+from config import config
+from logger import logger
+
+THREAD_SETTINGS = {
+    'coreml': 'WHISPER_CPP_THREADS',
+    'cpu': 'CPU_WHISPER_THREADS',
+    'faster': 'FASTER_WHISPER_THREADS',
+}
+PROCESSOR_SETTING = 'WHISPER_CPP_PROCESSORS'  # whisper.cpp only / 只有 whisper.cpp
+
+# Length of the sample cut from each input file / 從每個輸入檔案擷取的樣本長度
+DEFAULT_SAMPLE_SECONDS = 30
+
+
+class Trial:
+    """
+    One measured combination / 一個量測過的組合
+    """
+
+    def __init__(self, threads, processors=1):
+        """
+        Args:
+            threads: Threads per engine run (0 = engine default) / 每個引擎執行的線程數（0 = 引擎預設值）
+            processors: whisper.cpp processors per run / 每次執行的 whisper.cpp 處理器數
+        """
+        self.threads = threads
+        self.processors = processors
+        self.wall_seconds = None
+        self.audio_seconds = None
+        self.error = None
+
+    @property
+    def throughput(self):
+        """
+        Audio seconds per wall second, None if not measured / 每秒牆鐘時間處理的音訊秒數，未量測時為 None
+        """
+        if self.error or not self.wall_seconds:
+            return None
+        return self.audio_seconds / self.wall_seconds
+
+    def settings(self, engine):
+        """
+        Config settings that reproduce this combination / 重現此組合的設定
+
+        Returns:
+            dict: {setting name: value} / {設定名稱: 值}
+        """
+        values = {THREAD_SETTINGS[engine]: self.threads}
+        if engine == 'coreml':
+            values[PROCESSOR_SETTING] = self.processors
+        return values
+
+    def to_dict(self):
+        throughput = self.throughput
+        return {
+            "threads": self.threads,
+            "processors": self.processors,
+            "wall_s": None if self.wall_seconds is None else round(self.wall_seconds, 2),
+            "audio_s": None if self.audio_seconds is None else round(self.audio_seconds, 1),
+            "throughput": None if throughput is None else round(throughput, 3),
+            "error": self.error,
+        }
+
+
+def thread_counts(cores):
+    """
+    Powers of two up to the core count, plus the core count / 不超過核心數的 2 的次方，加上核心數本身
+    """
+    counts = {cores}
+    count = 1
+    while count < cores:
+        counts.add(count)
+        count *= 2
+    return sorted(counts)
+
+
+def candidates(engine, cores):
+    """
+    Combinations to measure, engine defaults first / 要量測的組合，引擎預設值在最前面
+
+    Args:
+        engine: Engine instance / 引擎實例
+        cores: CPU cores of this machine / 本機 CPU 核心數
+
+    Returns:
+        list: Trial list / Trial 列表
+    """
+    processors = (1, 2) if engine.name == 'coreml' and cores >= 2 else (1,)
+    trials = [Trial(0)]
+    for procs in processors:
+        for threads in thread_counts(cores):
+            if threads * procs <= cores:
+                trials.append(Trial(threads, procs))
+    return trials
+
+
+def prepare_samples(files, seconds, directory, pause_flag=None):
+    """
+    Cut the first seconds of every file into 16 kHz mono wav samples / 將每個檔案的前段擷取為 16 kHz 單聲道 wav 樣本
+
+    Returns:
+        list: Sample paths / 樣本路徑
+    """
+    samples = []
+    for i, file in enumerate(files):
+        raise_if_cancelled(pause_flag)
+        sample = os.path.join(directory, f"sample_{i}.wav")
+        cmd = ['ffmpeg', '-y', '-i', file, '-t', str(seconds), '-ac', '1', '-ar', '16000', '-acodec', 'pcm_s16le', sample]
+        logger.debug(f"執行 ffmpeg 指令: {' '.join(cmd)}")
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+        samples.append(sample)
+    return samples
+
+
+@contextmanager
+def _overrides(values):
+    """
+    Apply settings to this process for the duration of a trial / 在測試期間將設定套用到目前進程
+    """
+    for name, value in values.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name in values:
+            vars(config).pop(name, None)
+
+
+def run_trial(engine, trial, samples, audio_seconds, language, pause_flag=None):
+    """
+    Measure one combination: one engine run per sample, one after the other / 量測一個組合：每個樣本執行一次引擎，依序執行
+
+    A failed run is recorded in trial.error instead of raising. / 執行失敗時記錄在 trial.error，不會拋出例外。
+    """
+    with _overrides(trial.settings(engine.name)):
+        try:
+            if engine.in_process:
+                engine.load_model()  # Not part of the measurement / 不列入量測
+            started = time.perf_counter()
+            for sample in samples:
+                engine.transcribe(sample, language, pause_flag=pause_flag)
+            trial.wall_seconds = time.perf_counter() - started
+            trial.audio_seconds = audio_seconds
+        except JobCancelled:
+            raise
+        except Exception as e:
+            trial.error = str(e)[:200]
+            logger.warning(f"自動調校測試失敗（{trial.threads} 線程 x {trial.processors} 處理器）: {e}")
+        finally:
+            engine.unload()
+    return trial
+
+
+def tune(engine_name, files, language='auto', sample_seconds=DEFAULT_SAMPLE_SECONDS, pause_flag=None,
+         on_trial=None):
+    """
+    Measure every candidate combination for an engine / 量測引擎的所有候選組合
+
+    Args:
+        engine_name: Engine name / 引擎名稱
+        files: Input files the samples are cut from / 擷取樣本的輸入檔案
+        language: Language code or 'auto' / 語言代碼或 'auto'
+        sample_seconds: Sample length per file / 每個檔案的樣本長度
+        pause_flag: Cancellation token (optional) / 取消權杖（可選）
+        on_trial: Called with every finished Trial (optional) / 每個測試完成時呼叫（可選）
+
+    Returns:
+        list: Measured Trial list, engine defaults first / 量測過的 Trial 列表，引擎預設值在最前面
+
+    Raises:
+        RuntimeError: If the engine is not available / 引擎無法使用時
+    """
+    from actions import get_audio_duration
+
+    engine = engines.get_engine(engine_name)
+    reason = engine.unavailable_reason()
+    if reason:
+        raise RuntimeError(reason)
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory(prefix="whisper_autotune_") as tmp_dir:
+        samples = prepare_samples(files, sample_seconds, tmp_dir, pause_flag)
+        durations = [get_audio_duration(sample) for sample in samples]
+        trials = candidates(engine, cores)
+        logger.info(f"開始自動調校 {engine.description}: {len(trials)} 個組合、{len(samples)} 個樣本"
+                    f"（{sum(durations):.0f} 秒音訊）、{cores} 核心")
+        for trial in trials:
+            raise_if_cancelled(pause_flag)
+            run_trial(engine, trial, samples, sum(durations), language, pause_flag)
+            if trial.throughput is not None:
+                threads = f"{trial.threads} 線程" if trial.threads else "預設線程數"
+                logger.info(f"{threads} x {trial.processors} 處理器: 每秒 {trial.throughput:.2f} 音訊秒")
+            if on_trial:
+                on_trial(trial)
+    return trials
+
+
+def best_trial(trials):
+    """
+    The measured combination with the highest throughput, None if every trial failed / 吞吐量最高的組合，全部失敗時為 None
+    """
+    measured = [trial for trial in trials if trial.throughput is not None]
+    return max(measured, key=lambda trial: trial.throughput) if measured else None
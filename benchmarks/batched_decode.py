@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+faster-whisper batched decoding benchmark / faster-whisper 批次解碼基準測試
+
+Transcribes the same files with FASTER_WHISPER_BATCH_SIZE set to each given size and reports / 以每個指定的 FASTER_WHISPER_BATCH_SIZE 轉錄相同的檔案，
+audio seconds per wall second and the speedup over sequential decoding (batch size 1). / 輸出每秒處理的音訊秒數，以及相對於逐段解碼（batch size 1）的加速比。
+All files go through one transcribe_many() call, so short files share forward passes. / 所有檔案在一次 transcribe_many() 中處理，短檔案會共用前向運算。
+
+Usage / 使用方式:
+    python benchmarks/batched_decode.py clip1.wav clip2.wav clip3.wav
+    python benchmarks/batched_decode.py long.wav --batch-sizes 1 4 8 16 --language ja
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engines  # noqa: E402
+from actions import get_audio_duration  # noqa: E402
+from config import config  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="faster-whisper batched decoding benchmark")
+    parser.add_argument("audio", nargs="+", help="audio files")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="batch sizes to compare")
+    parser.add_argument("--language", default="auto", help="language code (default: auto)")
+    args = parser.parse_args()
+
+    engine = engines.get_engine('faster')
+    reason = engine.unavailable_reason()
+    if reason:
+        parser.error(reason)
+
+    audio_seconds = sum(get_audio_duration(audio) for audio in args.audio)
+    windows = sum(engines.window_count(get_audio_duration(audio)) for audio in args.audio)
+    print(f"{len(args.audio)} files, {audio_seconds:.0f} s audio, {windows} windows, "
+          f"model {config.FASTER_WHISPER_MODEL} ({config.FASTER_WHISPER_COMPUTE_TYPE})")
+    # Load the model before timing / 計時前先載入模型
+    engine.load_model()
+
+    baseline = None
+    print(f"{'batch':>5} {'wall s':>8} {'audio s/s':>10} {'speedup':>8} {'segments':>9}")
+    for batch_size in args.batch_sizes:
+        config.FASTER_WHISPER_BATCH_SIZE = batch_size
+        started = time.perf_counter()
+        results = engine.transcribe_many(args.audio, args.language)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"{batch_size:>5} {elapsed:>8.1f} {audio_seconds / elapsed:>10.1f} {baseline / elapsed:>7.2f}x "
+              f"{sum(len(segments) for segments in results):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Transcription engine comparison benchmark / 轉錄引擎比較基準測試
+
+Runs every engine in engines.py on the same audio files and reports wall time, real-time factor / 以 engines.py 中的每個引擎轉錄相同的音訊檔案，
+and word error rate (character error rate for CJK text). The error rate is measured against / 輸出耗時、即時率與詞錯誤率（中日韓文字使用字元錯誤率）。
+reference transcripts (<audio>.ref.srt or --reference-dir) when present, otherwise against the / 錯誤率以參考字幕（<audio>.ref.srt 或 --reference-dir）為準，
+first engine in the list. / 沒有參考字幕時以列表中第一個引擎為準。
+
+Usage / 使用方式:
+    python benchmarks/engine_comparison.py audio1.wav audio2.wav
+    python benchmarks/engine_comparison.py audio.wav --engines cpu faster --language ja --runs 2
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engines  # noqa: E402
+from actions import get_audio_duration  # noqa: E402
+
+_CJK = re.compile(r'[぀-ヿ㐀-鿿가-힯]')
+_WORD = re.compile(r"[\w']+")
+
+
+def tokenize(text):
+    """
+    Words for alphabetic text, characters for CJK text / 字母文字以詞為單位，中日韓文字以字元為單位
+    """
+    if _CJK.search(text):
+        return [ch for ch in text if ch.isalnum()]
+    return _WORD.findall(text.lower())
+
+
+def error_rate(reference, hypothesis):
+    """
+    Levenshtein distance between token lists divided by the reference length / token 列表的編輯距離除以參考長度
+    """
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_token in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_token in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_token != hyp_token)))
+        previous = current
+    return previous[-1] / len(reference)
+
+
+def joined_text(segments):
+    return " ".join(segment.text for segment in segments)
+
+
+def find_reference(audio, reference_dir):
+    base = os.path.splitext(os.path.basename(audio))[0]
+    for directory in filter(None, (reference_dir, os.path.dirname(audio) or '.')):
+        path = os.path.join(directory, f"{base}.ref.srt")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcription engine comparison benchmark")
+    parser.add_argument("audio", nargs="+", help="audio files (wav recommended)")
+    parser.add_argument("--engines", nargs="+", default=None, help="engines to compare (default: all available)")
+    parser.add_argument("--language", default="auto", help="language code (default: auto)")
+    parser.add_argument("--runs", type=int, default=1, help="runs per engine and file, the fastest is reported")
+    parser.add_argument("--reference-dir", help="directory with <name>.ref.srt reference transcripts")
+    args = parser.parse_args()
+
+    names = args.engines or [name for name in engines.engine_names() if engines.get_engine(name).is_available()]
+    for name in names:
+        reason = engines.get_engine(name).unavailable_reason()
+        if reason:
+            parser.error(f"{name}: {reason}")
+
+    totals = {name: [0.0, 0.0, 0, 0.0] for name in names}  # wall, audio, files, error sum / 耗時、音訊、檔案數、錯誤率總和
+    print(f"{'file':<28} {'engine':<8} {'wall s':>8} {'RTF':>7} {'error':>7}  reference")
+    for audio in args.audio:
+        duration = get_audio_duration(audio)
+        reference_path = find_reference(audio, args.reference_dir)
+        reference = tokenize(joined_text(engines.read_srt(reference_path))) if reference_path else None
+        for name in names:
+            engine = engines.get_engine(name)
+            best, segments = None, []
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                segments = engine.transcribe(audio, args.language)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            tokens = tokenize(joined_text(segments))
+            if reference is None:
+                # The first engine becomes the reference / 第一個引擎作為參考
+                reference, reference_path = tokens, f"{name} output"
+            rate = error_rate(reference, tokens)
+            rtf = best / duration if duration else 0.0
+            total = totals[name]
+            total[0] += best
+            total[1] += duration
+            total[2] += 1
+            total[3] += rate
+            print(f"{os.path.basename(audio)[:28]:<28} {name:<8} {best:>8.1f} {rtf:>7.3f} {rate:>7.1%}  "
+                  f"{os.path.basename(reference_path)}")
+
+    print()
+    print(f"{'engine':<8} {'files':>5} {'wall s':>8} {'RTF':>7} {'mean error':>11}")
+    for name, (wall, audio_seconds, files, rate_sum) in totals.items():
+        rtf = wall / audio_seconds if audio_seconds else 0.0
+        print(f"{name:<8} {files:>5} {wall:>8.1f} {rtf:>7.3f} {rate_sum / max(files, 1):>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Translated logging throughput benchmark / 翻譯日誌吞吐量基準測試
+
+Compares the legacy nested-dict t() + eager format log_t with the flat-table t() and the / 比較舊版巢狀字典 t() + 立即格式化的 log_t，
+level-aware lazy log_t, for enabled (info) and disabled (debug) levels. / 與扁平對照表 t() 及依級別延遲格式化的 log_t（啟用的 info 與停用的 debug）。
+
+Usage / 使用方式:
+    python benchmarks/i18n_throughput.py [--count N] [--language en_US]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import i18n  # noqa: E402
+from i18n import LazyText, t  # noqa: E402
+
+
+class _FormattingSink(logging.Handler):
+    """
+    Handler that formats records like a real handler but writes nowhere / 像真實 handler 一樣格式化記錄但不寫出的 handler
+    """
+
+    def emit(self, record):
+        self.format(record)
+
+
+def make_logger():
+    bench_logger = logging.getLogger("i18n_benchmark")
+    bench_logger.propagate = False
+    bench_logger.setLevel(logging.INFO)
+    sink = _FormattingSink()
+    sink.setFormatter(logging.Formatter('%(asctime)s | %(levelname)s | %(message)s'))
+    bench_logger.addHandler(sink)
+    return bench_logger
+
+
+def legacy_t(translations, key, default=None):
+    """
+    Previous t(): split the key and walk nested dicts on every call / 舊版 t()：每次呼叫都分割鍵值並走訪巢狀字典
+    """
+    keys = key.split('.')
+    value = translations
+    try:
+        for k in keys:
+            value = value[k]
+        return value if value else (default if default is not None else key)
+    except (KeyError, TypeError):
+        return default if default is not None else key
+
+
+def legacy_log_t(bench_logger, translations, key, level="info", **kwargs):
+    """
+    Previous gui.log_t(): always translate and format, then pick the level / 舊版 gui.log_t()：一律翻譯與格式化後才決定級別
+    """
+    message = legacy_t(translations, f"log.{key}", key)
+    if kwargs:
+        try:
+            message = message.format(**kwargs)
+        except KeyError:
+            pass
+    if level == "info":
+        bench_logger.info(message)
+    elif level == "debug":
+        bench_logger.debug(message)
+    return message
+
+
+_LEVELS = {"debug": logging.DEBUG, "info": logging.INFO}
+
+
+def fast_log_t(bench_logger, key, level="info", **kwargs):
+    """
+    Current gui.log_t() logic / 目前 gui.log_t() 的邏輯
+    """
+    levelno = _LEVELS.get(level)
+    if levelno is None or not bench_logger.isEnabledFor(levelno):
+        return
+    bench_logger.log(levelno, LazyText(f"log.{key}", key, **kwargs))
+
+
+def rate(func, count):
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Translated logging throughput benchmark")
+    parser.add_argument("--count", type=int, default=200000, help="messages per case")
+    parser.add_argument("--language", default="en_US", help="language file to use")
+    args = parser.parse_args()
+
+    with open(i18n.get_lang_file(args.language), 'r', encoding='utf-8') as f:
+        nested = json.load(f)
+    i18n.load_language(args.language)
+    bench_logger = make_logger()
+    key = "start_cpu"
+
+    cases = [
+        ("t() lookup", lambda i: legacy_t(nested, "message.info.completed"), lambda i: t("message.info.completed")),
+        ("log_t info", lambda i: legacy_log_t(bench_logger, nested, key, "info", count=i, language="ja"),
+         lambda i: fast_log_t(bench_logger, key, "info", count=i, language="ja")),
+        ("log_t debug (disabled)", lambda i: legacy_log_t(bench_logger, nested, key, "debug", count=i, language="ja"),
+         lambda i: fast_log_t(bench_logger, key, "debug", count=i, language="ja")),
+    ]
+
+    print(f"{'case':<24} {'legacy msg/s':>14} {'current msg/s':>15} {'speedup':>8}")
+    for name, legacy, current in cases:
+        legacy_rate = rate(legacy, args.count)
+        current_rate = rate(current, args.count)
+        print(f"{name:<24} {legacy_rate:>14,.0f} {current_rate:>15,.0f} {current_rate / legacy_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
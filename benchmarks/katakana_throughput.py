@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Katakana conversion throughput benchmark / 片假名轉換吞吐量基準測試
+
+Compares the legacy per-character conversion with the run-based converter and the process pool. / 比較舊版逐字轉換、整段轉換與行程池三種方式。
+
+Usage / 使用方式:
+    python benchmarks/katakana_throughput.py [srt files...] [--files N] [--lines N] [--workers N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import katakana  # noqa: E402
+
+# Sample subtitle lines (repeated phrases, like real transcripts) / 範例字幕行（與實際逐字稿一樣有重複詞彙）
+SAMPLE_LINES = [
+    "今日は東京都の天気予報をお伝えします",
+    "明日の会議は午後三時から始まります",
+    "日本語の字幕を片仮名に変換する試験です",
+    "新幹線で大阪へ出張する予定があります",
+    "東京都庁の展望室から富士山が見えました",
+]
+
+
+def write_sample_srt(path, line_count):
+    """
+    Write a synthetic SRT file / 寫入合成的 SRT 檔案
+    """
+    blocks = []
+    for i in range(line_count):
+        start = i * 2
+        blocks.append(
+            f"{i + 1}\n"
+            f"00:{start // 60 % 60:02d}:{start % 60:02d},000 --> 00:{(start + 2) // 60 % 60:02d}:{(start + 2) % 60:02d},000\n"
+            f"{SAMPLE_LINES[i % len(SAMPLE_LINES)]}\n"
+        )
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(blocks))
+
+
+def legacy_convert(input_srt_path, output_srt_path):
+    """
+    Previous GUI implementation: new kakasi per file, one call per kanji / 舊版 GUI 實作：每個檔案建立 kakasi，每個漢字呼叫一次
+    """
+    from pykakasi import kakasi
+    kakasi_instance = kakasi()
+    kakasi_instance.setMode("J", "H")
+    kakasi_instance.setMode("H", "K")
+    conv = kakasi_instance.getConverter()
+    with open(input_srt_path, 'r', encoding='utf-8') as file:
+        srt_content = file.readlines()
+    converted_lines = []
+    for line in srt_content:
+        if not line.strip() or '-->' in line or line.strip().isdigit():
+            converted_lines.append(line)
+        else:
+            new_line = ''
+            for ch in line:
+                new_line += conv.do(ch) if katakana.is_kanji(ch) else ch
+            converted_lines.append(new_line)
+    with open(output_srt_path, 'w', encoding='utf-8') as file:
+        file.writelines(converted_lines)
+    return len(srt_content)
+
+
+def run_case(name, func, pairs):
+    start = time.perf_counter()
+    total_lines = func(pairs)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed:8.3f} s  {total_lines / elapsed:12.0f} lines/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Katakana conversion throughput benchmark")
+    parser.add_argument("srt_files", nargs="*", help="SRT files to convert (default: synthetic files)")
+    parser.add_argument("--files", type=int, default=8, help="Number of synthetic files")
+    parser.add_argument("--lines", type=int, default=2000, help="Subtitle entries per synthetic file")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = list(args.srt_files)
+        if not inputs:
+            for i in range(args.files):
+                path = os.path.join(tmp, f"sample_{i}.srt")
+                write_sample_srt(path, args.lines)
+                inputs.append(path)
+        pairs = [(path, os.path.join(tmp, f"out_{i}.srt")) for i, path in enumerate(inputs)]
+
+        print(f"{len(pairs)} files")
+        baseline = run_case("legacy per-char", lambda p: sum(legacy_convert(i, o) for i, o in p), pairs)
+        run_based = run_case("run-based (1 process)", lambda p: sum(n for _, _, n, _ in katakana.convert_files(p, max_workers=1)), pairs)
+        pooled = run_case("run-based (pool)", lambda p: sum(n for _, _, n, _ in katakana.convert_files(p, max_workers=args.workers)), pairs)
+        info = katakana.get_converter().cache_info()
+        print(f"cache hits: {info.hits}, misses: {info.misses}")
+        print(f"speedup: {baseline / run_based:.1f}x (1 process), {baseline / pooled:.1f}x (pool)")
+
+
+if __name__ == "__main__":
+    main()
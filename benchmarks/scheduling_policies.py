@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Batch scheduling policy benchmark / 批次排程策略基準測試
+
+Simulates a mixed batch (one long recording plus many short clips) under every policy in / 以 scheduler.py 的每個策略模擬混合批次
+scheduler.py and reports time-to-first-result, mean completion latency and makespan. / （一個長錄音加上許多短片段），輸出首個結果時間、平均完成延遲與總完成時間。
+
+Usage / 使用方式:
+    python benchmarks/scheduling_policies.py [--long-hours 4] [--clips 300] [--workers 1 2 4]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scheduler  # noqa: E402
+from planner import format_duration  # noqa: E402
+
+
+def make_workload(long_hours, clips, clip_min_s, clip_max_s, rtf, seed):
+    """
+    Files in the order a user would add them: the long recording first / 依使用者加入的順序產生檔案：長錄音在最前面
+
+    Returns:
+        tuple: (files, {file: audio seconds}, {file: predicted seconds}) / (檔案, {檔案: 音訊秒數}, {檔案: 預估秒數})
+    """
+    rng = random.Random(seed)
+    durations = {"long_recording.mp4": long_hours * 3600}
+    for i in range(clips):
+        durations[f"clip_{i:04d}.m4a"] = rng.uniform(clip_min_s, clip_max_s)
+    predicted = {file: seconds * rtf for file, seconds in durations.items()}
+    return list(durations), durations, predicted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch scheduling policy benchmark")
+    parser.add_argument("--long-hours", type=float, default=4, help="length of the long recording")
+    parser.add_argument("--clips", type=int, default=300, help="number of short clips")
+    parser.add_argument("--clip-min", type=float, default=15, help="shortest clip (seconds)")
+    parser.add_argument("--clip-max", type=float, default=180, help="longest clip (seconds)")
+    parser.add_argument("--rtf", type=float, default=0.3, help="engine real-time factor")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to simulate")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    files, durations, predicted = make_workload(args.long_hours, args.clips, args.clip_min, args.clip_max,
+                                                args.rtf, args.seed)
+    # Raise the clips above the long recording so 'priority' has something to do / 提高短片段的優先權，讓 'priority' 策略有差異
+    priorities = scheduler.parse_priorities("clip_*=1")
+    print(f"{len(files)} files, {format_duration(sum(durations.values()))} audio, RTF {args.rtf}")
+    print(f"{'workers':>7} {'policy':<9} {'first result':>13} {'mean latency':>13} {'makespan':>10}")
+    for workers in args.workers:
+        results = scheduler.compare_policies(files, durations, predicted, priorities, workers)
+        for policy, result in results.items():
+            print(f"{workers:>7} {policy:<9} {format_duration(result['first_result_s']):>13} "
+                  f"{format_duration(result['mean_latency_s']):>13} {format_duration(result['makespan_s']):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Speed profile benchmark / 速度設定檔基準測試
+
+Transcribes a reference set with every speed profile in profiles.py and reports wall time, / 以 profiles.py 的每個速度設定檔轉錄參考集，
+real-time factor, speedup over 'balanced' and word error rate (character error rate for CJK). / 輸出耗時、即時率、相對 'balanced' 的加速比與詞錯誤率（中日韓文字使用字元錯誤率）。
+Every audio file needs a reference transcript (<audio>.ref.srt or --reference-dir); files / 每個音訊檔案都需要參考字幕（<audio>.ref.srt 或 --reference-dir），
+without one are measured against the 'accurate' output. / 沒有參考字幕的檔案以 'accurate' 的輸出為準。
+
+Usage / 使用方式:
+    python benchmarks/speed_profiles.py refset/*.wav --engine coreml
+    python benchmarks/speed_profiles.py refset/*.wav --engine cpu --language ja --profiles fast balanced
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engines  # noqa: E402
+import profiles  # noqa: E402
+from actions import get_audio_duration  # noqa: E402
+from engine_comparison import error_rate, find_reference, joined_text, tokenize  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speed profile benchmark")
+    parser.add_argument("audio", nargs="+", help="audio files of the reference set")
+    parser.add_argument("--engine", choices=engines.engine_names(), default="cpu", help="engine to benchmark")
+    parser.add_argument("--profiles", nargs="+", choices=profiles.PROFILES, default=list(profiles.PROFILES))
+    parser.add_argument("--language", default="auto", help="language code (default: auto)")
+    parser.add_argument("--reference-dir", help="directory with <name>.ref.srt reference transcripts")
+    args = parser.parse_args()
+
+    engine = engines.get_engine(args.engine)
+    reason = engine.unavailable_reason()
+    if reason:
+        parser.error(reason)
+    # Run the reference profile first when it has to stand in for missing references / 需要代替缺少的參考字幕時，先執行參考設定檔
+    names = sorted(args.profiles, key=lambda name: name != profiles.PROFILE_ACCURATE)
+
+    totals = {name: [0.0, 0.0, 0.0] for name in names}  # wall, audio, error sum / 耗時、音訊、錯誤率總和
+    print(f"{'file':<28} {'profile':<9} {'wall s':>8} {'RTF':>7} {'error':>7}  reference")
+    for audio in args.audio:
+        duration = get_audio_duration(audio)
+        reference_path = find_reference(audio, args.reference_dir)
+        reference = tokenize(joined_text(engines.read_srt(reference_path))) if reference_path else None
+        for name in names:
+            started = time.perf_counter()
+            segments = engine.transcribe(audio, args.language, profile=name)
+            elapsed = time.perf_counter() - started
+            tokens = tokenize(joined_text(segments))
+            if reference is None:
+                reference, reference_path = tokens, f"{name} output"
+            rate = error_rate(reference, tokens)
+            total = totals[name]
+            total[0] += elapsed
+            total[1] += duration
+            total[2] += rate
+            print(f"{os.path.basename(audio)[:28]:<28} {name:<9} {elapsed:>8.1f} "
+                  f"{elapsed / duration if duration else 0.0:>7.3f} {rate:>7.1%}  {os.path.basename(reference_path)}")
+
+    print()
+    baseline = totals.get(profiles.PROFILE_BALANCED, [None])[0]
+    print(f"{'profile':<9} {'wall s':>8} {'RTF':>7} {'speedup':>8} {'mean error':>11}")
+    for name in profiles.PROFILES:
+        if name not in totals:
+            continue
+        wall, audio_seconds, rate_sum = totals[name]
+        speedup = f"{baseline / wall:.2f}x" if baseline and wall else "-"
+        print(f"{name:<9} {wall:>8.1f} {wall / audio_seconds if audio_seconds else 0.0:>7.3f} {speedup:>8} "
+              f"{rate_sum / len(args.audio):>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
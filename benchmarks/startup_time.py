@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Startup time benchmark / 啟動時間基準測試
+
+Measures cold-start time of each entry point in a fresh interpreter using `-X importtime`, / 使用 `-X importtime` 在全新的直譯器中量測每個入口點的冷啟動時間，
+lists the slowest imports and fails when a budget is exceeded or a heavy module is imported too early. / 列出最慢的匯入，超出預算或過早匯入重量級模組時以非零代碼結束。
+
+Usage / 使用方式:
+    python benchmarks/startup_time.py [--runs N] [--top N] [--budget-scale X] [--only NAME]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (interpreter arguments, import-time budget in ms, modules that must not be imported) / 名稱 -> (直譯器參數, 匯入時間預算（毫秒）, 不得匯入的模組)
+ENTRY_POINTS = {
+    "config": (["-c", "import config"], 50, ("dotenv",)),
+    "logger": (["-c", "import logger"], 75, ()),
+    "i18n": (["-c", "import i18n"], 55, ()),
+    "actions": (["-c", "import actions"], 110, ("openai", "pykakasi", "tkinter", "customtkinter", "whisper", "torch",
+                                             "numpy", "asyncio")),
+    "ai_translate": (["-c", "import ai_translate"], 60, ("openai", "srt")),
+    "cli --help": (["cli.py", "--help"], 60, ("openai", "pykakasi", "tkinter", "customtkinter", "actions")),
+    "gui": (["-c", "import gui"], 800, ("openai", "pykakasi", "whisper", "torch")),
+}
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output / 解析 `-X importtime` 輸出
+
+    Returns:
+        tuple: (total self time in us, {module: cumulative us}, {top-level module: cumulative us}) / （總 self 時間（微秒）, {模組: 累計微秒}, {頂層模組: 累計微秒}）
+    """
+    total = 0
+    cumulative = {}
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            total += int(self_us)
+            cumulative[name.strip()] = int(cumulative_us)
+            # Nested imports are indented by two spaces per level / 巢狀匯入每層縮排兩個空白
+            if not name.startswith("  "):
+                top_level[name.strip()] = int(cumulative_us)
+        except ValueError:
+            continue
+    return total, cumulative, top_level
+
+
+def measure(args, runs):
+    """
+    Run an entry point several times in fresh interpreters / 在全新的直譯器中多次執行入口點
+
+    Returns:
+        dict: Result with wall/import medians, modules of the last run, or error / 包含牆鐘/匯入時間中位數、最後一次的模組列表或錯誤的結果
+    """
+    walls, imports = [], []
+    modules, top_level = {}, {}
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=ROOT, env=env, capture_output=True, text=True
+        )
+        walls.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            last_line = (result.stderr.strip().splitlines() or ["?"])[-1]
+            return {"error": last_line}
+        total_us, modules, top_level = parse_importtime(result.stderr)
+        imports.append(total_us / 1000)
+    return {
+        "wall_ms": statistics.median(walls),
+        "import_ms": statistics.median(imports),
+        "modules": modules,
+        "top_level": top_level,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="runs per entry point (median is reported)")
+    parser.add_argument("--top", type=int, default=5, help="slowest imports listed per entry point")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply all budgets (slow machines / CI)")
+    parser.add_argument("--only", action="append", help="only measure this entry point (repeatable)")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'entry point':<14} {'wall ms':>9} {'import ms':>10} {'budget':>8}  status")
+    for name, (entry_args, budget_ms, forbidden) in ENTRY_POINTS.items():
+        if args.only and name not in args.only:
+            continue
+        result = measure(entry_args, args.runs)
+        if "error" in result:
+            # Missing optional dependency (e.g. customtkinter on a server) / 缺少可選依賴（例如伺服器上沒有 customtkinter）
+            print(f"{name:<14} {'-':>9} {'-':>10} {'-':>8}  skipped ({result['error'][:60]})")
+            continue
+
+        budget = budget_ms * args.budget_scale
+        status = "ok"
+        imported = [module for module in forbidden if module in result["modules"]]
+        if imported:
+            status = f"FAIL imports {', '.join(imported)}"
+        elif result["import_ms"] > budget:
+            status = "FAIL over budget"
+        if status != "ok":
+            failures.append(name)
+        print(f"{name:<14} {result['wall_ms']:>9.1f} {result['import_ms']:>10.1f} {budget:>8.0f}  {status}")
+
+        for module, us in sorted(result["top_level"].items(), key=lambda item: -item[1])[:args.top]:
+            print(f"{'':<14}   {us / 1000:>8.1f} ms  {module}")
+
+    if failures:
+        print(f"\nStartup regression: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
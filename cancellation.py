@@ -0,0 +1,178 @@
+"""
+Cooperative cancellation module / 協作式取消模組
+Per-job cancellation tokens that also terminate running engine process groups / 每個工作的取消權杖，並可終止執行中的引擎進程組
+
+A CancelToken behaves like threading.Event (is_set/set/wait), so it can be passed wherever / CancelToken 的行為與 threading.Event 相同（is_set/set/wait），
+a pause_flag was used before. Child processes attached to it are killed as soon as it is / 因此可以傳入原本使用 pause_flag 的地方。附加到權杖的子進程會在取消時立即被終止，
+cancelled, instead of only being checked between files. / 而不是只在檔案之間檢查。
+"""
+import os
+import signal
+import threading
+from contextlib import contextmanager
+
+from logger import logger
+
+# Seconds between SIGTERM and SIGKILL / SIGTERM 與 SIGKILL 之間的秒數
+DEFAULT_KILL_GRACE_SECONDS = 3.0
+
+
+class JobCancelled(Exception):
+    """
+    Raised when a job is cancelled while running / 工作在執行中被取消時拋出
+    """
+
+
+class CancelToken:
+    """
+    Cancellation token for one job / 單一工作的取消權杖
+    """
+
+    def __init__(self, kill_grace=DEFAULT_KILL_GRACE_SECONDS):
+        """
+        Args:
+            kill_grace: Seconds to wait after SIGTERM before SIGKILL / SIGTERM 後等待多少秒再送 SIGKILL
+        """
+        self.kill_grace = kill_grace
+        self.reason = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def is_set(self):
+        """
+        Check if cancellation was requested / 檢查是否已要求取消
+        """
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Wait until cancelled / 等待直到被取消
+
+        Returns:
+            bool: True if cancelled / 已取消返回 True
+        """
+        return self._event.wait(timeout)
+
+    def cancel(self, reason=None):
+        """
+        Request cancellation and run registered callbacks (kills attached processes) / 要求取消並執行已註冊的回調（終止附加的進程）
+
+        Args:
+            reason: Optional description / 取消原因（可選）
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"取消回調執行失敗: {e}")
+
+    # threading.Event compatibility / 與 threading.Event 相容
+    set = cancel
+
+    def add_callback(self, callback):
+        """
+        Register a function called on cancellation (runs immediately if already cancelled) / 註冊取消時呼叫的函數（若已取消則立即執行）
+
+        Args:
+            callback: Function without arguments / 無參數函數
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        """
+        Unregister a cancellation callback / 取消註冊回調
+        """
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        """
+        Raise JobCancelled if cancellation was requested / 若已要求取消則拋出 JobCancelled
+        """
+        if self.is_set():
+            raise JobCancelled(self.reason or "cancelled")
+
+
+def raise_if_cancelled(flag):
+    """
+    Raise JobCancelled if flag (CancelToken or threading.Event) is set / 若標誌（CancelToken 或 threading.Event）已設定則拋出 JobCancelled
+
+    Args:
+        flag: CancelToken, threading.Event or None / CancelToken、threading.Event 或 None
+    """
+    if flag is not None and flag.is_set():
+        raise JobCancelled(getattr(flag, "reason", None) or "cancelled")
+
+
+def terminate_process_group(process, grace=DEFAULT_KILL_GRACE_SECONDS):
+    """
+    Send SIGTERM to the process group, then SIGKILL after grace period (non-blocking) / 對進程組送出 SIGTERM，寬限期後送出 SIGKILL（不阻塞）
+
+    The process must have been started with start_new_session=True to own its group. / 進程需以 start_new_session=True 啟動才會擁有自己的進程組。
+
+    Args:
+        process: subprocess.Popen instance / subprocess.Popen 實例
+        grace: Seconds before SIGKILL / 送出 SIGKILL 前的秒數
+    """
+    if process.poll() is not None:
+        return
+
+    def _signal(sig):
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(process.pid, sig)
+            elif sig == signal.SIGTERM:
+                process.terminate()
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    logger.warning(f"終止進程組 (PID: {process.pid})")
+    _signal(signal.SIGTERM)
+
+    def _escalate():
+        try:
+            process.wait(timeout=grace)
+        except Exception:
+            logger.warning(f"進程未在 {grace} 秒內結束，強制終止 (PID: {process.pid})")
+            _signal(getattr(signal, "SIGKILL", signal.SIGTERM))
+
+    threading.Thread(target=_escalate, daemon=True).start()
+
+
+@contextmanager
+def watch_process(flag, process):
+    """
+    Kill process group when flag is cancelled while the block runs / 在區塊執行期間若被取消則終止進程組
+
+    Works with plain threading.Event too (no-op, checked by caller). / 也可使用一般 threading.Event（不做事，由呼叫端檢查）。
+
+    Args:
+        flag: CancelToken, threading.Event or None / CancelToken、threading.Event 或 None
+        process: subprocess.Popen instance / subprocess.Popen 實例
+    """
+    if not isinstance(flag, CancelToken):
+        yield
+        return
+
+    def _kill():
+        terminate_process_group(process, flag.kill_grace)
+
+    flag.add_callback(_kill)
+    try:
+        yield
+    finally:
+        flag.remove_callback(_kill)
@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+Command-line interface / 命令列介面
+Headless batch entry point over actions, ai_translate and katakana / 以 actions、ai_translate、katakana 為基礎的無介面批次入口
+
+Never imports tkinter/customtkinter; openai and pykakasi are only imported by the / 永遠不會匯入 tkinter/customtkinter；openai 與 pykakasi
+subcommand that needs them. Progress is streamed as JSON lines on stdout, logs go to stderr. / 只在需要的子命令中匯入。進度以 JSON lines 輸出到 stdout，日誌輸出到 stderr。
+
+Usage / 用法:
+    python cli.py transcribe video.mp4 --engine cpu --language ja
+    python cli.py transcribe video.mp4 --engine faster
+    python cli.py translate video.mp4 --to English
+    python cli.py katakana video_cpu.srt
+    python cli.py batch ./videos --engine coreml --translate-to English
+    python cli.py resume
+    python cli.py plan ./videos --engine cpu --translate-to English
+    python cli.py batch ./videos --policy shortest
+    python cli.py batch ./videos --profile fast
+    python cli.py transcribe meeting.m4a --vad
+    python cli.py batch ./videos --engine coreml --fallback-engine cpu
+    python cli.py autotune sample.wav --engine coreml
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import time
+
+# Exit codes / 結束代碼
+EXIT_OK = 0           # All files processed / 所有檔案處理完成
+EXIT_FAILED = 1       # One or more files failed / 一個或多個檔案失敗
+EXIT_USAGE = 2        # Invalid arguments (argparse) / 參數錯誤（argparse）
+EXIT_CONFIG = 3       # Engine, API key or module unavailable / 引擎、API Key 或模組無法使用
+EXIT_NO_INPUT = 4     # No input files found / 找不到輸入檔案
+EXIT_CANCELLED = 130  # Interrupted by SIGINT/SIGTERM / 被 SIGINT/SIGTERM 中斷
+
+# engines.engine_names(), spelled out so --help does not load config / 即 engines.engine_names()，直接列出以免 --help 載入 config
+ENGINES = ('coreml', 'cpu', 'faster')
+
+
+class EventStream:
+    """
+    Progress event writer (JSON lines or plain text) / 進度事件輸出器（JSON lines 或純文字）
+    """
+
+    def __init__(self, stream=None, fmt="json"):
+        """
+        Args:
+            stream: Output stream (default: stdout) / 輸出串流（預設 stdout）
+            fmt: 'json', 'text' or 'none' / 'json'、'text' 或 'none'
+        """
+        self.stream = stream or sys.stdout
+        self.fmt = fmt
+        self._last_percent = None
+
+    def emit(self, event, **fields):
+        """
+        Write one event / 輸出一個事件
+
+        Args:
+            event: Event name (start, progress, status, file, end) / 事件名稱
+            **fields: Event fields (JSON serializable) / 事件欄位（可 JSON 序列化）
+        """
+        if self.fmt == "none":
+            return
+        if self.fmt == "json":
+            record = {"event": event, "ts": round(time.time(), 3)}
+            record.update(fields)
+            line = json.dumps(record, ensure_ascii=False, default=str)
+        else:
+            line = f"[{event}] " + " ".join(f"{key}={value}" for key, value in fields.items())
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def progress(self, percent, step=None):
+        """
+        Progress callback for actions (only whole-percent changes are emitted) / 提供給 actions 的進度回調（只輸出整數百分比的變化）
+        """
+        percent = int(percent)
+        if percent == self._last_percent:
+            return
+        self._last_percent = percent
+        fields = {"percent": percent}
+        if step:
+            fields["step"] = step
+        self.emit("progress", **fields)
+
+    def status(self, message, level="INFO"):
+        """
+        Status callback for actions / 提供給 actions 的狀態回調
+        """
+        self.emit("status", level=level, message=message)
+
+    def reset(self):
+        """
+        Start a new progress sequence / 開始新的進度序列
+        """
+        self._last_percent = None
+
+
+class ConfigError(Exception):
+    """
+    Raised when the selected subcommand cannot run with the current configuration / 目前配置無法執行所選子命令時拋出
+    """
+
+
+# ==================== Helpers / 輔助函數 ====================
+
+def _load_config():
+    from config import config
+    return config
+
+
+def _install_signal_handlers(token):
+    """
+    Cancel the token on SIGINT/SIGTERM (running engine process groups are killed) / 收到 SIGINT/SIGTERM 時取消權杖（終止執行中的引擎進程組）
+    """
+    def _handler(signum, frame):
+        token.cancel(f"signal {signum}")
+
+    signal.signal(signal.SIGINT, _handler)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, _handler)
+
+
+def _expand_inputs(paths, predicate):
+    """
+    Expand files and directories into a de-duplicated file list / 將檔案與資料夾展開為不重複的檔案列表
+    """
+    from file_queue import FileQueue, FolderScanner
+
+    files = FileQueue()
+    for path in paths:
+        if os.path.isdir(path):
+            scanner = FolderScanner(path, predicate=predicate)
+            scanner.run()  # Scan synchronously, no GUI to keep responsive / 同步掃描，沒有需要保持回應的 GUI
+            while True:
+                batch = scanner.results.get()
+                if batch is None:
+                    break
+                files.add_many(os.path.abspath(p) for p in batch)
+        elif os.path.isfile(path):
+            files.add(os.path.abspath(path))
+        else:
+            raise FileNotFoundError(f"找不到檔案: {path}")
+    return files.snapshot()
+
+
+def _resolve_engine(engine, config):
+    import engines
+
+    if engine == 'auto':
+        engine = 'coreml' if config.is_whisper_cpp_configured() else config.CPU_ENGINE
+    reason = engines.get_engine(engine).unavailable_reason()
+    if reason:
+        raise ConfigError(reason)
+    return engine
+
+
+def _load_translator(config):
+    if not config.is_openai_configured():
+        raise ConfigError("OPENAI_API_KEY 未設定")
+    try:
+        import ai_translate
+    except Exception as e:
+        raise ConfigError(f"無法載入翻譯模組: {e}")
+    return ai_translate
+
+
+# ==================== Steps / 步驟 ====================
+
+def _transcribe(files, engine, language, events, token, journal=True, policy=None, priorities=None, profile=None,
+                vad=None, retries=None, fallback=None):
+    import actions
+    from job_journal import BatchJournal
+
+    params = {'language': language, 'policy': policy, 'priorities': priorities,
+              'profile': profile or _load_config().SPEED_PROFILE, 'vad': vad, 'retries': retries, 'fallback': fallback}
+    batch_journal = BatchJournal.create(engine, files, params) if journal else None
+    events.reset()
+    events.emit("step", step="transcribe", engine=engine, language=language, profile=params['profile'], files=len(files),
+                batch_id=batch_journal.batch_id if batch_journal else None)
+    summary = actions._run_batch(engine, files, params, events.progress, token, events.status, batch_journal)
+    return _emit_transcribe_summary(files, summary, events)
+
+
+def _emit_transcribe_summary(files, summary, events):
+    import actions
+
+    failures, outputs = summary.pop('failures'), summary.pop('outputs')
+    events.emit("schedule", step="transcribe", **summary)
+    for file in files:
+        if file in failures:
+            events.emit("file", step="transcribe", input=file, ok=False, error=failures[file])
+            continue
+        output = outputs.get(file) or actions.find_srt_file(file)
+        events.emit("file", step="transcribe", input=file, output=output, ok=output is not None)
+    return [outputs[file] for file in files if file in outputs], len(failures)
+
+
+def _translate(files, target_language, events, token, config):
+    import actions
+    ai_translate = _load_translator(config)
+
+    events.reset()
+    events.emit("step", step="translate", language=target_language, files=len(files))
+    _emit_translation_plan(files, target_language, events)
+    outputs, failed = [], 0
+    for i, file in enumerate(files):
+        token.raise_if_cancelled()
+        srt_file = actions.find_srt_file(file)
+        if not srt_file:
+            failed += 1
+            events.emit("file", step="translate", input=file, ok=False, error="srt not found")
+            continue
+        try:
+            output = ai_translate.translate_srt(srt_file, None, target_language, pause_flag=token)
+        except Exception as e:
+            token.raise_if_cancelled()
+            failed += 1
+            events.emit("file", step="translate", input=srt_file, ok=False, error=str(e))
+            continue
+        outputs.append(output)
+        events.emit("file", step="translate", input=srt_file, output=output, ok=True)
+        events.progress((i + 1) / len(files) * 100)
+    return outputs, failed
+
+
+def _katakana(files, workers, events, token):
+    import actions
+    import katakana  # pykakasi is only loaded by this step / 只有此步驟會載入 pykakasi
+
+    events.reset()
+    pairs, failed = [], 0
+    taken = set()  # Outputs handed out before any is written / 寫入前已分配的輸出
+    for file in files:
+        srt_file = actions.find_srt_file(file)
+        if srt_file in (pair[0] for pair in pairs):
+            # Same transcript as an earlier input (talk.mp4 and talk.wav) / 與較早的輸入使用相同字幕（talk.mp4 與 talk.wav）
+            continue
+        if srt_file:
+            pairs.append((srt_file, actions.get_unique_output_path(os.path.splitext(srt_file)[0], 'katakana', taken)))
+        else:
+            failed += 1
+            events.emit("file", step="katakana", input=file, ok=False, error="srt not found")
+    events.emit("step", step="katakana", files=len(pairs))
+
+    outputs = []
+    for srt_file, output, lines, error in katakana.convert_files(pairs, max_workers=workers, pause_flag=token):
+        if error is not None:
+            failed += 1
+            events.emit("file", step="katakana", input=srt_file, ok=False, error=str(error))
+            continue
+        outputs.append(output)
+        events.emit("file", step="katakana", input=srt_file, output=output, lines=lines, ok=True)
+        events.progress(len(outputs) / len(pairs) * 100)
+    token.raise_if_cancelled()
+    return outputs, failed
+
+
+def _emit_translation_plan(files, target_language, events, per_file=False):
+    """
+    Emit expected API calls, tokens and time for translating the transcripts of files / 輸出翻譯這些檔案字幕所需的 API 呼叫、token 與時間預估
+    """
+    import actions
+    import planner
+
+    srt_files = [srt_file for srt_file in map(actions.find_srt_file, files) if srt_file]
+    plan = planner.get_history().plan_translation(srt_files, target_language)
+    if per_file:
+        for entry in plan.files:
+            events.emit("plan", step="translate", **entry)
+    events.emit("plan_summary", step="translate", files=len(srt_files), missing_srt=len(files) - len(srt_files),
+                unreadable_srt=len(plan.unreadable), requests=plan.requests, prompt_tokens=plan.prompt_tokens,
+                completion_tokens=plan.completion_tokens, predicted_s=round(plan.predicted_seconds, 1))
+    return plan
+
+
+# ==================== Subcommands / 子命令 ====================
+
+def cmd_transcribe(args, events, token):
+    from file_queue import is_supported_file
+
+    config = _load_config()
+    engine = _resolve_engine(args.engine, config)
+    files = _expand_inputs(args.inputs, is_supported_file)
+    if not files:
+        return EXIT_NO_INPUT
+    _, failed = _transcribe(files, engine, args.language or config.DEFAULT_LANGUAGE, events, token,
+                            journal=not args.no_journal, policy=args.policy, priorities=args.priority,
+                            profile=args.profile, vad=args.vad or None, retries=args.retries,
+                            fallback=args.fallback_engine)
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def cmd_translate(args, events, token):
+    from file_queue import is_supported_file
+
+    config = _load_config()
+    files = _expand_inputs(args.inputs, lambda name: is_supported_file(name) or name.lower().endswith('.srt'))
+    if not files:
+        return EXIT_NO_INPUT
+    _, failed = _translate(files, args.to, events, token, config)
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def cmd_katakana(args, events, token):
+    from file_queue import is_supported_file
+
+    files = _expand_inputs(args.inputs, lambda name: is_supported_file(name) or name.lower().endswith('.srt'))
+    if not files:
+        return EXIT_NO_INPUT
+    _, failed = _katakana(files, args.workers, events, token)
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def cmd_batch(args, events, token):
+    from file_queue import is_supported_file
+
+    config = _load_config()
+    engine = _resolve_engine(args.engine, config)
+    if args.translate_to:
+        _load_translator(config)  # Fail before transcribing for hours / 在長時間轉錄前先檢查
+    files = _expand_inputs([args.directory], is_supported_file)
+    if not files:
+        return EXIT_NO_INPUT
+
+    _, failed = _transcribe(files, engine, args.language or config.DEFAULT_LANGUAGE, events, token,
+                            journal=not args.no_journal, policy=args.policy, priorities=args.priority,
+                            profile=args.profile, vad=args.vad or None, retries=args.retries,
+                            fallback=args.fallback_engine)
+    if args.translate_to:
+        failed += _translate(files, args.translate_to, events, token, config)[1]
+    if args.katakana:
+        failed += _katakana(files, args.workers, events, token)[1]
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def cmd_resume(args, events, token):
+    import actions
+    from job_journal import find_journal, list_journals
+
+    if args.batch_id:
+        journal = find_journal(args.batch_id)
+    else:
+        journals = list_journals(incomplete_only=True)
+        if not journals:
+            events.emit("status", level="INFO", message="no resumable batch")
+            return EXIT_NO_INPUT
+        journal = journals[0]
+    events.emit("step", step="resume", batch_id=journal.batch_id, engine=journal.action,
+                done=journal.done_count(), remaining=len(journal.remaining_files()))
+    files = journal.remaining_files()
+    summary = actions.resume_batch(journal, events.progress, token, events.status)
+    if summary is None:
+        events.emit("status", level="INFO", message="batch already complete")
+        return EXIT_OK
+    _, failed = _emit_transcribe_summary(files, summary, events)
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def cmd_plan(args, events, token):
+    import actions
+    import planner
+    import scheduler
+    from file_queue import is_supported_file
+
+    config = _load_config()
+    files = _expand_inputs(args.inputs, lambda name: is_supported_file(name) or name.lower().endswith('.srt'))
+    if not files:
+        return EXIT_NO_INPUT
+
+    audio_files = [file for file in files if is_supported_file(file)]
+    if audio_files:
+        # Planning does not need the engine installed / 規劃不需要安裝引擎
+        engine = args.engine
+        if engine == 'auto':
+            engine = 'coreml' if config.is_whisper_cpp_configured() else config.CPU_ENGINE
+        language = args.language or config.DEFAULT_LANGUAGE
+        profile = args.profile or config.SPEED_PROFILE
+        model = actions._metric_labels(engine, {'language': language, 'profile': profile}, None)['model']
+        durations = {file: actions.get_audio_duration(file) for file in audio_files}
+        policy = args.policy or config.SCHEDULE_POLICY
+        priorities = scheduler.parse_priorities(args.priority or config.SCHEDULE_PRIORITIES)
+        ordered = scheduler.order_files(audio_files, policy, durations, priorities)
+        plan = planner.get_history().plan_batch(engine, model, language, {file: durations[file] for file in ordered})
+        for estimate in plan.estimates:
+            events.emit("plan", step="transcribe", **estimate.to_dict())
+        predicted = {estimate.file: estimate.predicted_seconds for estimate in plan.estimates}
+        for name, result in scheduler.compare_policies(audio_files, durations, predicted, priorities).items():
+            events.emit("schedule", step="transcribe", policy=name, selected=name == policy,
+                        **{key: None if value is None else round(value, 1) for key, value in result.items()})
+        events.emit("plan_summary", step="transcribe", engine=engine, model=model, language=language, profile=profile,
+                    files=len(audio_files), audio_s=round(sum(durations.values()), 1),
+                    rtf=round(planner.get_history().rtf(engine, model, language), 4),
+                    predicted_s=round(plan.total_predicted, 1), eta=round(plan.eta()))
+    if args.translate_to:
+        _emit_translation_plan(files, args.translate_to, events, per_file=True)
+    return EXIT_OK
+
+
+def cmd_autotune(args, events, token):
+    import autotune
+    from config import save_settings
+    from file_queue import is_supported_file
+
+    config = _load_config()
+    engine = _resolve_engine(args.engine, config)
+    files = _expand_inputs(args.inputs, is_supported_file)
+    if not files:
+        return EXIT_NO_INPUT
+
+    events.emit("step", step="autotune", engine=engine, files=len(files), cores=os.cpu_count(),
+                sample_s=args.sample_seconds)
+    trials = []
+
+    def on_trial(trial):
+        trials.append(trial)
+        baseline = trials[0].throughput
+        speedup = trial.throughput / baseline if trial.throughput and baseline else None
+        events.emit("trial", step="autotune", **trial.to_dict(),
+                    speedup=None if speedup is None else round(speedup, 2))
+
+    autotune.tune(engine, files, args.language or config.DEFAULT_LANGUAGE, args.sample_seconds, token, on_trial)
+    best = autotune.best_trial(trials)
+    if best is None:
+        events.emit("error", kind="autotune", message="every trial failed")
+        return EXIT_FAILED
+    settings = best.settings(engine)
+    saved = None if args.dry_run else str(save_settings(settings))
+    baseline = trials[0].throughput
+    events.emit("autotune", engine=engine, settings=settings, throughput=round(best.throughput, 3),
+                speedup=round(best.throughput / baseline, 2) if baseline else None, saved=saved)
+    return EXIT_OK
+
+
+def build_parser():
+    """
+    Build the argument parser / 建立參數解析器
+
+    Returns:
+        argparse.ArgumentParser: Parser with all subcommands / 包含所有子命令的解析器
+    """
+    from profiles import PROFILES
+    from scheduler import POLICIES
+
+    parser = argparse.ArgumentParser(prog="cli.py", description="Whisper GUI headless batch interface")
+    parser.add_argument("--events", choices=("json", "text", "none"), default="json",
+                        help="progress event format on stdout (default: json)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only log warnings and errors to stderr")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_engine_args(p):
+        p.add_argument("--engine", choices=ENGINES + ('auto',), default='auto',
+                       help="transcription engine: coreml (whisper.cpp), cpu (openai-whisper), faster (faster-whisper int8) "
+                            "(default: coreml if whisper.cpp is configured, else CPU_ENGINE)")
+        p.add_argument("--language", help="spoken language code (default: DEFAULT_LANGUAGE)")
+        p.add_argument("--no-journal", action="store_true", help="do not record a resumable batch journal")
+        p.add_argument("--vad", action="store_true",
+                       help="send only speech to the engine, skipping silence (default: VAD_ENABLED)")
+        p.add_argument("--retries", type=int, metavar="N",
+                       help="times a failed file is tried again (default: BATCH_RETRIES)")
+        p.add_argument("--fallback-engine", choices=ENGINES,
+                       help="re-run files that still fail on this engine (default: BATCH_FALLBACK_ENGINE)")
+        add_profile_arg(p)
+        add_schedule_args(p)
+
+    def add_profile_arg(p):
+        p.add_argument("--profile", choices=PROFILES,
+                       help="speed profile: fast (greedy), balanced (engine defaults), accurate (default: SPEED_PROFILE)")
+
+    def add_schedule_args(p):
+        p.add_argument("--policy", choices=POLICIES,
+                       help="order of files in the batch (default: SCHEDULE_POLICY)")
+        p.add_argument("--priority", action="append", metavar="PATTERN=N",
+                       help="priority rule for --policy priority, repeatable (default: SCHEDULE_PRIORITIES)")
+
+    p = subparsers.add_parser("transcribe", help="transcribe audio/video files or folders")
+    p.add_argument("inputs", nargs="+")
+    add_engine_args(p)
+    p.set_defaults(func=cmd_transcribe)
+
+    p = subparsers.add_parser("translate", help="translate existing SRT files")
+    p.add_argument("inputs", nargs="+", help="SRT files, or audio files whose transcript should be translated")
+    p.add_argument("--to", required=True, help="target language")
+    p.set_defaults(func=cmd_translate)
+
+    p = subparsers.add_parser("katakana", help="convert kanji in SRT files to katakana")
+    p.add_argument("inputs", nargs="+")
+    p.add_argument("--workers", type=int, default=None, help="process count (default: CPU count)")
+    p.set_defaults(func=cmd_katakana)
+
+    p = subparsers.add_parser("batch", help="transcribe a folder, then optionally translate / convert")
+    p.add_argument("directory")
+    add_engine_args(p)
+    p.add_argument("--translate-to", help="translate transcripts to this language")
+    p.add_argument("--katakana", action="store_true", help="also write katakana transcripts")
+    p.add_argument("--workers", type=int, default=None, help="katakana process count")
+    p.set_defaults(func=cmd_batch)
+
+    p = subparsers.add_parser("resume", help="resume an interrupted transcription batch")
+    p.add_argument("batch_id", nargs="?", help="batch id (default: most recent interrupted batch)")
+    p.set_defaults(func=cmd_resume)
+
+    p = subparsers.add_parser("plan", help="predict processing time, ETA and translation cost without running")
+    p.add_argument("inputs", nargs="+")
+    p.add_argument("--engine", choices=ENGINES + ('auto',), default='auto', help="transcription engine to plan for")
+    p.add_argument("--language", help="spoken language code (default: DEFAULT_LANGUAGE)")
+    p.add_argument("--translate-to", help="also estimate translating existing transcripts to this language")
+    add_profile_arg(p)
+    add_schedule_args(p)
+    p.set_defaults(func=cmd_plan)
+
+    p = subparsers.add_parser("autotune", help="measure engine thread/processor settings and save the fastest")
+    p.add_argument("inputs", nargs="+", help="audio/video files to cut sample clips from")
+    p.add_argument("--engine", choices=ENGINES + ('auto',), default='auto', help="engine to tune")
+    p.add_argument("--language", help="spoken language code (default: DEFAULT_LANGUAGE)")
+    p.add_argument("--sample-seconds", type=float, default=30, help="sample length cut from each file (default: 30)")
+    p.add_argument("--dry-run", action="store_true", help="report the measurements without saving to .env")
+    p.set_defaults(func=cmd_autotune)
+    return parser
+
+
+def main(argv=None):
+    """
+    CLI entry point / 命令列入口
+
+    Returns:
+        int: Exit code / 結束代碼
+    """
+    args = build_parser().parse_args(argv)
+    events = EventStream(fmt=args.events)
+
+    from cancellation import CancelToken, JobCancelled
+    from logger import logger, set_console_level
+
+    if args.quiet:
+        set_console_level(logging.WARNING)
+
+    token = CancelToken()
+    _install_signal_handlers(token)
+    started = time.time()
+    events.emit("start", command=args.command)
+    try:
+        code = args.func(args, events, token)
+        if code == EXIT_NO_INPUT:
+            events.emit("error", kind="no_input", message="no input files found")
+    except JobCancelled as e:
+        code = EXIT_CANCELLED
+        events.emit("error", kind="cancelled", message=str(e))
+    except ConfigError as e:
+        code = EXIT_CONFIG
+        events.emit("error", kind="config", message=str(e))
+    except FileNotFoundError as e:
+        code = EXIT_NO_INPUT
+        events.emit("error", kind="not_found", message=str(e))
+    except Exception as e:
+        code = EXIT_CANCELLED if token.is_set() else EXIT_FAILED
+        logger.exception(f"CLI 執行失敗: {e}")
+        events.emit("error", kind="failed", message=str(e))
+    events.emit("end", exit_code=code, elapsed=round(time.time() - started, 3))
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,33 +5,112 @@ Supports environment variables and default values, priority order: / 支援環
 1. Environment variables / 環境變數
 2. .env file (if python-dotenv is installed) / .env 檔案（如果安裝了 python-dotenv）
 3. Default values / 預設值
+
+Settings are resolved on first access, so importing this module performs no I/O. / 設定在第一次存取時才解析，因此匯入此模組不會進行任何 I/O。
 """
 
 import os
 from pathlib import Path
 
-# Try to load .env file (if python-dotenv is installed) / 嘗試載入 .env 檔案（如果安裝了 python-dotenv）
-try:
-    from dotenv import load_dotenv
-    # Explicitly specify .env file path (relative to this file) / 明確指定 .env 檔案路徑（相對於此檔案的位置）
-    env_path = Path(__file__).parent / '.env'
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path, override=True)
-        # Check if API Key was successfully loaded (don't display full content) / 檢查是否成功載入 API Key（不顯示完整內容）
-        api_key = os.getenv('OPENAI_API_KEY', '')
-        if api_key:
-            print(f"✓ 已載入 .env 檔案: {env_path}")
+_env_loaded = False
+
+
+def load_env():
+    """
+    Load .env file once (if python-dotenv is installed) / 載入 .env 檔案一次（如果安裝了 python-dotenv）
+    
+    Called on first access of a setting, so importing this module has no side effects. / 在第一次存取設定時呼叫，因此匯入此模組不會有副作用。
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    import logging
+    log = logging.getLogger("whisper_gui")
+    try:
+        from dotenv import load_dotenv
+        # Explicitly specify .env file path (relative to this file) / 明確指定 .env 檔案路徑（相對於此檔案的位置）
+        env_path = Path(__file__).parent / '.env'
+        if env_path.exists():
+            load_dotenv(dotenv_path=env_path, override=True)
+            # Check if API Key was successfully loaded (don't display full content) / 檢查是否成功載入 API Key（不顯示完整內容）
+            if os.getenv('OPENAI_API_KEY', ''):
+                log.info(f"✓ 已載入 .env 檔案: {env_path}")
+            else:
+                log.warning(".env 檔案存在但 OPENAI_API_KEY 未設定")
         else:
-            print(f"⚠️  .env 檔案存在但 OPENAI_API_KEY 未設定")
-    else:
-        # If doesn't exist, try current working directory / 如果不存在，嘗試當前工作目錄
-        load_dotenv(override=True)
-except ImportError:
-    # If python-dotenv is not installed, prompt user to install / 如果沒有安裝 python-dotenv，提示用戶安裝
-    print("⚠️  python-dotenv 未安裝，無法載入 .env 檔案")
-    print("   請執行: pip install python-dotenv")
-except Exception as e:
-    print(f"⚠️  載入 .env 檔案時發生錯誤: {e}")
+            # If doesn't exist, try current working directory / 如果不存在，嘗試當前工作目錄
+            load_dotenv(override=True)
+    except ImportError:
+        # If python-dotenv is not installed, prompt user to install / 如果沒有安裝 python-dotenv，提示用戶安裝
+        log.warning("python-dotenv 未安裝，無法載入 .env 檔案，請執行: pip install python-dotenv")
+    except Exception as e:
+        log.warning(f"載入 .env 檔案時發生錯誤: {e}")
+
+
+def save_settings(values, env_path=None):
+    """
+    Write settings into the .env file and apply them to this process / 將設定寫入 .env 檔案並套用到目前進程
+
+    Existing KEY=value lines are replaced in place, new keys are appended; other lines and / 既有的 KEY=value 行會就地取代，新的鍵附加在最後；
+    comments are kept. / 其他行與註解保持不變。
+
+    Args:
+        values: {setting name: value} / {設定名稱: 值}
+        env_path: .env file (default: .env next to this file) / .env 檔案（預設：此檔案旁的 .env）
+
+    Returns:
+        Path: The written file / 寫入的檔案
+    """
+    env_path = Path(env_path) if env_path else Path(__file__).parent / '.env'
+    lines = env_path.read_text(encoding='utf-8').splitlines() if env_path.exists() else []
+    pending = {name: str(value) for name, value in values.items()}
+    for i, line in enumerate(lines):
+        name = line.split('=', 1)[0].strip()
+        if '=' in line and not line.lstrip().startswith('#') and name in pending:
+            lines[i] = f"{name}={pending.pop(name)}"
+    lines.extend(f"{name}={value}" for name, value in pending.items())
+    tmp_path = env_path.with_name(env_path.name + '.tmp')
+    tmp_path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    os.replace(tmp_path, env_path)
+    for name, value in values.items():
+        os.environ[name] = str(value)
+        # Replace values that were already resolved / 取代已經解析過的值
+        if name in vars(Config) and not isinstance(vars(Config)[name], _Setting):
+            setattr(Config, name, value)
+    return env_path
+
+
+def _bool(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+class _Setting:
+    """
+    Environment setting resolved on first access / 第一次存取時才解析的環境變數設定
+    
+    The resolved value replaces the descriptor on the class, so later reads are plain attribute lookups. / 解析後的值會取代類別上的描述器，之後的讀取就是一般屬性查詢。
+    """
+    
+    def __init__(self, default, cast=str):
+        """
+        Args:
+            default: Default value (string, as read from the environment) / 預設值（字串，與環境變數相同）
+            cast: Conversion function (e.g., int) / 轉換函數（例如 int）
+        """
+        self.default = default
+        self.cast = cast
+        self.name = None
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, obj, owner=None):
+        owner = owner or type(obj)
+        load_env()
+        value = self.cast(os.getenv(self.name, self.default))
+        setattr(owner, self.name, value)
+        return value
 
 
 class Config:
@@ -40,42 +119,131 @@ class Config:
     """
     
     # ==================== OpenAI API Settings / OpenAI API 設定 ====================
-    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
-    OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o')
-    OPENAI_MAX_CHUNK_SIZE = int(os.getenv('OPENAI_MAX_CHUNK_SIZE', '500'))
+    OPENAI_API_KEY = _Setting('')
+    OPENAI_MODEL = _Setting('gpt-4o')
+    OPENAI_MAX_CHUNK_SIZE = _Setting('500', int)
     
     # ==================== Whisper.cpp Path Settings / Whisper.cpp 路徑設定 ====================
     # Default path (can be overridden via environment variable) / 預設路徑（可以透過環境變數覆蓋）
     # Note: whisper.cpp has deprecated 'main', now uses 'whisper-cli' / 注意：whisper.cpp 已棄用 'main'，改用 'whisper-cli'
-    WHISPER_CPP_PATH = os.getenv(
-        'WHISPER_CPP_PATH',
-        '/Users/waynetu/my_tool_box/whisper.cpp/build/bin/whisper-cli'
-    )
-    WHISPER_MODEL_PATH = os.getenv(
-        'WHISPER_MODEL_PATH',
-        '/Users/waynetu/my_tool_box/whisper.cpp/models/ggml-large-v3-turbo.bin'
-    )
+    WHISPER_CPP_PATH = _Setting('/Users/waynetu/my_tool_box/whisper.cpp/build/bin/whisper-cli')
+    WHISPER_MODEL_PATH = _Setting('/Users/waynetu/my_tool_box/whisper.cpp/models/ggml-large-v3-turbo.bin')
+    # whisper.cpp -t threads (0 = whisper.cpp default) and -p processors / whisper.cpp -t 線程數（0 = whisper.cpp 預設值）與 -p 處理器數
+    WHISPER_CPP_THREADS = _Setting('0', int)
+    WHISPER_CPP_PROCESSORS = _Setting('1', int)
     
     # ==================== CPU Whisper Settings / CPU Whisper 設定 ====================
     # Note: Model names for openai-whisper / 注意：openai-whisper 的模型名稱
     # Available models: tiny, base, small, medium, large, turbo / 可用模型：tiny, base, small, medium, large, turbo
     # turbo is an optimized version, faster speed (default model) / turbo 是優化版本，速度更快（預設模型）
     # Reference: https://github.com/openai/whisper / 參考：https://github.com/openai/whisper
-    CPU_WHISPER_MODEL = os.getenv('CPU_WHISPER_MODEL', 'turbo')
+    CPU_WHISPER_MODEL = _Setting('turbo')
+    # torch threads of the openai-whisper CLI (--threads, 0 = torch default) / openai-whisper 命令列的 torch 線程數（--threads，0 = torch 預設值）
+    CPU_WHISPER_THREADS = _Setting('0', int)
+    
+    # Engine used by the CPU button: 'cpu' (openai-whisper) or 'faster' (faster-whisper int8) / CPU 按鈕使用的引擎：'cpu'（openai-whisper）或 'faster'（faster-whisper int8）
+    CPU_ENGINE = _Setting('cpu')
+    
+    # ==================== faster-whisper Settings / faster-whisper 設定 ====================
+    # Model name or CTranslate2 model directory / 模型名稱或 CTranslate2 模型目錄
+    FASTER_WHISPER_MODEL = _Setting('turbo')
+    # Weight precision: int8, int8_float32, float32 / 權重精度：int8、int8_float32、float32
+    FASTER_WHISPER_COMPUTE_TYPE = _Setting('int8')
+    # CPU threads (0 = all cores) / CPU 線程數（0 = 所有核心）
+    FASTER_WHISPER_THREADS = _Setting('0', int)
+    FASTER_WHISPER_BEAM_SIZE = _Setting('5', int)
+    # 30-second windows decoded per forward pass (1 = sequential); short queued files share batches / 每次前向運算解碼的 30 秒視窗數（1 = 逐段）；排隊中的短檔案共用批次
+    FASTER_WHISPER_BATCH_SIZE = _Setting('1', int)
+    
+    # ==================== Silence Trimming / 靜音裁切 ====================
+    # Send only speech spans to the engine (needs ffmpeg) / 只將語音區段送入引擎（需要 ffmpeg）
+    VAD_ENABLED = _Setting('false', _bool)
+    # Level below which audio counts as silence (dBFS) / 低於此音量視為靜音（dBFS）
+    VAD_NOISE_DB = _Setting('-35', float)
+    # Shortest silence that is cut (seconds) / 會被裁切的最短靜音（秒）
+    VAD_MIN_SILENCE_SECONDS = _Setting('1.0', float)
+    # Audio kept on both sides of each speech span (seconds) / 每個語音區段前後保留的音訊（秒）
+    VAD_PADDING_SECONDS = _Setting('0.2', float)
+    
+    # ==================== Scratch Space / 暫存空間 ====================
+    # Directory for decoded intermediate audio, e.g. on a RAM disk (empty = <tmp>/whisper_gui_scratch) / 解碼中間音訊的目錄，例如 RAM 磁碟（空白 = <tmp>/whisper_gui_scratch）
+    SCRATCH_DIR = _Setting('')
+    # Size limit of the scratch directory in MB, least recently used files are removed first (0 = unlimited) / 暫存目錄大小上限（MB），先移除最久未使用的檔案（0 = 不限制）
+    SCRATCH_QUOTA_MB = _Setting('2048', int)
+    
+    # ==================== Speed Profile / 速度設定檔 ====================
+    # Decoding preset for both engines: fast, balanced or accurate / 兩種引擎共用的解碼預設：fast、balanced 或 accurate
+    SPEED_PROFILE = _Setting('balanced')
     
     # ==================== Default Parameters / 預設參數 ====================
-    DEFAULT_LANGUAGE = os.getenv('DEFAULT_LANGUAGE', 'auto')
-    DEFAULT_MODEL = os.getenv('DEFAULT_MODEL', 'turbo')  # Note: openai-whisper uses 'turbo', not 'large-v3-turbo' / 注意：openai-whisper 使用 'turbo'，不是 'large-v3-turbo'
+    DEFAULT_LANGUAGE = _Setting('auto')
+    DEFAULT_MODEL = _Setting('turbo')  # Note: openai-whisper uses 'turbo', not 'large-v3-turbo' / 注意：openai-whisper 使用 'turbo'，不是 'large-v3-turbo'
     
     # ==================== Translation Settings / 翻譯設定 ====================
-    TRANSLATE_CHUNK_SIZE = int(os.getenv('TRANSLATE_CHUNK_SIZE', '500'))
-    TRANSLATE_SYSTEM_PROMPT = os.getenv(
-        'TRANSLATE_SYSTEM_PROMPT',
-        '你是一個翻譯專家，幫我翻譯成{target_language}，禁止使用簡體中文。結果要語句通順且好懂的翻譯結果。只需要輸出翻譯結果'
-    )
+    TRANSLATE_CHUNK_SIZE = _Setting('500', int)
+    TRANSLATE_SYSTEM_PROMPT = _Setting('你是一個翻譯專家，幫我翻譯成{target_language}，禁止使用簡體中文。結果要語句通順且好懂的翻譯結果。只需要輸出翻譯結果')
+    
+    # ==================== Job Executor Settings / 工作執行器設定 ====================
+    # Concurrent transcription batches (each engine already uses all cores) / 同時執行的轉錄批次數（每個引擎本身已使用所有核心）
+    ENGINE_SLOTS = _Setting('1', int)
+    # Concurrent translation batches (OpenAI API) / 同時執行的翻譯批次數（OpenAI API）
+    TRANSLATION_SLOTS = _Setting('1', int)
+    
+    # Order of files inside a batch: fifo, shortest, longest or priority / 批次內檔案的處理順序：fifo、shortest、longest 或 priority
+    SCHEDULE_POLICY = _Setting('fifo')
+    # Priority rules for the 'priority' policy: 'pattern=N,pattern=N' (higher first) / 'priority' 策略的規則：'pattern=N,pattern=N'（高者優先）
+    SCHEDULE_PRIORITIES = _Setting('')
+    
+    # Engine timeout = predicted time (from real-time factor history) x factor, at least the minimum (seconds) / 引擎超時 = 預估時間（依即時率歷史）x 倍數，至少為最小值（秒）
+    ENGINE_TIMEOUT_FACTOR = _Setting('4', float)
+    ENGINE_TIMEOUT_MIN = _Setting('600', int)
+    
+    # Memory budget for concurrent engine processes in MB (0 = 75% of physical memory) / 同時執行的引擎進程記憶體預算（MB，0 = 實體記憶體的 75%）
+    MEMORY_BUDGET_MB = _Setting('0', int)
+    # Seconds between RSS samples of running engines / 執行中引擎的 RSS 取樣間隔（秒）
+    MEMORY_SAMPLE_INTERVAL = _Setting('2', float)
+    
+    # Record batches in journals/ so interrupted runs can be resumed / 將批次記錄在 journals/，中斷後可以恢復
+    JOURNAL_ENABLED = _Setting('true', _bool)
+    # Completed journals kept in journals/, oldest deleted first (0 = keep all) / journals/ 中保留的已完成日誌數量，最舊的先刪除（0 = 全部保留）
+    JOURNAL_KEEP = _Setting('50', int)
+    # Times a failed file is tried again at the end of the batch / 失敗的檔案在批次結尾重試的次數
+    BATCH_RETRIES = _Setting('1', int)
+    # Seconds before the first retry, doubled for each further one / 第一次重試前等待的秒數，之後每次加倍
+    BATCH_RETRY_BACKOFF = _Setting('5', float)
+    # Engine that re-runs files still failing after the retries (empty = none), e.g. cpu / 重試後仍失敗的檔案改用的引擎（空白 = 不使用），例如 cpu
+    BATCH_FALLBACK_ENGINE = _Setting('')
+    
+    # ==================== Logging Settings / 日誌設定 ====================
+    # Rotate the daily log file when it exceeds this size (0 = only rotate daily) / 每日日誌檔案超過此大小時輪替（0 = 只依日期輪替）
+    LOG_MAX_BYTES = _Setting('10485760', int)
+    # Number of rotated log archives kept (0 = keep all) / 保留的輪替日誌數量（0 = 全部保留）
+    LOG_BACKUP_COUNT = _Setting('30', int)
+    # Gzip rotated log files / 以 gzip 壓縮輪替後的日誌檔案
+    LOG_COMPRESS = _Setting('true', _bool)
+    # Record function name and line number in the log file / 在日誌檔案中記錄函數名稱與行號
+    LOG_CALLER_INFO = _Setting('true', _bool)
+    # Engine output lines logged per second and process, over it lines are only counted (0 = no limit) / 每個引擎進程每秒記錄的輸出行數，超過時只計數（0 = 不限制）
+    ENGINE_LOG_LINES_PER_SECOND = _Setting('5', float)
+    # Engine output lines logged at once before the rate applies / 套用速率前可一次記錄的引擎輸出行數
+    ENGINE_LOG_BURST = _Setting('20', int)
+    # Last engine output lines kept per stream for error messages / 每個串流保留供錯誤訊息使用的最後幾行引擎輸出
+    ENGINE_OUTPUT_TAIL_LINES = _Setting('200', int)
+    # Keep the complete engine output gzip'ed in this directory (empty = off) / 將完整的引擎輸出以 gzip 保存在此目錄（空白 = 停用）
+    ENGINE_OUTPUT_RAW_DIR = _Setting('')
+    # Number of raw engine output files kept (0 = keep all) / 保留的原始引擎輸出檔數量（0 = 全部保留）
+    ENGINE_OUTPUT_RAW_KEEP = _Setting('50', int)
+    
+    # ==================== Metrics Settings / 效能指標設定 ====================
+    # Write per-stage timing to metrics/stages.jsonl and metrics/whisper_gui.prom / 將各階段耗時寫入 metrics/stages.jsonl 與 metrics/whisper_gui.prom
+    METRICS_ENABLED = _Setting('true', _bool)
+    # Metrics output directory (empty = metrics/ in the project, e.g. a node_exporter textfile directory) / 指標輸出目錄（空白 = 專案內的 metrics/，例如 node_exporter 的 textfile 目錄）
+    METRICS_DIR = _Setting('')
     
     # ==================== GUI Settings / GUI 設定 ====================
-    GUI_LANGUAGE = os.getenv('GUI_LANGUAGE', 'en_US')  # Default Traditional Chinese, can set to 'en_US' for English / 預設繁體中文，可設定為 'en_US' 使用英文
+    # Dashboard refresh rate (frames per second), independent of how many workers report / 儀表板更新頻率（每秒幀數），與回報的工作線程數量無關
+    DASHBOARD_FPS = _Setting('4', float)
+    GUI_LANGUAGE = _Setting('en_US')  # Default Traditional Chinese, can set to 'en_US' for English / 預設繁體中文，可設定為 'en_US' 使用英文
     
     @classmethod
     def validate(cls):
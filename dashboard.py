@@ -0,0 +1,165 @@
+"""
+Live dashboard module / 即時儀表板模組
+Throughput panel rendered from the event bus at a fixed frame rate / 以固定幀率從事件匯流排渲染的吞吐量面板
+
+Shows files in flight, job queue depth, audio seconds processed per wall second, per-engine / 顯示處理中的檔案、工作佇列深度、每秒處理的音訊秒數、
+real-time factor, translation requests per minute and cache hit rates. / 各引擎即時率、每分鐘翻譯請求數與快取命中率。
+"""
+import time
+from collections import deque
+
+from event_bus import (
+    bus as default_bus, KEY_FILES_IN_FLIGHT, KEY_AUDIO_SECONDS, KEY_TRANSLATE_REQUESTS,
+    KEY_QUEUE_DEPTH, KEY_JOBS_RUNNING, KEY_BATCH_ETA, RTF_PREFIX, CACHE_PREFIX,
+)
+from i18n import t
+from planner import format_duration
+
+# Default refresh rate (frames per second) / 預設更新頻率（每秒幀數）
+DEFAULT_FPS = 4
+
+# Rate windows in seconds / 速率計算視窗（秒）
+THROUGHPUT_WINDOW_S = 30
+REQUEST_WINDOW_S = 60
+
+
+class RateWindow:
+    """
+    Rate of a growing counter over a sliding time window / 滑動時間視窗內累計計數器的增加速率
+    """
+
+    def __init__(self, window_s):
+        """
+        Args:
+            window_s: Window length in seconds / 視窗長度（秒）
+        """
+        self.window_s = window_s
+        self._samples = deque()
+
+    def sample(self, now, value):
+        """
+        Record the counter value at a point in time / 記錄某一時間點的計數器值
+        """
+        self._samples.append((now, value))
+        while len(self._samples) > 2 and now - self._samples[1][0] >= self.window_s:
+            self._samples.popleft()
+
+    def rate(self):
+        """
+        Increase per second over the window (0 until two samples exist) / 視窗內每秒增加量（少於兩個樣本時為 0）
+        """
+        if len(self._samples) < 2:
+            return 0.0
+        (t0, v0), (t1, v1) = self._samples[0], self._samples[-1]
+        if t1 <= t0:
+            return 0.0
+        return max(0.0, (v1 - v0) / (t1 - t0))
+
+
+def _cache_rates(counters):
+    """
+    Hit rate per cache from 'cache.<name>.hits' / 'cache.<name>.misses' counters / 由 'cache.<name>.hits' / 'cache.<name>.misses' 計數器計算各快取命中率
+
+    Returns:
+        dict: {name: (hits, lookups)} / {名稱: (命中數, 查詢數)}
+    """
+    caches = {}
+    for key, value in counters.items():
+        if not key.startswith(CACHE_PREFIX):
+            continue
+        name, _, kind = key[len(CACHE_PREFIX):].rpartition(".")
+        hits, lookups = caches.get(name, (0, 0))
+        if kind == "hits":
+            caches[name] = (hits + value, lookups + value)
+        elif kind == "misses":
+            caches[name] = (hits, lookups + value)
+    return caches
+
+
+class DashboardPanel:
+    """
+    Renders the event bus into a label (CTkLabel or tk.Label) / 將事件匯流排渲染到標籤（CTkLabel 或 tk.Label）
+    """
+
+    def __init__(self, label, bus=None, fps=DEFAULT_FPS):
+        """
+        Args:
+            label: Widget with configure(text=...) / 具有 configure(text=...) 的元件
+            bus: EventBus to read (default: process-wide bus) / 要讀取的 EventBus（預設為整個進程共用的匯流排）
+            fps: Refresh rate / 更新頻率
+        """
+        self.label = label
+        self.bus = bus or default_bus
+        self.interval_ms = max(1, int(1000 / max(fps, 0.1)))
+        self.audio_rate = RateWindow(THROUGHPUT_WINDOW_S)
+        self.request_rate = RateWindow(REQUEST_WINDOW_S)
+        self._text = None
+
+    def render(self, gauges, counters):
+        """
+        Build the panel text / 產生面板文字
+
+        Returns:
+            str: Multi-line panel text / 多行面板文字
+        """
+        none = t("dashboard.none", "-")
+        rtf = " · ".join(
+            f"{key[len(RTF_PREFIX):]} {value:.2f}"
+            for key, value in sorted(gauges.items()) if key.startswith(RTF_PREFIX)
+        ) or none
+        caches = " · ".join(
+            f"{name} {hits / lookups:.0%} ({hits}/{lookups})"
+            for name, (hits, lookups) in sorted(_cache_rates(counters).items()) if lookups
+        ) or none
+        finish = gauges.get(KEY_BATCH_ETA)
+        eta = none if finish is None else t("dashboard.eta", "{remaining} (at {finish})").format(
+            remaining=format_duration(max(0, finish - time.time())),
+            finish=time.strftime("%H:%M", time.localtime(finish)))
+        return "\n".join([
+            t("dashboard.in_flight", "Files in flight: {files}   Jobs: {running} running, {queued} queued   ETA: {eta}").format(
+                files=max(0, counters.get(KEY_FILES_IN_FLIGHT, 0)),
+                running=gauges.get(KEY_JOBS_RUNNING, 0),
+                queued=gauges.get(KEY_QUEUE_DEPTH, 0),
+                eta=eta),
+            t("dashboard.throughput", "Throughput: {rate:.1f} audio-s/s   RTF: {rtf}").format(
+                rate=self.audio_rate.rate(), rtf=rtf),
+            t("dashboard.translation", "Translation: {rate:.1f} requests/min   Cache hit rate: {caches}").format(
+                rate=self.request_rate.rate() * 60, caches=caches),
+        ])
+
+    def tick(self, now=None):
+        """
+        Sample the bus and redraw if the text changed (call from Tk main thread) / 取樣匯流排，文字改變時重繪（需在 Tk 主線程呼叫）
+
+        Returns:
+            bool: True if the widget was updated / 有更新元件時返回 True
+        """
+        now = time.monotonic() if now is None else now
+        _, gauges, counters = self.bus.snapshot()
+        # Sample every frame so rates decay to zero when work stops / 每一幀都取樣，工作停止時速率會降為零
+        self.audio_rate.sample(now, counters.get(KEY_AUDIO_SECONDS, 0))
+        self.request_rate.sample(now, counters.get(KEY_TRANSLATE_REQUESTS, 0))
+        text = self.render(gauges, counters)
+        if text == self._text:
+            return False
+        self._text = text
+        self.label.configure(text=text)
+        return True
+
+    def start(self, root, on_error=None):
+        """
+        Start periodic rendering with root.after() / 使用 root.after() 開始定期渲染
+
+        Args:
+            root: Tk root window / Tk 主視窗
+            on_error: Callback receiving exceptions raised while rendering (optional) / 渲染發生例外時的回調（可選）
+        """
+        def _poll():
+            try:
+                self.tick()
+            except Exception as e:
+                if on_error:
+                    on_error(e)
+            root.after(self.interval_ms, _poll)
+
+        _poll()
@@ -0,0 +1,459 @@
+"""
+Transcription engine module / 轉錄引擎模組
+Common transcribe-to-segments contract and the registry of available engines / 共用的「轉錄為字幕段落」介面與可用引擎的註冊表
+
+Engines / 引擎:
+    coreml - whisper.cpp with the CoreML encoder, run as a subprocess / whisper.cpp（CoreML 編碼器），以子進程執行
+    cpu    - openai-whisper CLI (fp32 PyTorch), run as a subprocess / openai-whisper 命令列（fp32 PyTorch），以子進程執行
+    faster - faster-whisper (CTranslate2, int8 on CPU), in process with the model kept loaded / faster-whisper（CTranslate2，CPU int8），在進程內執行並保持模型載入
+
+Every engine returns a list of Segment from transcribe(); transcribe_to_srt() writes them to / 每個引擎的 transcribe() 都返回 Segment 列表；
+an SRT file. The subprocess engines write SRT themselves and are parsed back when segments are needed. / transcribe_to_srt() 將其寫成 SRT。子進程引擎自行寫出 SRT，需要段落時再解析回來。
+"""
+import bisect
+import importlib.util
+import os
+import tempfile
+import threading
+import time
+
+import profiles
+from config import config
+from logger import logger
+from cancellation import raise_if_cancelled
+
+
+class Segment:
+    """
+    One transcribed segment / 一個轉錄段落
+    """
+
+    __slots__ = ("start", "end", "text")
+
+    def __init__(self, start, end, text):
+        """
+        Args:
+            start: Start time in seconds / 開始時間（秒）
+            end: End time in seconds / 結束時間（秒）
+            text: Transcribed text / 轉錄文字
+        """
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __repr__(self):
+        return f"<Segment {self.start:.2f}-{self.end:.2f} {self.text[:20]!r}>"
+
+
+def write_srt(segments, path):
+    """
+    Write segments to an SRT file (atomically) / 將段落寫入 SRT 檔案（原子寫入）
+    """
+    import srt
+    from datetime import timedelta
+
+    subtitles = [
+        srt.Subtitle(index=i, start=timedelta(seconds=segment.start), end=timedelta(seconds=segment.end),
+                     content=segment.text)
+        for i, segment in enumerate(segments, 1)
+    ]
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(srt.compose(subtitles))
+    os.replace(tmp_path, path)
+
+
+def read_srt(path):
+    """
+    Read an SRT file as segments / 將 SRT 檔案讀取為段落
+    """
+    import srt
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return [
+            Segment(subtitle.start.total_seconds(), subtitle.end.total_seconds(), subtitle.content)
+            for subtitle in srt.parse(f.read())
+        ]
+
+
+class Engine:
+    """
+    Base class of transcription engines / 轉錄引擎的基礎類別
+
+    Subclasses set name/suffix/description and implement transcribe() or transcribe_to_srt(). / 子類別設定 name/suffix/description，並實作 transcribe() 或 transcribe_to_srt()。
+    """
+
+    name = None           # Registry key, batch mode and journal action / 註冊鍵、批次模式與日誌動作名稱
+    suffix = None         # Output file suffix (video_<suffix>.srt) / 輸出檔案後綴（video_<suffix>.srt）
+    description = None    # Human readable name / 易讀名稱
+    in_process = False    # Runs inside this process (no child to sample or kill) / 在目前進程內執行（沒有可取樣或終止的子進程）
+    decodes_input = False # Decodes any container and sample rate itself (no 16 kHz WAV needed) / 自行解碼任何格式與取樣率（不需要 16 kHz WAV）
+
+    @property
+    def batch_size(self):
+        """
+        30-second windows decoded per forward pass (1: no batching) / 每次前向運算解碼的 30 秒視窗數（1：不批次）
+        """
+        return 1
+
+    def unavailable_reason(self):
+        """
+        Why the engine cannot run here / 引擎無法在此執行的原因
+
+        Returns:
+            str: Reason, or None if the engine is available / 原因，可以使用時為 None
+        """
+        return None
+
+    def is_available(self):
+        return self.unavailable_reason() is None
+
+    def unload(self):
+        """
+        Release models kept loaded by in-process engines / 釋放進程內引擎保持載入的模型
+        """
+
+    def model_label(self):
+        """
+        Short model name used in metrics and the planner / 指標與規劃器使用的簡短模型名稱
+        """
+        return self.model_ref()
+
+    def model_ref(self):
+        """
+        Model identifier used for memory estimates (path or name) / 記憶體預估使用的模型識別（路徑或名稱）
+        """
+        raise NotImplementedError
+
+    def transcribe(self, audio_path, language, pause_flag=None, timeout=None, reservation=None,
+                   update_progress=None, progress_range=(0, 100), profile=None):
+        """
+        Transcribe an audio file to segments / 將音訊檔案轉錄為段落
+
+        Args:
+            audio_path: Audio file (wav/mp3/...) / 音訊檔案
+            language: Language code or 'auto' / 語言代碼或 'auto'
+            pause_flag: Cancellation token (optional) / 取消權杖（可選）
+            timeout: Seconds before the run is aborted (optional) / 中止前的秒數（可選）
+            reservation: Memory reservation to sample the engine process into (optional) / 取樣引擎進程記憶體用的預留（可選）
+            update_progress: Progress callback (optional) / 進度回調（可選）
+            progress_range: Progress range (start, end) / 進度範圍 (start, end)
+            profile: Speed profile name (default: SPEED_PROFILE) / 速度設定檔名稱（預設為 SPEED_PROFILE）
+
+        Returns:
+            list: Segment list / Segment 列表
+
+        Raises:
+            JobCancelled: If cancelled / 被取消時
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, f"{os.path.splitext(os.path.basename(audio_path))[0]}_{self.suffix}.srt")
+            self.transcribe_to_srt(audio_path, output, language, pause_flag=pause_flag, timeout=timeout,
+                                   reservation=reservation, update_progress=update_progress,
+                                   progress_range=progress_range, profile=profile)
+            return read_srt(output)
+
+    def transcribe_to_srt(self, audio_path, output_srt_path, language, pause_flag=None, timeout=None,
+                          reservation=None, update_progress=None, progress_range=(0, 100), profile=None):
+        """
+        Transcribe an audio file into output_srt_path (arguments as transcribe()) / 將音訊檔案轉錄到 output_srt_path（參數同 transcribe()）
+        """
+        segments = self.transcribe(audio_path, language, pause_flag=pause_flag, timeout=timeout,
+                                   reservation=reservation, update_progress=update_progress,
+                                   progress_range=progress_range, profile=profile)
+        write_srt(segments, output_srt_path)
+        return segments
+
+    def transcribe_many(self, audio_paths, language, pause_flag=None, timeout=None, reservation=None,
+                        update_progress=None, progress_range=(0, 100), profile=None):
+        """
+        Transcribe several files together (engines with batch_size > 1 decode them in shared batches) / 一起轉錄多個檔案（batch_size > 1 的引擎以共用批次解碼）
+
+        Returns:
+            list: One Segment list per file, in the same order / 每個檔案一個 Segment 列表，順序相同
+        """
+        return [
+            self.transcribe(audio_path, language, pause_flag=pause_flag, timeout=timeout, reservation=reservation,
+                            profile=profile)
+            for audio_path in audio_paths
+        ]
+
+
+class WhisperCppEngine(Engine):
+    """
+    whisper.cpp subprocess (CoreML encoder on Apple Silicon) / whisper.cpp 子進程（Apple Silicon 使用 CoreML 編碼器）
+    """
+
+    name = 'coreml'
+    suffix = 'coreml'
+    description = 'whisper.cpp (CoreML)'
+
+    def unavailable_reason(self):
+        if not config.is_whisper_cpp_configured():
+            return f"Whisper.cpp 路徑不存在: {config.WHISPER_CPP_PATH}"
+        return None
+
+    def model_label(self):
+        return os.path.basename(config.WHISPER_MODEL_PATH)
+
+    def model_ref(self):
+        return config.WHISPER_MODEL_PATH
+
+    def transcribe_to_srt(self, audio_path, output_srt_path, language, pause_flag=None, timeout=None,
+                          reservation=None, update_progress=None, progress_range=(0, 100), profile=None):
+        import actions
+        actions.generate_srt_with_coreml_whisper(audio_path, output_srt_path, language, update_progress=update_progress,
+                                                 progress_range=progress_range, pause_flag=pause_flag,
+                                                 timeout=timeout, reservation=reservation, profile=profile)
+
+
+class OpenAIWhisperEngine(Engine):
+    """
+    openai-whisper CLI subprocess (fp32 PyTorch) / openai-whisper 命令列子進程（fp32 PyTorch）
+    """
+
+    name = 'cpu'
+    suffix = 'cpu'
+    description = 'openai-whisper (PyTorch fp32)'
+    decodes_input = True  # whisper.load_audio runs ffmpeg on the input / whisper.load_audio 會對輸入執行 ffmpeg
+
+    def model_ref(self):
+        return config.CPU_WHISPER_MODEL
+
+    def transcribe_to_srt(self, audio_path, output_srt_path, language, pause_flag=None, timeout=None,
+                          reservation=None, update_progress=None, progress_range=(0, 100), profile=None):
+        import actions
+        actions.generate_srt_with_cpu_whisper(audio_path, output_srt_path, language, pause_flag=pause_flag,
+                                              timeout=timeout, reservation=reservation, profile=profile)
+
+
+class FasterWhisperEngine(Engine):
+    """
+    faster-whisper in process: CTranslate2 with int8 weights on CPU / 進程內的 faster-whisper：CPU 上使用 int8 權重的 CTranslate2
+
+    The model is loaded once and kept for later files. Decoding runs while segments are iterated, / 模型只載入一次並保留給之後的檔案。
+    so cancellation and the timeout are checked between segments. / 解碼在逐一取得段落時進行，因此在段落之間檢查取消與超時。
+
+    With FASTER_WHISPER_BATCH_SIZE > 1 audio is cut into 30-second windows and decoded batch_size / FASTER_WHISPER_BATCH_SIZE > 1 時，音訊切成 30 秒視窗，
+    windows per forward pass: the windows of one long file, or of several files concatenated by / 每次前向運算解碼 batch_size 個視窗：可以是一個長檔的多個視窗，
+    transcribe_many(). Windows never cross a file boundary, so segments are routed back by offset. / 或 transcribe_many() 串接的多個檔案。視窗不會跨越檔案邊界，因此可依偏移量將段落分回各檔案。
+    """
+
+    name = 'faster'
+    suffix = 'faster'
+    description = 'faster-whisper (CTranslate2 int8)'
+    in_process = True
+    decodes_input = True  # decode_audio (PyAV) reads any format / decode_audio（PyAV）可讀取任何格式
+
+    _models = {}
+    _models_lock = threading.Lock()
+
+    def unavailable_reason(self):
+        if importlib.util.find_spec('faster_whisper') is None:
+            return "faster-whisper 未安裝，請執行: pip install faster-whisper"
+        return None
+
+    def model_ref(self):
+        return config.FASTER_WHISPER_MODEL
+
+    @property
+    def batch_size(self):
+        return max(1, config.FASTER_WHISPER_BATCH_SIZE)
+
+    def load_model(self):
+        """
+        Get the loaded model for the current settings (loads on first use) / 取得目前設定的已載入模型（第一次使用時載入）
+        """
+        threads = config.FASTER_WHISPER_THREADS or os.cpu_count() or 1
+        key = (config.FASTER_WHISPER_MODEL, config.FASTER_WHISPER_COMPUTE_TYPE, threads)
+        with self._models_lock:
+            model = self._models.get(key)
+            if model is None:
+                from faster_whisper import WhisperModel
+                logger.info(f"載入 faster-whisper 模型: {key[0]}（{key[1]}，{threads} 線程）")
+                started = time.monotonic()
+                model = WhisperModel(key[0], device='cpu', compute_type=key[1], cpu_threads=threads)
+                logger.info(f"faster-whisper 模型載入完成（{time.monotonic() - started:.1f} 秒）")
+                self._models[key] = model
+        return model
+
+    def unload(self):
+        with self._models_lock:
+            self._models.clear()
+
+    def transcribe(self, audio_path, language, pause_flag=None, timeout=None, reservation=None,
+                   update_progress=None, progress_range=(0, 100), profile=None):
+        import metrics
+        import planner
+
+        if self.batch_size > 1:
+            # Batch the windows of this file / 批次處理此檔案的視窗
+            return self.transcribe_many([audio_path], language, pause_flag=pause_flag, timeout=timeout,
+                                        update_progress=update_progress, progress_range=progress_range,
+                                        profile=profile)[0]
+        logger.info(f"開始 faster-whisper 轉錄: {os.path.basename(audio_path)}")
+        model = self.load_model()
+        raise_if_cancelled(pause_flag)
+        timeout = timeout or planner.DEFAULT_ENGINE_TIMEOUT
+        deadline = time.monotonic() + timeout
+        options = profiles.get_profile(profile).faster_whisper_options(config.FASTER_WHISPER_BEAM_SIZE)
+        segments, info = model.transcribe(audio_path, language=None if language == 'auto' else language, **options)
+        if language == 'auto':
+            logger.info(f"偵測到語言: {info.language}（{info.language_probability:.0%}）")
+        progress_start, progress_end = progress_range
+        result = []
+        for segment in segments:
+            raise_if_cancelled(pause_flag)
+            if time.monotonic() > deadline:
+                logger.error(f"Whisper 執行超時（超過 {timeout:.0f} 秒）: {audio_path}")
+                raise RuntimeError(f"Whisper 執行超時（超過 {timeout:.0f} 秒）: {audio_path}")
+            result.append(Segment(segment.start, segment.end, segment.text.strip()))
+            metrics.report_audio_position(segment.end)
+            if update_progress and info.duration:
+                update_progress(progress_start + (progress_end - progress_start) * min(1.0, segment.end / info.duration))
+        logger.info(f"faster-whisper 轉錄完成: {len(result)} 個段落")
+        return result
+
+    def transcribe_many(self, audio_paths, language, pause_flag=None, timeout=None, reservation=None,
+                        update_progress=None, progress_range=(0, 100), profile=None):
+        if self.batch_size <= 1:
+            return super().transcribe_many(audio_paths, language, pause_flag=pause_flag, timeout=timeout,
+                                           profile=profile)
+        import numpy as np
+        import metrics
+        import planner
+        from faster_whisper import BatchedInferencePipeline, decode_audio
+
+        model = self.load_model()
+        timeout = timeout or planner.DEFAULT_ENGINE_TIMEOUT
+        deadline = time.monotonic() + timeout
+        audios = []
+        for audio_path in audio_paths:
+            raise_if_cancelled(pause_flag)
+            audios.append(decode_audio(audio_path, sampling_rate=SAMPLE_RATE))
+
+        # Files of one language share a pass; 'auto' is detected per file / 同一語言的檔案共用一次處理；'auto' 會逐檔偵測
+        groups = {}
+        for index, audio in enumerate(audios):
+            file_language = None if language == 'auto' else language
+            if file_language is None and len(audios) > 1:
+                file_language = model.detect_language(audio)[0]
+                logger.info(f"偵測到語言: {file_language}（{os.path.basename(audio_paths[index])}）")
+            groups.setdefault(file_language, []).append(index)
+
+        pipeline = BatchedInferencePipeline(model=model)
+        options = profiles.get_profile(profile).faster_whisper_options(config.FASTER_WHISPER_BEAM_SIZE)
+        total_seconds = sum(len(audio) for audio in audios) / SAMPLE_RATE or 1.0
+        progress_start, progress_end = progress_range
+        done_seconds = 0.0
+        results = [[] for _ in audio_paths]
+        for group_language, indexes in groups.items():
+            offsets, windows, position = [], [], 0.0
+            for index in indexes:
+                duration = len(audios[index]) / SAMPLE_RATE
+                offsets.append(position)
+                windows.extend(_windows(position, duration))
+                position += duration
+            if not windows:
+                continue
+            started = time.monotonic()
+            segments, _ = pipeline.transcribe(
+                np.concatenate([audios[index] for index in indexes]),
+                language=group_language,
+                batch_size=self.batch_size,
+                vad_filter=False,
+                clip_timestamps=windows,
+                without_timestamps=False,
+                **options,
+            )
+            for segment in segments:
+                raise_if_cancelled(pause_flag)
+                if time.monotonic() > deadline:
+                    logger.error(f"Whisper 執行超時（超過 {timeout:.0f} 秒）: {audio_paths[indexes[0]]}")
+                    raise RuntimeError(f"Whisper 執行超時（超過 {timeout:.0f} 秒）: {audio_paths[indexes[0]]}")
+                # Route the segment to the file whose range contains its start / 將段落分配給起點所在範圍的檔案
+                slot = bisect.bisect_right(offsets, segment.start) - 1
+                index, offset = indexes[slot], offsets[slot]
+                end = min(segment.end - offset, len(audios[index]) / SAMPLE_RATE)
+                results[index].append(Segment(segment.start - offset, end, segment.text.strip()))
+                metrics.report_audio_position(done_seconds + segment.end)
+                if update_progress:
+                    fraction = min(1.0, (done_seconds + segment.end) / total_seconds)
+                    update_progress(progress_start + (progress_end - progress_start) * fraction)
+            done_seconds += position
+            logger.info(f"faster-whisper 批次解碼: {len(indexes)} 個檔案、{len(windows)} 個視窗（batch {self.batch_size}），"
+                        f"每秒 {position / max(time.monotonic() - started, 1e-6):.1f} 音訊秒")
+        return results
+
+
+# Whisper input: 16 kHz audio in 30-second windows / Whisper 輸入：16 kHz 音訊、30 秒視窗
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30.0
+# Trailing pieces shorter than this are dropped / 短於此長度的尾端片段會被捨棄
+MIN_WINDOW_SECONDS = 0.2
+
+
+def _windows(offset, duration):
+    """
+    Consecutive windows of at most WINDOW_SECONDS covering [offset, offset + duration) / 涵蓋 [offset, offset + duration) 的連續視窗，每個最多 WINDOW_SECONDS
+    """
+    windows = []
+    start = 0.0
+    while duration - start >= MIN_WINDOW_SECONDS:
+        end = min(start + WINDOW_SECONDS, duration)
+        windows.append({'start': offset + start, 'end': offset + end})
+        start = end
+    return windows
+
+
+def window_count(duration):
+    """
+    Number of 30-second windows of an audio file / 音訊檔案的 30 秒視窗數
+    """
+    return len(_windows(0.0, duration or 0.0))
+
+
+_registry = {}
+
+
+def register(engine):
+    """
+    Add an engine instance to the registry / 將引擎實例加入註冊表
+
+    Returns:
+        Engine: The registered engine / 已註冊的引擎
+    """
+    _registry[engine.name] = engine
+    return engine
+
+
+def get_engine(name):
+    """
+    Look up an engine by name / 依名稱取得引擎
+
+    Raises:
+        ValueError: If no engine has this name / 沒有此名稱的引擎時
+    """
+    try:
+        return _registry[name]
+    except KeyError:
+        raise ValueError(f"未知的轉錄引擎: {name}") from None
+
+
+def engine_names():
+    """
+    Names of all registered engines in registration order / 依註冊順序的所有引擎名稱
+    """
+    return tuple(_registry)
+
+
+def srt_suffixes():
+    """
+    Transcript suffixes in lookup priority order / 依尋找優先順序的字幕後綴
+    """
+    return tuple(f"_{engine.suffix}.srt" for engine in _registry.values())
+
+
+register(WhisperCppEngine())
+register(OpenAIWhisperEngine())
+register(FasterWhisperEngine())
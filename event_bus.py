@@ -0,0 +1,88 @@
+"""
+Event bus module / 事件匯流排模組
+Coalescing, thread-safe state board fed by worker threads / 由工作線程寫入、會合併更新的執行緒安全狀態板
+
+Publishers only update a value in a dict (O(1), never blocks on the UI). Many updates / 發布者只更新字典中的值（O(1)，不會等待 UI）。
+between two reads collapse into one state, so a reader polling at a fixed frame rate / 兩次讀取之間的多次更新會合併成一個狀態，
+costs the same no matter how many workers report. / 因此以固定幀率輪詢的讀者，成本與回報的工作線程數量無關。
+
+Keys / 鍵值:
+    gauges   - latest value wins (e.g. 'rtf.cpu', 'jobs.queue_depth') / 以最新值為準
+    counters - running totals (e.g. 'files.in_flight', 'translate.requests') / 累計值
+"""
+import threading
+from contextlib import contextmanager
+
+# Well-known keys / 常用鍵值
+KEY_FILES_IN_FLIGHT = "files.in_flight"        # counter / 計數器
+KEY_AUDIO_SECONDS = "audio.seconds_done"       # counter / 計數器
+KEY_TRANSLATE_REQUESTS = "translate.requests"  # counter / 計數器
+KEY_QUEUE_DEPTH = "jobs.queue_depth"           # gauge / 量表
+KEY_JOBS_RUNNING = "jobs.running"              # gauge / 量表
+KEY_BATCH_ETA = "batch.eta"                    # gauge, predicted finish (epoch s), None when idle / 量表，預計完成時間（epoch 秒），閒置時為 None
+RTF_PREFIX = "rtf."                            # gauge per engine: 'rtf.<engine>' / 各引擎量表
+CACHE_PREFIX = "cache."                        # counters 'cache.<name>.hits' / 'cache.<name>.misses' / 計數器
+
+
+class EventBus:
+    """
+    Coalescing gauge/counter board / 合併更新的量表/計數器板
+    """
+
+    def __init__(self):
+        self._gauges = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.version = 0  # Incremented on every update / 每次更新時遞增
+
+    def set(self, key, value):
+        """
+        Set a gauge, replacing the previous value / 設定量表，取代先前的值
+
+        Args:
+            key: Gauge name / 量表名稱
+            value: New value / 新的值
+        """
+        with self._lock:
+            self._gauges[key] = value
+            self.version += 1
+
+    def add(self, key, amount=1):
+        """
+        Add to a counter (negative amounts allowed, e.g. in-flight counts) / 增加計數器（可為負數，例如處理中數量）
+
+        Args:
+            key: Counter name / 計數器名稱
+            amount: Amount to add / 增加的數量
+        """
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            self.version += 1
+
+    @contextmanager
+    def track(self, key):
+        """
+        Count the block as in flight: +1 on enter, -1 on exit / 將區塊計為處理中：進入時 +1，離開時 -1
+
+        Args:
+            key: Counter name / 計數器名稱
+        """
+        self.add(key, 1)
+        try:
+            yield
+        finally:
+            self.add(key, -1)
+
+    def snapshot(self):
+        """
+        Copy of the current state / 目前狀態的副本
+
+        Returns:
+            tuple: (version, gauges, counters) / （版本, 量表, 計數器）
+        """
+        with self._lock:
+            return self.version, dict(self._gauges), dict(self._counters)
+
+
+# Process-wide bus / 整個進程共用的匯流排
+bus = EventBus()
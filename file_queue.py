@@ -0,0 +1,208 @@
+"""
+File queue module / 檔案佇列模組
+Indexed, ordered, de-duplicated input file list and background folder scanner / 有索引、有順序、不重複的輸入檔案列表與背景資料夾掃描器
+"""
+import os
+import queue
+import threading
+
+# Supported input file extensions / 支援的輸入副檔名
+AUDIO_EXTENSIONS = ('.mp4', '.wav', '.m4a', '.flac', '.mp3', '.aac')
+
+# Number of paths per scanner batch / 掃描器每批回傳的路徑數量
+DEFAULT_SCAN_BATCH_SIZE = 500
+
+
+def is_supported_file(name):
+    """
+    Check if filename has a supported extension / 檢查檔案名稱是否為支援的副檔名
+
+    Args:
+        name: File name or path / 檔案名稱或路徑
+
+    Returns:
+        bool: True if supported / 支援返回 True
+    """
+    return name.lower().endswith(AUDIO_EXTENSIONS)
+
+
+class FileQueue:
+    """
+    Ordered set of file paths with O(1) membership and append / 具有 O(1) 查詢與附加的有序檔案路徑集合
+    """
+
+    def __init__(self, paths=None):
+        """
+        Args:
+            paths: Initial paths (optional) / 初始路徑（可選）
+        """
+        self._items = []
+        self._index = {}
+        self._lock = threading.Lock()
+        if paths:
+            self.add_many(paths)
+
+    def add(self, path):
+        """
+        Add a path if not already queued / 若尚未加入則新增路徑
+
+        Args:
+            path: File path / 檔案路徑
+
+        Returns:
+            bool: True if added, False if duplicate / 新增返回 True，重複返回 False
+        """
+        return bool(self.add_many([path]))
+
+    def add_many(self, paths):
+        """
+        Add paths, skipping duplicates / 新增多個路徑，略過重複
+
+        Args:
+            paths: Iterable of file paths / 檔案路徑的可迭代物件
+
+        Returns:
+            list: Paths that were actually added (in order) / 實際新增的路徑（依順序）
+        """
+        added = []
+        with self._lock:
+            for path in paths:
+                if path not in self._index:
+                    self._index[path] = len(self._items)
+                    self._items.append(path)
+                    added.append(path)
+        return added
+
+    def pop(self):
+        """
+        Remove and return the last path / 移除並返回最後一個路徑
+
+        Returns:
+            str: Removed path, or None if empty / 被移除的路徑，若為空則返回 None
+        """
+        with self._lock:
+            if not self._items:
+                return None
+            path = self._items.pop()
+            del self._index[path]
+            return path
+
+    def remove(self, path):
+        """
+        Remove a specific path / 移除指定路徑
+
+        Args:
+            path: File path / 檔案路徑
+
+        Returns:
+            bool: True if removed / 成功移除返回 True
+        """
+        with self._lock:
+            position = self._index.pop(path, None)
+            if position is None:
+                return False
+            del self._items[position]
+            # Re-index only the entries after the removed one / 只重新索引被移除項目之後的項目
+            for i in range(position, len(self._items)):
+                self._index[self._items[i]] = i
+            return True
+
+    def clear(self):
+        """
+        Remove all paths / 移除所有路徑
+        """
+        with self._lock:
+            self._items.clear()
+            self._index.clear()
+
+    def index(self, path):
+        """
+        Get position of a path / 取得路徑的位置
+
+        Returns:
+            int: Zero-based position, or -1 if not queued / 從 0 開始的位置，不存在返回 -1
+        """
+        return self._index.get(path, -1)
+
+    def snapshot(self):
+        """
+        Get a copy of the queued paths / 取得佇列路徑的副本
+
+        Returns:
+            list: Copy of paths in order / 依順序的路徑副本
+        """
+        with self._lock:
+            return list(self._items)
+
+    def __contains__(self, path):
+        return path in self._index
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+
+class FolderScanner(threading.Thread):
+    """
+    Background folder scanner using os.scandir, streams batches to a queue / 使用 os.scandir 的背景資料夾掃描器，分批送到佇列
+
+    Each item put on results is a list of paths; None marks the end of the scan. / 放入 results 的每個項目是路徑列表；None 代表掃描結束。
+    """
+
+    def __init__(self, folder, results=None, batch_size=DEFAULT_SCAN_BATCH_SIZE, predicate=is_supported_file):
+        """
+        Args:
+            folder: Folder to scan recursively / 要遞迴掃描的資料夾
+            results: Output queue (created if None) / 輸出佇列（None 則自動建立）
+            batch_size: Paths per batch / 每批路徑數量
+            predicate: Filter applied to file names / 套用於檔案名稱的篩選函數
+        """
+        super().__init__(daemon=True)
+        self.folder = folder
+        self.results = results if results is not None else queue.Queue()
+        self.batch_size = batch_size
+        self.predicate = predicate
+        self.found = 0
+        self.errors = 0
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """
+        Stop scanning as soon as possible / 儘快停止掃描
+        """
+        self._cancel.set()
+
+    def run(self):
+        batch = []
+        stack = [self.folder]
+        try:
+            while stack and not self._cancel.is_set():
+                directory = stack.pop()
+                try:
+                    with os.scandir(directory) as entries:
+                        # Sort per directory so results stay deterministic / 每個目錄內排序，結果順序穩定
+                        subdirs = []
+                        for entry in sorted(entries, key=lambda e: e.name):
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    subdirs.append(entry.path)
+                                elif self.predicate(entry.name) and entry.is_file():
+                                    batch.append(entry.path)
+                            except OSError:
+                                self.errors += 1
+                                continue
+                            if len(batch) >= self.batch_size:
+                                self.found += len(batch)
+                                self.results.put(batch)
+                                batch = []
+                        # Push in reverse so subdirectories are visited in name order / 反向推入，子目錄依名稱順序處理
+                        stack.extend(reversed(subdirs))
+                except OSError:
+                    self.errors += 1
+            if batch and not self._cancel.is_set():
+                self.found += len(batch)
+                self.results.put(batch)
+        finally:
+            self.results.put(None)
@@ -4,18 +4,43 @@ Main GUI application built with CustomTkinter / 使用 CustomTkinter 構建的
 """
 import customtkinter as ctk
 from tkinter import filedialog, messagebox  # Dialog boxes still use tkinter / 對話框仍使用 tkinter
-import threading
 import queue
 import logging
 import actions  # Import action module / 引入動作檔案
 import os
 # import ai_translate  # Lazy import to avoid macOS version check issues / 延遲導入，避免 macOS 版本檢查問題
-from pykakasi import kakasi
 from logger import logger, GUIHandler, setup_logger
-from i18n import t, load_language, get_current_language, get_available_languages
-
-# Global variable: store file list / 全域變數：儲存檔案列表
-_file_list = []
+from log_console import LogConsole, LogRingBuffer
+from dashboard import DashboardPanel
+from file_queue import AUDIO_EXTENSIONS, FileQueue, FolderScanner
+from job_executor import Job, JobExecutor, RESOURCE_ENGINE, RESOURCE_TRANSLATION, RESOURCE_KATAKANA
+from cancellation import JobCancelled
+from job_journal import list_journals
+from scheduler import POLICIES
+from profiles import PROFILES
+from config import config
+from i18n import t, LazyText, load_language, get_current_language, get_available_languages
+
+# Global variable: store file list (ordered, de-duplicated) / 全域變數：儲存檔案列表（有序、不重複）
+_file_queue = FileQueue()
+
+# Engines offered for the CPU button / CPU 按鈕可選的引擎
+CPU_ENGINES = ('cpu', 'faster')
+
+# Folder scan polling (milliseconds, batches per tick) / 資料夾掃描輪詢（毫秒、每次處理批次數）
+SCAN_POLL_INTERVAL_MS = 50
+SCAN_BATCHES_PER_TICK = 4
+
+# Job status refresh interval (milliseconds) / 工作狀態更新間隔（毫秒）
+JOB_REFRESH_INTERVAL_MS = 500
+
+# log_t level names / log_t 的級別名稱
+_LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
 
 # Helper function for translating log messages / 翻譯日誌訊息的輔助函數
 def log_t(key, level="info", **kwargs):
@@ -27,26 +52,12 @@ def log_t(key, level="info", **kwargs):
         level: Log level (info, warning, error, debug) / 日誌級別（info, warning, error, debug）
         **kwargs: Format parameters / 格式化參數
     
-    Returns:
-        str: Log message / 日誌訊息
+    Disabled levels return before any lookup; the template is formatted only when the record is emitted. / 停用的級別在查詢前就返回；只有輸出記錄時才會格式化訊息。
     """
-    message = t(f"log.{key}", key)
-    # If parameters exist, perform formatting / 如果有參數，進行格式化
-    if kwargs:
-        try:
-            message = message.format(**kwargs)
-        except KeyError:
-            # If formatting fails, return original message / 如果格式化失敗，返回原始訊息
-            pass
-    if level == "info":
-        logger.info(message)
-    elif level == "warning":
-        logger.warning(message)
-    elif level == "error":
-        logger.error(message)
-    elif level == "debug":
-        logger.debug(message)
-    return message
+    levelno = _LOG_LEVELS.get(level)
+    if levelno is None or not logger.isEnabledFor(levelno):
+        return
+    logger.log(levelno, LazyText(f"log.{key}", key, **kwargs))
 
 # Add files to list box / 添加文件到列表框
 def add_files(files=None):
@@ -56,44 +67,139 @@ def add_files(files=None):
     Args:
         files: List of file paths (if None, shows file dialog) / 檔案路徑列表（如果為 None，顯示檔案對話框）
     """
-    global _file_list
     if files is None:
-        files = filedialog.askopenfilenames(filetypes=[("WAV files", "*.wav"), ("MP4 files", "*.mp4")])
+        files = filedialog.askopenfilenames(filetypes=[
+            ("Audio/Video files", " ".join(f"*{ext}" for ext in AUDIO_EXTENSIONS)),
+            ("WAV files", "*.wav"), ("MP4 files", "*.mp4")])
     log_t("added_files", count=len(files) if files else 0)
-    for file in files:
-        if file not in _file_list:
-            _file_list.append(file)
-            log_t("file_added", level="debug", filename=os.path.basename(file))
-    update_file_display()
+    start = len(_file_queue)
+    added = _file_queue.add_many(files or [])
+    for file in added:
+        log_t("file_added", level="debug", filename=os.path.basename(file))
+    append_file_display(start, added)
 
 # Add files from folder to list box / 添加資料夾中的文件到列表框
 def add_folder():
     """
-    Add all audio files from selected folder to file list / 將選定資料夾中的所有音頻檔案添加到檔案列表
+    Add all audio files from selected folder to file list (scanned in background) / 將選定資料夾中的所有音頻檔案添加到檔案列表（背景掃描）
     """
-    global _file_list
     folder = filedialog.askdirectory()
-    if folder:
-        for root, _, files in os.walk(folder):
-            for file in files:
-                if file.endswith(('.mp4', '.wav')):
-                    file_path = os.path.join(root, file)
-                    if file_path not in _file_list:
-                        _file_list.append(file_path)
-    update_file_display()
+    if not folder:
+        return
+    log_t("scanning_folder", folder=folder)
+    scanner = FolderScanner(folder)
+    scanner.start()
+
+    # Poll scanner results from main thread, a bounded number of batches per tick / 在主線程輪詢掃描結果，每次處理有限批次
+    def poll_scanner():
+        for _ in range(SCAN_BATCHES_PER_TICK):
+            try:
+                batch = scanner.results.get_nowait()
+            except queue.Empty:
+                break
+            if batch is None:
+                log_t("folder_scan_completed", count=scanner.found, folder=folder)
+                return
+            start = len(_file_queue)
+            append_file_display(start, _file_queue.add_many(batch))
+        root.after(SCAN_POLL_INTERVAL_MS, poll_scanner)
+
+    poll_scanner()
 
 # Remove selected files from list box / 從列表框中刪除選中的文件
 def remove_files():
     """
     Remove last file from file list / 從檔案列表中刪除最後一個檔案
     """
-    global _file_list
-    if _file_list:
-        _file_list.pop()  # Remove last file / 刪除最後一個檔案
-        update_file_display()
+    if _file_queue.pop() is not None:  # Remove last file / 刪除最後一個檔案
+        if 'file_listbox' in globals() and file_listbox is not None:
+            # Only delete the last displayed line / 只刪除最後一行顯示
+            file_listbox.configure(state="normal")
+            file_listbox.delete(f"{len(_file_queue) + 1}.0", "end")
+            if len(_file_queue):
+                file_listbox.insert("end", "\n")
+            file_listbox.configure(state="disabled")
+
+# Single executor for all GUI actions / 所有 GUI 動作共用的執行器
+job_executor = JobExecutor(
+    limits={
+        RESOURCE_ENGINE: config.ENGINE_SLOTS,
+        RESOURCE_TRANSLATION: config.TRANSLATION_SLOTS,
+        RESOURCE_KATAKANA: 1,
+    },
+)
+
+def submit_job(kind, func, action_name, file_count, resources, key=None):
+    """
+    Submit a GUI action to the job executor / 將 GUI 動作提交到工作執行器
+    
+    Args:
+        kind: Job type / 工作類型
+        func: Function run in worker thread, receives the Job / 在工作線程中執行的函數，接收 Job
+        action_name: Display name of the action / 動作顯示名稱
+        file_count: Number of files in the batch / 批次中的檔案數量
+        resources: Resources needed (resource name -> slots) / 所需資源（資源名稱 -> 槽位數）
+        key: De-duplication key / 去重鍵值
+    
+    Returns:
+        Job: Queued job, or None if the same job is already queued / 已排入的工作，若相同工作已在佇列中則返回 None
+    """
+    job = Job(kind, func, name=t("job.name").format(action=action_name, count=file_count), resources=resources, key=key)
+    if job_executor.submit(job) is None:
+        log_t("job_duplicate", level="warning", name=job.name)
+        return None
+    if job_executor.queue_depth():
+        log_t("job_queued", name=job.name, depth=job_executor.queue_depth())
+    return job
+
+def _selected_policy():
+    """
+    Scheduling policy chosen in the combobox / 下拉選單中選擇的排程策略
+    """
+    label = policy_combobox.get()
+    for policy in POLICIES:
+        if t(f"schedule.{policy}", policy) == label:
+            return policy
+    return config.SCHEDULE_POLICY
+
+def _selected_profile():
+    """
+    Speed profile chosen in the combobox / 下拉選單中選擇的速度設定檔
+    """
+    label = profile_combobox.get()
+    for profile in PROFILES:
+        if t(f"profile.{profile}", profile) == label:
+            return profile
+    return config.SPEED_PROFILE
 
-# Pause flag / 暫停標誌
-pause_flag = threading.Event()
+def _selected_cpu_engine():
+    """
+    CPU engine chosen in the combobox / 下拉選單中選擇的 CPU 引擎
+    """
+    label = cpu_engine_combobox.get()
+    for name in CPU_ENGINES:
+        if t(f"engine.{name}", name) == label:
+            return name
+    return config.CPU_ENGINE
+
+# Warn about failed files / 警告失敗的檔案
+def _show_batch_failures(summary):
+    """
+    Warn about files a transcription batch could not process / 警告轉錄批次無法處理的檔案
+
+    Returns:
+        bool: True if some files failed / 有檔案失敗時返回 True
+    """
+    failures = (summary or {}).get('failures')
+    if not failures:
+        return False
+    names = "\n".join(f"• {os.path.basename(file)}" for file in list(failures)[:10])
+    if len(failures) > 10:
+        names += "\n…"
+    message = t("message.warning.batch_failures").format(done=summary['files'], failed=len(failures), files=names)
+    update_status(t("status.batch_failures").format(failed=len(failures)), "WARNING")
+    root.after(0, lambda: messagebox.showwarning(t("message.warning.title"), message))
+    return True
 
 # Execute CoreML Whisper transcription / 執行 CoreML Whisper 轉錄
 def coreml_whisper():
@@ -102,8 +208,10 @@ def coreml_whisper():
     """
     log_t("user_clicked_coreml")
     update_status(t("status.coreml_transcribing"), "INFO")
-    files = _file_list.copy()
+    files = _file_queue.snapshot()
     language = language_combobox.get()
+    policy = _selected_policy()
+    profile = _selected_profile()
 
     if not files:
         log_t("no_files_warning", level="warning")
@@ -114,14 +222,17 @@ def coreml_whisper():
     log_t("start_coreml", count=len(files), language=language)
 
     # Run CoreML Whisper in new thread / 在新線程中運行 CoreML Whisper
-    def run_coreml_whisper():
+    def run_coreml_whisper(job):
         try:
-            actions.coreml_whisper(files, language, update_progress, pause_flag, update_status)
+            summary = actions.coreml_whisper(files, language, update_progress, job.cancel_token, update_status,
+                                             policy=policy, profile=profile)
+            if _show_batch_failures(summary):
+                return
             log_t("coreml_completed")
             update_status(t("status.coreml_completed"), "INFO")
             # Use root.after() to ensure messagebox is shown in main thread / 使用 root.after() 確保在主線程中顯示 messagebox
             root.after(0, lambda: messagebox.showinfo(t("message.info.completed"), t("message.info.coreml_completed").format(count=len(files))))
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, JobCancelled):
             log_t("coreml_cancelled", level="warning")
             update_status(t("status.cancelled"), "WARNING")
             root.after(0, lambda: messagebox.showinfo(t("message.info.cancelled", "取消"), t("message.info.cancelled")))
@@ -139,7 +250,7 @@ def coreml_whisper():
                     "2. whisper.cpp 執行檔問題\n"
                     "3. 模型檔案問題\n\n"
                     "建議：\n"
-                    "• 嘗試使用「CPU 執行」模式（較穩定）\n"
+                    "• 設定 BATCH_FALLBACK_ENGINE=cpu，失敗的檔案會自動改用 CPU 引擎重新處理\n"
                     "• 檢查 whisper.cpp 是否正確編譯\n"
                     "• 檢查模型檔案是否完整"
                 )
@@ -152,8 +263,10 @@ def coreml_whisper():
             root.after(0, lambda: messagebox.showerror(t("message.error.title"), final_error_msg))
             import traceback
             traceback.print_exc()  # Print full error in terminal / 在終端機印出完整錯誤
+            raise  # Mark job as failed / 將工作標記為失敗
 
-    threading.Thread(target=run_coreml_whisper).start()
+    submit_job("coreml", run_coreml_whisper, t("button.coreml_execute"), len(files),
+               resources={RESOURCE_ENGINE: 1}, key=("coreml", language, policy, profile, tuple(files)))
 
 # Execute CPU Whisper transcription / 執行 CPU Whisper 轉錄
 def cpu_whisper():
@@ -162,9 +275,12 @@ def cpu_whisper():
     """
     log_t("user_clicked_cpu")
     update_status(t("status.cpu_transcribing"), "INFO")
-    files = _file_list.copy()
+    files = _file_queue.snapshot()
     language = language_combobox.get()
     translate_to = translate_combobox.get()
+    policy = _selected_policy()
+    profile = _selected_profile()
+    engine = _selected_cpu_engine()
 
     if not files:
         log_t("no_files_warning", level="warning")
@@ -175,13 +291,16 @@ def cpu_whisper():
     log_t("start_cpu", count=len(files), language=language)
 
     # Run CPU Whisper in new thread / 在新線程中運行 CPU Whisper
-    def run_cpu_whisper():
+    def run_cpu_whisper(job):
         try:
-            actions.cpu_whisper(files, language, translate_to, update_progress, pause_flag, update_status)
+            summary = actions.cpu_whisper(files, language, translate_to, update_progress, job.cancel_token,
+                                          update_status, policy=policy, engine=engine, profile=profile)
+            if _show_batch_failures(summary):
+                return
             log_t("cpu_completed")
             update_status(t("status.cpu_completed"), "INFO")
             root.after(0, lambda: messagebox.showinfo(t("message.info.completed"), t("message.info.cpu_completed").format(count=len(files))))
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, JobCancelled):
             log_t("cpu_cancelled", level="warning")
             update_status(t("status.cancelled"), "WARNING")
             root.after(0, lambda: messagebox.showinfo(t("message.info.cancelled", "取消"), t("message.info.cancelled")))
@@ -196,8 +315,10 @@ def cpu_whisper():
             root.after(0, lambda: messagebox.showerror(t("message.error.title"), t("message.error.generic_error").format(error=final_error_msg)))
             import traceback
             traceback.print_exc()  # Print full error in terminal / 在終端機印出完整錯誤
+            raise  # Mark job as failed / 將工作標記為失敗
 
-    threading.Thread(target=run_cpu_whisper).start()
+    submit_job("cpu", run_cpu_whisper, t("button.cpu_execute"), len(files),
+               resources={RESOURCE_ENGINE: 1}, key=(engine, language, policy, profile, tuple(files)))
 
 # Execute translation / 執行翻譯
 def translate_srt_files():
@@ -215,7 +336,7 @@ def translate_srt_files():
         return
     
     update_status(t("status.translating"), "INFO")
-    files = _file_list.copy()
+    files = _file_queue.snapshot()
     target_language = translate_combobox.get()
 
     if not files:
@@ -227,41 +348,31 @@ def translate_srt_files():
     log_t("start_translation", count=len(files), language=target_language)
 
     # 在新線程中運行翻譯
-    def run_translate_srt_files():
+    def run_translate_srt_files(job):
         translated_count = 0
         try:
+            import planner
+            srt_files = [srt_file for srt_file in map(actions.find_srt_file, files) if srt_file]
+            plan = planner.get_history().plan_translation(srt_files, target_language)
+            log_t("translation_plan", files=len(srt_files), requests=plan.requests, tokens=plan.tokens,
+                  duration=planner.format_duration(plan.predicted_seconds))
             for file in files:
-                if pause_flag.is_set():
-                    log_t("translation_paused", level="warning")
+                if job.cancel_token.is_set():
                     break
                 
-                # Get base file path (without extension) / 獲取基礎檔案路徑（不含副檔名）
-                base_path = os.path.splitext(file)[0]
-                file_dir = os.path.dirname(file) if os.path.dirname(file) else '.'
-                
-                # Try to find SRT file (priority: _coreml.srt > _cpu.srt > .srt) / 嘗試尋找 SRT 檔案（優先順序：_coreml.srt > _cpu.srt > .srt）
-                srt_file = None
-                possible_srt_files = [
-                    os.path.join(file_dir, f"{os.path.basename(base_path)}_coreml.srt"),
-                    os.path.join(file_dir, f"{os.path.basename(base_path)}_cpu.srt"),
-                    os.path.join(file_dir, f"{os.path.basename(base_path)}.srt")
-                ]
-                
-                for possible_srt in possible_srt_files:
-                    if os.path.exists(possible_srt):
-                        srt_file = possible_srt
-                        break
-                
-                if srt_file and os.path.exists(srt_file):
+                # Find SRT file (priority: _coreml.srt > _cpu.srt > .srt) / 尋找 SRT 檔案（優先順序：_coreml.srt > _cpu.srt > .srt）
+                srt_file = actions.find_srt_file(file)
+                if srt_file:
                     log_t("translating_file", filename=os.path.basename(srt_file))
                     # Don't specify output_srt_path, let translate_srt auto-generate filename with language suffix / 不指定 output_srt_path，讓 translate_srt 自動生成帶語言後綴的檔案名
-                    ai_translate.translate_srt(srt_file, output_srt_path=None, target_language=target_language, pause_flag=pause_flag)
+                    ai_translate.translate_srt(srt_file, output_srt_path=None, target_language=target_language, pause_flag=job.cancel_token)
                     translated_count += 1
                     # Update progress / 更新進度
                     progress = (translated_count / len(files)) * 100
                     update_progress(progress)
                 else:
                     log_t("srt_not_found", level="warning", filename=os.path.basename(file))
+            job.cancel_token.raise_if_cancelled()
             log_t("translation_completed", count=translated_count)
             # Update status first, then show message box / 先更新狀態，再顯示訊息框
             update_status(t("status.translation_completed").format(translated=translated_count, total=len(files)), "INFO")
@@ -269,12 +380,19 @@ def translate_srt_files():
             final_count = translated_count
             final_total = len(files)
             root.after(100, lambda: messagebox.showinfo(t("message.info.completed"), t("message.info.translation_completed").format(count=final_count)))
+        except JobCancelled:
+            # Files translated before cancellation are kept / 取消前已翻譯的檔案會保留
+            log_t("translation_paused", level="warning")
+            update_status(t("status.paused"), "WARNING")
         except Exception as e:
             logger.exception(t("message.error.generic_error").format(error=str(e)))
             update_status(t("status.error").format(error=str(e)[:50]), "ERROR")
-            root.after(0, lambda: messagebox.showerror(t("message.error.title"), t("message.error.generic_error").format(error=str(e))))
+            error_text = str(e)  # Closure variable / 閉包變數
+            root.after(0, lambda: messagebox.showerror(t("message.error.title"), t("message.error.generic_error").format(error=error_text)))
+            raise  # Mark job as failed / 將工作標記為失敗
 
-    threading.Thread(target=run_translate_srt_files).start()
+    submit_job("translate", run_translate_srt_files, t("button.translate"), len(files),
+               resources={RESOURCE_TRANSLATION: 1}, key=("translate", target_language, tuple(files)))
 
 # Helper function to enable/disable buttons / 禁用/啟用按鈕的輔助函數
 def set_buttons_state(enabled):
@@ -286,10 +404,10 @@ def set_buttons_state(enabled):
     """
     def _set_state():
         global coreml_button, cpu_button, translate_button, katakana_button, pause_button
-        global add_button, add_folder_button, remove_button
+        global resume_button, add_button, add_folder_button, remove_button
         
         buttons = [
-            coreml_button, cpu_button, translate_button, katakana_button,
+            coreml_button, cpu_button, translate_button, katakana_button, resume_button,
             add_button, add_folder_button, remove_button
         ]
         
@@ -351,26 +469,101 @@ def update_status(message, level="INFO"):
 # Update file list display / 更新檔案列表顯示
 def update_file_display():
     """
-    Update file list display in GUI / 更新 GUI 中的檔案列表顯示
+    Rebuild file list display in GUI / 重建 GUI 中的檔案列表顯示
     """
-    global _file_list, file_listbox
     if 'file_listbox' in globals() and file_listbox is not None:
         file_listbox.configure(state="normal")
         file_listbox.delete("1.0", "end")
-        for i, file in enumerate(_file_list, 1):
-            file_listbox.insert("end", f"{i}. {os.path.basename(file)}\n")
         file_listbox.configure(state="disabled")
+    append_file_display(0, _file_queue.snapshot())
+
+def append_file_display(start, files):
+    """
+    Append entries to file list display (incremental update) / 在檔案列表顯示中附加項目（增量更新）
+    
+    Args:
+        start: Number of entries already displayed / 已顯示的項目數
+        files: New file paths to display / 要顯示的新檔案路徑
+    """
+    if not files or 'file_listbox' not in globals() or file_listbox is None:
+        return
+    text = "".join(f"{i}. {os.path.basename(file)}\n" for i, file in enumerate(files, start + 1))
+    file_listbox.configure(state="normal")
+    file_listbox.insert("end", text)
+    file_listbox.configure(state="disabled")
+
+# Refresh job status display / 更新工作狀態顯示
+_job_display_version = -1
+
+def refresh_job_display():
+    """
+    Refresh job status list when executor state changed (polled from main thread) / 執行器狀態改變時更新工作狀態列表（由主線程輪詢）
+    """
+    global _job_display_version
+    if job_executor.version != _job_display_version or job_executor.is_busy():
+        _job_display_version = job_executor.version
+        lines = [
+            t("job.line").format(id=job.id, name=job.name, status=t(f"job.status.{job.status}", job.status), elapsed=job.elapsed)
+            for job in job_executor.jobs()
+        ]
+        jobs_textbox.configure(state="normal")
+        jobs_textbox.delete("1.0", "end")
+        jobs_textbox.insert("end", "\n".join(lines))
+        jobs_textbox.configure(state="disabled")
+    root.after(JOB_REFRESH_INTERVAL_MS, refresh_job_display)
 
 # Pause task / 暫停任務
 def pause_task():
     """
-    Pause currently running task / 暫停當前執行的任務
+    Cancel running and queued tasks, running engine processes are terminated / 取消執行中與排隊中的任務，並終止執行中的引擎進程
+    
+    Files finished before the pause are kept. / 暫停前已完成的檔案會保留。
     """
     log_t("user_clicked_pause")
-    pause_flag.set()
-    update_status("任務已暫停，結果已保存。", "WARNING")
+    job_executor.cancel_all()
+    update_status(t("status.paused"), "WARNING")
     # pause_task runs in main thread, can directly call messagebox / pause_task 在主線程中執行，可以直接調用 messagebox
-    messagebox.showinfo("暫停", "任務已暫停，結果已保存。")
+    messagebox.showinfo(t("status.paused"), t("message.info.paused"))
+
+# Resume interrupted batch / 恢復被中斷的批次
+def resume_task():
+    """
+    Resume the most recent interrupted transcription batch from its journal / 從批次日誌恢復最近一次被中斷的轉錄批次
+    """
+    log_t("user_clicked_resume")
+    journals = list_journals(incomplete_only=True)
+    if not journals:
+        log_t("no_resumable_batch")
+        messagebox.showinfo(t("button.resume"), t("message.info.no_resumable_batch"))
+        return
+
+    journal = journals[0]
+    remaining = len(journal.remaining_files())
+    log_t("resume_batch", batch_id=journal.batch_id, done=journal.done_count(), remaining=remaining)
+
+    def run_resume(job):
+        try:
+            # Reloaded and locked when the job starts, the batch may have finished while queued / 工作開始時重新載入並鎖定，排隊期間批次可能已完成
+            summary = actions.resume_batch(journal, update_progress, job.cancel_token, update_status)
+            if summary is None:
+                update_status(t("status.ready"), "INFO")
+                root.after(0, lambda: messagebox.showinfo(t("button.resume"), t("message.info.no_resumable_batch")))
+                return
+            if _show_batch_failures(summary):
+                return
+            update_status(t("status.ready"), "INFO")
+            root.after(0, lambda: messagebox.showinfo(t("message.info.completed"), t("message.info.resume_completed").format(count=summary['files'])))
+        except (KeyboardInterrupt, JobCancelled):
+            update_status(t("status.cancelled"), "WARNING")
+        except Exception as e:
+            logger.exception(t("message.error.generic_error").format(error=str(e)))
+            update_status(t("status.error").format(error=str(e)[:50]), "ERROR")
+            error_text = str(e)[:500]
+            root.after(0, lambda: messagebox.showerror(t("message.error.title"), t("message.error.generic_error").format(error=error_text)))
+            raise  # Mark job as failed / 將工作標記為失敗
+
+    submit_job(journal.action, run_resume, t("button.resume"), remaining,
+               resources={RESOURCE_ENGINE: 1}, key=("resume", journal.batch_id))
 
 # Convert Japanese to Katakana / 日文轉換成片假名
 def japanese_to_katakana():
@@ -378,101 +571,59 @@ def japanese_to_katakana():
     Convert Japanese subtitles to Katakana / 將日文字幕轉換為片假名
     """
     update_status("正在轉換為片假名...", "INFO")
-    files = _file_list.copy()
+    files = _file_queue.snapshot()
 
     if not files:
         messagebox.showwarning("警告", "請添加音頻文件。")
         update_status("就緒", "INFO")
         return
 
-    def is_kanji(ch):
-        return '一' <= ch <= '\u9FFF' or '豈' <= ch <= '\uFAFF'
-
-    def convert_to_katakana(input_srt_path, output_srt_path):
-        """
-        Convert Japanese text in SRT file to Katakana / 將 SRT 檔案中的日文文字轉換為片假名
-        
-        Args:
-            input_srt_path: Input SRT file path / 輸入 SRT 檔案路徑
-            output_srt_path: Output SRT file path / 輸出 SRT 檔案路徑
-        """
-        # Initialize kakasi instance for conversion / 初始化 kakasi 實例進行轉換
-        kakasi_instance = kakasi()
-        kakasi_instance.setMode("J", "H")  # Kanji to Hiragana / 漢字轉平假名
-        kakasi_instance.setMode('H', 'K')  # Hiragana to Katakana / 平假名轉片假名
-        conv = kakasi_instance.getConverter()
-
-        with open(input_srt_path, 'r', encoding='utf-8') as file:
-            srt_content = file.readlines()
-
-        converted_lines = []
-        for line in srt_content:
-            if not line.strip():
-                converted_lines.append(line)
-            elif '-->' in line:
-                converted_lines.append(line)
-            elif line.strip().isdigit():
-                converted_lines.append(line)
-            else:
-                new_line = ''
-                for ch in line:
-                    if is_kanji(ch):
-                        new_line += conv.do(ch)
-                    else:
-                        new_line += ch
-                converted_lines.append(new_line)
-
-        with open(output_srt_path, 'w', encoding='utf-8') as file:
-            file.writelines(converted_lines)
-
     # Run conversion in new thread / 在新線程中運行轉換
-    def run_japanese_to_katakana():
+    def run_japanese_to_katakana(job):
+        import katakana  # Lazy import, pykakasi is only loaded when needed / 延遲導入，只在需要時載入 pykakasi
+        from actions import get_unique_output_path
         converted_count = 0
         try:
-            for i, file in enumerate(files):
-                if pause_flag.is_set():
-                    log_t("conversion_paused", level="warning")
-                    break
-                
-                # Get base file path (without extension) / 獲取基礎檔案路徑（不含副檔名）
-                base_path = os.path.splitext(file)[0]
-                file_dir = os.path.dirname(file) if os.path.dirname(file) else '.'
-                
-                # Try to find SRT file (priority: _coreml.srt > _cpu.srt > .srt) / 嘗試尋找 SRT 檔案（優先順序：_coreml.srt > _cpu.srt > .srt）
-                srt_file = None
-                possible_srt_files = [
-                    os.path.join(file_dir, f"{os.path.basename(base_path)}_coreml.srt"),
-                    os.path.join(file_dir, f"{os.path.basename(base_path)}_cpu.srt"),
-                    os.path.join(file_dir, f"{os.path.basename(base_path)}.srt")
-                ]
-                
-                for possible_srt in possible_srt_files:
-                    if os.path.exists(possible_srt):
-                        srt_file = possible_srt
-                        break
-                
-                if srt_file and os.path.exists(srt_file):
-                    log_t("converting_file", filename=os.path.basename(srt_file))
+            pairs = []
+            taken = set()  # Outputs handed out before any is written / 寫入前已分配的輸出
+            for file in files:
+                # Find SRT file (priority: _coreml.srt > _cpu.srt > .srt) / 尋找 SRT 檔案（優先順序：_coreml.srt > _cpu.srt > .srt）
+                srt_file = actions.find_srt_file(file)
+                if srt_file in (pair[0] for pair in pairs):
+                    # Same transcript as an earlier input (talk.mp4 and talk.wav) / 與較早的輸入使用相同字幕（talk.mp4 與 talk.wav）
+                    continue
+                if srt_file:
                     # Use get_unique_output_path to generate non-duplicate filename / 使用 get_unique_output_path 生成不重複的檔案名
-                    from actions import get_unique_output_path
-                    base_path = os.path.splitext(srt_file)[0]
-                    output_srt_file = get_unique_output_path(base_path, 'katakana')
-                    convert_to_katakana(srt_file, output_srt_file)
-                    converted_count += 1
-                    # Update progress / 更新進度
-                    progress = ((i + 1) / len(files)) * 100
-                    update_progress(progress)
+                    output_srt_file = get_unique_output_path(os.path.splitext(srt_file)[0], 'katakana', taken)
+                    pairs.append((srt_file, output_srt_file))
                 else:
                     log_t("srt_not_found", level="warning", filename=os.path.basename(file))
+
+            # Convert all found files across a process pool / 使用行程池轉換所有找到的檔案
+            for srt_file, output_srt_file, _, error in katakana.convert_files(pairs, pause_flag=job.cancel_token):
+                if error is not None:
+                    logger.error(t("message.error.generic_error").format(error=f"{os.path.basename(srt_file)}: {error}"))
+                    continue
+                log_t("converting_file", filename=os.path.basename(srt_file))
+                converted_count += 1
+                # Update progress / 更新進度
+                update_progress((converted_count / len(pairs)) * 100)
+            job.cancel_token.raise_if_cancelled()
             log_t("katakana_completed", count=converted_count)
             update_status(t("status.katakana_completed").format(converted=converted_count, total=len(files)), "INFO")
             root.after(0, lambda: messagebox.showinfo(t("message.info.completed"), t("message.info.katakana_completed").format(count=converted_count)))
+        except JobCancelled:
+            log_t("conversion_paused", level="warning")
+            update_status(t("status.paused"), "WARNING")
         except Exception as e:
             logger.exception(t("message.error.generic_error").format(error=str(e)))
             update_status(t("status.error").format(error=str(e)[:50]), "ERROR")
-            root.after(0, lambda: messagebox.showerror(t("message.error.title"), t("message.error.generic_error").format(error=str(e))))
+            error_text = str(e)  # Closure variable / 閉包變數
+            root.after(0, lambda: messagebox.showerror(t("message.error.title"), t("message.error.generic_error").format(error=error_text)))
+            raise  # Mark job as failed / 將工作標記為失敗
 
-    threading.Thread(target=run_japanese_to_katakana).start()
+    submit_job("katakana", run_japanese_to_katakana, t("button.katakana"), len(files),
+               resources={RESOURCE_KATAKANA: 1}, key=("katakana", tuple(files)))
 
 # Main function, create GUI and run / 主函數，創建 GUI 並運行
 # Add global variable declaration at top of file / 在文件頂部添加全局變量聲明
@@ -483,12 +634,11 @@ def run():
     Main function to create and run GUI / 創建並運行 GUI 的主函數
     """
     global root, file_listbox, language_combobox, translate_combobox
-    global coreml_button, cpu_button, translate_button, katakana_button, pause_button
+    global coreml_button, cpu_button, translate_button, katakana_button, pause_button, resume_button
     global add_button, add_folder_button, remove_button, log_textbox, log_queue
-    global language_label, translate_label, log_label, license_label
+    global language_label, translate_label, log_label, license_label, jobs_textbox, policy_combobox, cpu_engine_combobox, profile_combobox
 
     # Load language setting / 載入語言設定
-    from config import config
     load_language(getattr(config, 'GUI_LANGUAGE', 'zh_TW'))
     
     log_t("app_started")
@@ -499,11 +649,11 @@ def run():
     # Create main window / 建立主視窗
     root = ctk.CTk()
     root.title(t("window.title", "Whisper Transcription GUI"))
-    root.geometry("900x750")  # Adjust height to accommodate log area / 調整高度以容納日誌區域
+    root.geometry("900x840")  # Adjust height to accommodate log area / 調整高度以容納日誌區域
     log_t("window_created")
     
-    # Create log queue and GUI handler / 建立日誌隊列和 GUI handler
-    log_queue = queue.Queue()
+    # Create bounded log buffer and GUI handler / 建立有上限的日誌緩衝區和 GUI handler
+    log_queue = LogRingBuffer()
     gui_handler = GUIHandler(log_queue)
     # Reconfigure logger to include GUI handler / 重新設定 logger 以包含 GUI handler
     setup_logger(level=logging.INFO, gui_handler=gui_handler)
@@ -537,6 +687,40 @@ def run():
     language_combobox.set("auto")  # Set default value / 設定預設值
     language_combobox.pack(pady=5)
 
+    # File order inside a batch, CPU engine and speed profile, side by side / 批次內的檔案順序、CPU 引擎與速度設定檔，並排顯示
+    options_frame = ctk.CTkFrame(root, fg_color="transparent")
+    options_frame.pack(pady=5)
+    policy_label = ctk.CTkLabel(options_frame, text=t("label.schedule"), font=ctk.CTkFont(size=14))
+    policy_label.grid(row=0, column=0, padx=10, pady=5)
+    policy_combobox = ctk.CTkComboBox(
+        options_frame,
+        values=[t(f"schedule.{policy}", policy) for policy in POLICIES],
+        width=200,
+        height=32
+    )
+    policy_combobox.set(t(f"schedule.{config.SCHEDULE_POLICY}", config.SCHEDULE_POLICY))
+    policy_combobox.grid(row=1, column=0, padx=10, pady=5)
+    cpu_engine_label = ctk.CTkLabel(options_frame, text=t("label.cpu_engine"), font=ctk.CTkFont(size=14))
+    cpu_engine_label.grid(row=0, column=1, padx=10, pady=5)
+    cpu_engine_combobox = ctk.CTkComboBox(
+        options_frame,
+        values=[t(f"engine.{name}", name) for name in CPU_ENGINES],
+        width=240,
+        height=32
+    )
+    cpu_engine_combobox.set(t(f"engine.{config.CPU_ENGINE}", config.CPU_ENGINE))
+    cpu_engine_combobox.grid(row=1, column=1, padx=10, pady=5)
+    profile_label = ctk.CTkLabel(options_frame, text=t("label.speed_profile"), font=ctk.CTkFont(size=14))
+    profile_label.grid(row=0, column=2, padx=10, pady=5)
+    profile_combobox = ctk.CTkComboBox(
+        options_frame,
+        values=[t(f"profile.{profile}", profile) for profile in PROFILES],
+        width=200,
+        height=32
+    )
+    profile_combobox.set(t(f"profile.{config.SPEED_PROFILE}", config.SPEED_PROFILE))
+    profile_combobox.grid(row=1, column=2, padx=10, pady=5)
+
     # Translation language / 翻譯語言
     translate_label = ctk.CTkLabel(root, text=t("label.translate_to"), font=ctk.CTkFont(size=14))
     translate_label.pack(pady=5)
@@ -564,9 +748,30 @@ def run():
     translate_button.pack(side="left", padx=10)
     pause_button = ctk.CTkButton(button_frame, text=t("button.pause"), command=pause_task, width=100, height=32)
     pause_button.pack(side="left", padx=10)
+    resume_button = ctk.CTkButton(button_frame, text=t("button.resume"), command=resume_task, width=100, height=32)
+    resume_button.pack(side="left", padx=10)
     katakana_button = ctk.CTkButton(button_frame, text=t("button.katakana"), command=japanese_to_katakana, width=140, height=32)
     katakana_button.pack(side="left", padx=10)
 
+    # Job status area / 工作狀態區域
+    jobs_frame = ctk.CTkFrame(root)
+    jobs_frame.pack(pady=5, padx=20, fill="x")
+    jobs_label = ctk.CTkLabel(jobs_frame, text=t("label.jobs"), font=ctk.CTkFont(size=12))
+    jobs_label.pack(anchor="w", padx=10, pady=(5, 0))
+    jobs_textbox = ctk.CTkTextbox(jobs_frame, width=860, height=80, state="disabled", font=ctk.CTkFont(size=11))
+    jobs_textbox.pack(pady=5, padx=10, fill="x")
+    refresh_job_display()
+
+    # Live throughput dashboard / 即時吞吐量儀表板
+    dashboard_frame = ctk.CTkFrame(root)
+    dashboard_frame.pack(pady=5, padx=20, fill="x")
+    dashboard_label = ctk.CTkLabel(dashboard_frame, text=t("label.dashboard"), font=ctk.CTkFont(size=12))
+    dashboard_label.pack(anchor="w", padx=10, pady=(5, 0))
+    dashboard_text = ctk.CTkLabel(dashboard_frame, text="", justify="left", anchor="w", font=ctk.CTkFont(size=11))
+    dashboard_text.pack(anchor="w", padx=10, pady=(0, 5), fill="x")
+    dashboard = DashboardPanel(dashboard_text, fps=config.DASHBOARD_FPS)
+    dashboard.start(root, on_error=lambda e: logger.warning(f"儀表板更新失敗: {e}"))
+
     # Log display area / 日誌顯示區域
     log_frame = ctk.CTkFrame(root)
     log_frame.pack(pady=10, padx=20, fill="both", expand=True)
@@ -578,35 +783,9 @@ def run():
     log_textbox.pack(pady=5, padx=10, fill="both", expand=True)
     log_t("log_area_initialized")
     
-    # Periodically check log queue and update GUI / 定期檢查日誌隊列並更新 GUI
-    def process_log_queue():
-        """
-        Process messages in log queue / 處理日誌隊列中的訊息
-        """
-        try:
-            while True:
-                try:
-                    msg = log_queue.get_nowait()
-                    # Update GUI in main thread / 在主線程中更新 GUI
-                    log_textbox.configure(state="normal")
-                    log_textbox.insert("end", msg + "\n")
-                    # Auto-scroll to bottom / 自動滾動到底部
-                    log_textbox.see("end")
-                    # Limit log lines (keep last 1000 lines) / 限制日誌行數（保留最後 1000 行）
-                    lines = log_textbox.get("1.0", "end").split("\n")
-                    if len(lines) > 1000:
-                        log_textbox.delete("1.0", f"{len(lines) - 1000}.0")
-                    log_textbox.configure(state="disabled")
-                except queue.Empty:
-                    break
-        except Exception as e:
-            logger.error(t("log.log_queue_error").format(error=str(e)))
-        
-        # Check every 100ms / 每 100ms 檢查一次
-        root.after(100, process_log_queue)
-    
-    # Start processing log queue / 開始處理日誌隊列
-    process_log_queue()
+    # Periodically drain log buffer and update GUI (batched, bounded) / 定期取出日誌緩衝區並更新 GUI（批次、有上限）
+    log_console = LogConsole(log_textbox, log_queue)
+    log_console.start(root, on_error=lambda e: logger.error(t("log.log_queue_error").format(error=str(e))))
 
     # Copyright information / 版權信息
     license_label = ctk.CTkLabel(root, text=t("label.license"), font=ctk.CTkFont(size=10))
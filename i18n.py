@@ -1,6 +1,9 @@
 """
 Internationalization (i18n) module / 國際化（i18n）模組
 Provides multi-language support functionality / 提供多語言支援功能
+
+Each language file is compiled once into a flat 'section.key' -> text table and cached, / 每個語言檔只會編譯一次成扁平的 'section.key' -> 文字對照表並快取，
+so t() is a single dict lookup. / 因此 t() 只需要一次字典查詢。
 """
 
 import json
@@ -16,70 +19,130 @@ DEFAULT_LANGUAGE = "zh_TW"
 # Current language / 當前語言
 _current_language = DEFAULT_LANGUAGE
 _translations = {}
+_initialized = False
+
+# Compiled catalogs by language code / 依語言代碼快取的已編譯語言表
+_catalogs = {}
 
 
 def get_lang_file(lang_code):
     """
     Get language file path / 取得語言文件路徑
-    
+
     Args:
         lang_code: Language code (e.g., 'en_US', 'zh_TW') / 語言代碼（例如：'en_US'、'zh_TW'）
-    
+
     Returns:
         Path: Path to the language file / 語言文件的路徑
     """
     return LANG_DIR / f"{lang_code}.json"
 
 
+def compile_catalog(data, prefix=""):
+    """
+    Flatten nested language data into a 'section.key' -> value table / 將巢狀語言資料攤平成 'section.key' -> 值 的對照表
+
+    Section nodes are kept as well, so t('section') still returns the nested dict. / 區段節點也會保留，因此 t('section') 仍返回巢狀字典。
+    Empty values are left out, so lookups fall back to the default. / 空值不會加入，查詢時會使用預設值。
+
+    Args:
+        data: Parsed language JSON / 解析後的語言 JSON
+        prefix: Key prefix (used for recursion) / 鍵值前綴（遞迴使用）
+
+    Returns:
+        dict: Flat table / 扁平對照表
+    """
+    table = {}
+    for key, value in data.items():
+        full_key = f"{prefix}{key}"
+        if value:
+            table[full_key] = value
+        if isinstance(value, dict):
+            table.update(compile_catalog(value, f"{full_key}."))
+    return table
+
+
+def _load_catalog(lang_code):
+    """
+    Load and compile a language file, cached per language / 載入並編譯語言檔，依語言快取
+
+    Returns:
+        dict: Flat table, or None if the file is missing or invalid / 扁平對照表，檔案不存在或格式錯誤時返回 None
+    """
+    if lang_code in _catalogs:
+        return _catalogs[lang_code]
+    lang_file = get_lang_file(lang_code)
+    if not lang_file.exists():
+        return None
+    try:
+        with open(lang_file, 'r', encoding='utf-8') as f:
+            catalog = compile_catalog(json.load(f))
+    except Exception as e:
+        print(f"Error loading language file {lang_file}: {e}")
+        return None
+    _catalogs[lang_code] = catalog
+    return catalog
+
+
 def load_language(lang_code):
     """
     Load specified language / 載入指定語言
-    
+
     Args:
         lang_code: Language code to load / 要載入的語言代碼
-    
+
     Returns:
         bool: True if loaded successfully, False otherwise / 成功載入返回 True，否則返回 False
     """
-    global _current_language, _translations
-    
-    lang_file = get_lang_file(lang_code)
-    
-    if not lang_file.exists():
+    global _current_language, _translations, _initialized
+
+    _initialized = True
+    catalog = _load_catalog(lang_code)
+
+    if catalog is None:
         # If language file doesn't exist, try to use default language / 如果語言文件不存在，嘗試使用預設語言
-        if lang_code != DEFAULT_LANGUAGE:
+        if lang_code != DEFAULT_LANGUAGE and get_lang_file(DEFAULT_LANGUAGE).exists():
             return load_language(DEFAULT_LANGUAGE)
-        # If default language also doesn't exist, return empty dict / 如果預設語言也不存在，返回空字典
+        # If default language also doesn't exist, use empty table / 如果預設語言也不存在，使用空對照表
         _translations = {}
         _current_language = lang_code
         return False
-    
+
+    _translations = catalog
+    _current_language = lang_code
+    return True
+
+
+def _ensure_initialized():
+    """
+    Load the configured language on first use / 第一次使用時載入設定的語言
+    """
+    if _initialized:
+        return
     try:
-        with open(lang_file, 'r', encoding='utf-8') as f:
-            _translations = json.load(f)
-        _current_language = lang_code
-        return True
-    except Exception as e:
-        print(f"Error loading language file {lang_file}: {e}")
-        _translations = {}
-        _current_language = lang_code
-        return False
+        from config import config
+        initial_lang = getattr(config, 'GUI_LANGUAGE', DEFAULT_LANGUAGE)
+        load_language(initial_lang)
+    except Exception:
+        # If config loading fails, use default language / 如果 config 載入失敗，使用預設語言
+        load_language(DEFAULT_LANGUAGE)
 
 
 def get_current_language():
     """
     Get current language code / 取得當前語言代碼
-    
+
     Returns:
         str: Current language code / 當前語言代碼
     """
+    _ensure_initialized()
     return _current_language
 
 
 def get_available_languages():
     """
     Get list of available languages / 取得可用的語言列表
-    
+
     Returns:
         dict: Dictionary mapping language codes to language names / 語言代碼到語言名稱的字典
     """
@@ -87,49 +150,57 @@ def get_available_languages():
     if LANG_DIR.exists():
         for lang_file in LANG_DIR.glob("*.json"):
             lang_code = lang_file.stem
-            try:
-                with open(lang_file, 'r', encoding='utf-8') as f:
-                    lang_data = json.load(f)
-                    languages[lang_code] = lang_data.get('language_name', lang_code)
-            except:
-                pass
+            catalog = _load_catalog(lang_code)
+            if catalog is not None:
+                languages[lang_code] = catalog.get('language_name', lang_code)
     return languages
 
 
 def t(key, default=None):
     """
     Translation function / 翻譯函數
-    
+
     Args:
         key: Translation key (supports dot-separated nested keys, e.g., 'button.add') / 翻譯鍵值（可以使用點號分隔的嵌套鍵，如 'button.add'）
         default: Default value to return if translation not found / 如果找不到翻譯時返回的預設值
-    
+
     Returns:
         str: Translated text, or key/default if not found / 翻譯後的文字，如果找不到則返回 key 或 default
     """
-    global _translations
-    
-    if not _translations:
-        return default if default is not None else key
-    
-    # Support dot-separated nested keys / 支援點號分隔的嵌套鍵
-    keys = key.split('.')
-    value = _translations
-    
-    try:
-        for k in keys:
-            value = value[k]
-        return value if value else (default if default is not None else key)
-    except (KeyError, TypeError):
+    if not _initialized:
+        _ensure_initialized()
+    value = _translations.get(key)
+    if value is None:
         return default if default is not None else key
+    return value
 
 
-# Initialize: Load language setting from config / 初始化：從 config 載入語言設定
-try:
-    from config import config
-    initial_lang = getattr(config, 'GUI_LANGUAGE', DEFAULT_LANGUAGE)
-    load_language(initial_lang)
-except:
-    # If config loading fails, use default language / 如果 config 載入失敗，使用預設語言
-    load_language(DEFAULT_LANGUAGE)
+class LazyText:
+    """
+    Translated message formatted only when converted to str / 轉換成字串時才格式化的翻譯訊息
 
+    Pass it to logger calls so the lookup and str.format() only run for records that are emitted. / 傳給 logger，只有真正輸出的記錄才會查詢與執行 str.format()。
+    """
+
+    __slots__ = ("key", "default", "kwargs")
+
+    def __init__(self, key, default=None, **kwargs):
+        """
+        Args:
+            key: Translation key / 翻譯鍵值
+            default: Fallback text / 找不到時使用的文字
+            **kwargs: Format parameters / 格式化參數
+        """
+        self.key = key
+        self.default = default
+        self.kwargs = kwargs
+
+    def __str__(self):
+        message = t(self.key, self.default)
+        if self.kwargs:
+            try:
+                message = message.format(**self.kwargs)
+            except (KeyError, IndexError, ValueError):
+                # If formatting fails, return original message / 如果格式化失敗，返回原始訊息
+                pass
+        return message
@@ -0,0 +1,255 @@
+"""
+Job executor module / 工作執行器模組
+Single queue of typed jobs with per-resource concurrency limits / 具有各資源併發上限的單一型別化工作佇列
+
+Every GUI action is submitted here instead of spawning its own thread, so batches that / 所有 GUI 動作都提交到這裡，而不是各自建立線程，
+compete for the same resource (engine cores, translation API) run one after another. / 因此競爭相同資源（引擎核心、翻譯 API）的批次會依序執行。
+"""
+import itertools
+import threading
+import time
+
+from logger import logger
+from cancellation import CancelToken, JobCancelled
+from event_bus import bus, KEY_QUEUE_DEPTH, KEY_JOBS_RUNNING
+
+# Job states / 工作狀態
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+ACTIVE_STATES = (JOB_QUEUED, JOB_RUNNING)
+
+# Resource names / 資源名稱
+RESOURCE_ENGINE = "engine"            # Transcription engine slots (CPU/GPU heavy) / 轉錄引擎槽位（CPU/GPU 密集）
+RESOURCE_TRANSLATION = "translation"  # Translation API slots / 翻譯 API 槽位
+RESOURCE_KATAKANA = "katakana"        # Katakana conversion (uses its own process pool) / 片假名轉換（自帶行程池）
+
+_job_ids = itertools.count(1)
+
+
+class Job:
+    """
+    A unit of work submitted to the executor / 提交給執行器的工作單位
+    """
+
+    def __init__(self, kind, func, name=None, resources=None, key=None):
+        """
+        Args:
+            kind: Job type (e.g., 'coreml', 'cpu', 'translate', 'katakana') / 工作類型
+            func: Callable run in a worker thread, receives the Job (check job.cancel_token) / 在工作線程中執行的函數，接收 Job 作為參數（需檢查 job.cancel_token）
+            name: Display name (default: kind) / 顯示名稱（預設為 kind）
+            resources: Dict of resource name -> slots needed / 資源名稱 -> 所需槽位數
+            key: De-duplication key, a job with the same active key is rejected / 去重鍵值，相同鍵值的工作執行中時會被拒絕
+        """
+        self.id = next(_job_ids)
+        self.kind = kind
+        self.func = func
+        self.name = name or kind
+        self.resources = dict(resources or {})
+        self.key = key
+        self.cancel_token = CancelToken()
+        self.status = JOB_QUEUED
+        self.error = None
+        self.result = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def elapsed(self):
+        """
+        Running time in seconds (0 if not started) / 執行時間（秒，未開始為 0）
+        """
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def __repr__(self):
+        return f"<Job #{self.id} {self.name} {self.status}>"
+
+
+class JobExecutor:
+    """
+    Resource-aware job executor / 具資源感知的工作執行器
+    """
+
+    def __init__(self, limits=None, history_size=50):
+        """
+        Args:
+            limits: Dict of resource name -> max concurrent slots (unlisted resources: 1) / 資源名稱 -> 最大併發槽位（未列出的資源為 1）
+            history_size: Number of finished jobs kept for display / 保留顯示的已完成工作數量
+        """
+        self.limits = dict(limits or {})
+        self.history_size = history_size
+        self._pending = []
+        self._running = []
+        self._finished = []
+        self._in_use = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.version = 0  # Incremented on every state change / 每次狀態改變時遞增
+
+    def add_listener(self, callback):
+        """
+        Register a status change callback (called from worker threads) / 註冊狀態改變回調（會在工作線程中呼叫）
+
+        Args:
+            callback: Function receiving the changed Job / 接收變更 Job 的函數
+        """
+        self._listeners.append(callback)
+
+    def submit(self, job):
+        """
+        Queue a job / 將工作加入佇列
+
+        Args:
+            job: Job to run / 要執行的工作
+
+        Returns:
+            Job: The queued job, or None if an identical job is already active / 已排入的工作，若相同工作仍在執行則返回 None
+        """
+        with self._lock:
+            if job.key is not None and any(j.key == job.key for j in self._pending + self._running):
+                logger.warning(f"相同的工作已在佇列中，略過: {job.name}")
+                return None
+            self._pending.append(job)
+            self.version += 1
+        logger.info(f"工作已加入佇列: #{job.id} {job.name}")
+        self._notify(job)
+        self._dispatch()
+        return job
+
+    def cancel_pending(self):
+        """
+        Cancel all jobs that have not started / 取消所有尚未開始的工作
+
+        Returns:
+            list: Cancelled jobs / 被取消的工作
+        """
+        with self._lock:
+            cancelled, self._pending = self._pending, []
+            for job in cancelled:
+                job.cancel_token.cancel("cancelled before start")
+                job.status = JOB_CANCELLED
+                job.finished_at = time.time()
+                self._remember(job)
+            self.version += 1
+        for job in cancelled:
+            logger.warning(f"工作已取消: #{job.id} {job.name}")
+            self._notify(job)
+        return cancelled
+
+    def cancel_all(self, reason="cancelled by user"):
+        """
+        Cancel queued jobs and signal running jobs (their engine processes are terminated) / 取消排隊中的工作並通知執行中的工作（終止其引擎進程）
+
+        Args:
+            reason: Cancellation reason / 取消原因
+
+        Returns:
+            int: Number of jobs affected / 受影響的工作數
+        """
+        cancelled = self.cancel_pending()
+        with self._lock:
+            running = list(self._running)
+        for job in running:
+            logger.warning(f"要求取消執行中的工作: #{job.id} {job.name}")
+            job.cancel_token.cancel(reason)
+        return len(cancelled) + len(running)
+
+    def jobs(self):
+        """
+        Get snapshot of running, queued and recently finished jobs / 取得執行中、排隊中與最近完成工作的快照
+
+        Returns:
+            list: Jobs (running first, then queued in dispatch order, then finished newest first) / 工作列表
+        """
+        with self._lock:
+            return list(self._running) + list(self._pending) + list(reversed(self._finished))
+
+    def queue_depth(self):
+        """
+        Number of jobs waiting to start / 等待開始的工作數
+        """
+        return len(self._pending)
+
+    def is_busy(self):
+        """
+        Check if any job is queued or running / 檢查是否有工作排隊或執行中
+        """
+        return bool(self._pending or self._running)
+
+    def _fits(self, job):
+        return all(
+            self._in_use.get(name, 0) + count <= self.limits.get(name, 1)
+            for name, count in job.resources.items()
+        )
+
+    def _dispatch(self):
+        """
+        Start every queued job whose resources are available / 啟動所有資源足夠的排隊工作
+
+        A job never overtakes an earlier job waiting for the same resource. / 工作不會超越等待相同資源的較早工作。
+        """
+        started = []
+        with self._lock:
+            blocked = set()
+            for job in list(self._pending):
+                if blocked.intersection(job.resources):
+                    continue
+                if not self._fits(job):
+                    blocked.update(job.resources)
+                    continue
+                for name, count in job.resources.items():
+                    self._in_use[name] = self._in_use.get(name, 0) + count
+                self._pending.remove(job)
+                self._running.append(job)
+                job.status = JOB_RUNNING
+                job.started_at = time.time()
+                started.append(job)
+            if started:
+                self.version += 1
+        for job in started:
+            logger.info(f"工作開始執行: #{job.id} {job.name}")
+            self._notify(job)
+            threading.Thread(target=self._run, args=(job,), daemon=True, name=f"job-{job.id}").start()
+
+    def _run(self, job):
+        try:
+            job.result = job.func(job)
+            status = JOB_CANCELLED if job.cancel_token.is_set() else JOB_DONE
+        except JobCancelled:
+            status = JOB_CANCELLED
+        except Exception as e:
+            job.error = e
+            # Errors caused by killing the engine count as cancellation / 因終止引擎而產生的錯誤視為取消
+            status = JOB_CANCELLED if job.cancel_token.is_set() else JOB_FAILED
+            if status == JOB_FAILED:
+                logger.error(f"工作執行失敗: #{job.id} {job.name}: {e}")
+        with self._lock:
+            job.status = status
+            job.finished_at = time.time()
+            self._running.remove(job)
+            for name, count in job.resources.items():
+                self._in_use[name] -= count
+            self._remember(job)
+            self.version += 1
+        logger.info(f"工作結束: #{job.id} {job.name} ({status}, {job.elapsed:.1f} 秒)")
+        self._notify(job)
+        self._dispatch()
+
+    def _remember(self, job):
+        self._finished.append(job)
+        del self._finished[:-self.history_size]
+
+    def _notify(self, job):
+        bus.set(KEY_QUEUE_DEPTH, len(self._pending))
+        bus.set(KEY_JOBS_RUNNING, len(self._running))
+        for callback in self._listeners:
+            try:
+                callback(job)
+            except Exception as e:
+                logger.warning(f"工作狀態回調失敗: {e}")
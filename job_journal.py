@@ -0,0 +1,377 @@
+"""
+Batch job journal module / 批次工作日誌模組
+Durable on-disk record of each batch's files, parameters and per-file state / 以磁碟持久保存每個批次的檔案、參數與各檔案狀態
+
+Each batch is an append-only JSON lines file in journals/. Every state transition is / 每個批次是 journals/ 中只會附加的 JSON lines 檔案。
+flushed and fsync'ed, so an interrupted run (pause, crash, power loss) can be resumed: / 每次狀態轉換都會 flush 並 fsync，因此被中斷的執行（暫停、當機、斷電）都可以恢復：
+finished files are skipped and in-flight files are queued again. / 已完成的檔案會略過，處理中的檔案會重新排入。
+Only the newest JOURNAL_KEEP completed journals are kept. / 只保留最新的 JOURNAL_KEEP 個已完成日誌。
+
+The job running a batch holds an flock on its journal file until the batch ends, so a journal / 執行批次的工作在批次結束前持有日誌檔案的 flock，
+that a live job (in this or another process) still holds is never resumed or pruned. / 因此仍被執行中工作（本進程或其他進程）持有的日誌不會被恢復或刪除。
+"""
+import fcntl
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from logger import logger
+
+# Journal directory / 日誌目錄
+JOURNAL_DIR = Path(__file__).parent / "journals"
+
+# File states / 檔案狀態
+FILE_PENDING = "pending"
+FILE_RUNNING = "running"
+FILE_DONE = "done"
+FILE_FAILED = "failed"
+
+# Batch end states / 批次結束狀態
+BATCH_COMPLETED = "completed"
+BATCH_CANCELLED = "cancelled"
+BATCH_FAILED = "failed"
+
+
+def _try_lock(path, create=False):
+    """
+    Take the owner lock of a journal file / 取得日誌檔案的擁有者鎖
+
+    flock locks belong to the open file, so a second open in the same process conflicts too, / flock 鎖屬於開啟的檔案，同一進程再次開啟也會衝突，
+    and the descriptor is not inherited by engine processes. / 且描述符不會被引擎進程繼承。
+
+    Returns:
+        int: Locked file descriptor, None if another job holds the journal / 已鎖定的檔案描述符，其他工作持有時為 None
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | (os.O_CREAT if create else 0), 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def is_locked(path):
+    """
+    Check if a live job holds the journal / 檢查日誌是否被執行中的工作持有
+    """
+    try:
+        fd = _try_lock(path)
+    except OSError:
+        return False
+    if fd is None:
+        return True
+    os.close(fd)
+    return False
+
+
+class BatchJournal:
+    """
+    Append-only journal for one batch / 單一批次的只附加日誌
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Journal file path / 日誌檔案路徑
+        """
+        self.path = Path(path)
+        self.batch_id = self.path.stem
+        self.action = None
+        self.files = []
+        self.params = {}
+        self.created_at = None
+        self.end_state = None
+        self.file_states = {}
+        self.outputs = {}
+        self.errors = {}
+        self._lock_fd = None
+
+    # ==================== Creation and loading / 建立與載入 ====================
+
+    @classmethod
+    def create(cls, action, files, params=None, journal_dir=None):
+        """
+        Create a new batch journal / 建立新的批次日誌
+
+        Args:
+            action: Batch action name (e.g., 'coreml', 'cpu') / 批次動作名稱
+            files: Input files in processing order / 依處理順序的輸入檔案
+            params: Batch parameters needed to resume (JSON serializable) / 恢復時需要的批次參數（可 JSON 序列化）
+            journal_dir: Directory for journals (default: JOURNAL_DIR) / 日誌目錄（預設 JOURNAL_DIR）
+
+        Returns:
+            BatchJournal: New journal / 新的日誌
+        """
+        journal_dir = Path(journal_dir or JOURNAL_DIR)
+        journal_dir.mkdir(parents=True, exist_ok=True)
+        batch_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{action}_{os.urandom(3).hex()}"
+        journal = cls(journal_dir / f"{batch_id}.jsonl")
+        journal._lock_fd = _try_lock(journal.path, create=True)
+        journal._append({
+            "type": "batch",
+            "action": action,
+            "files": list(files),
+            "params": params or {},
+        })
+        logger.info(f"已建立批次日誌: {journal.batch_id}（{len(files)} 個檔案）")
+        return journal
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load and replay a journal file / 載入並重播日誌檔案
+
+        A truncated last line (crash while writing) is ignored. / 最後一行若被截斷（寫入時當機）會被忽略。
+
+        Args:
+            path: Journal file path / 日誌檔案路徑
+
+        Returns:
+            BatchJournal: Loaded journal / 載入的日誌
+        """
+        journal = cls(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"略過損壞的日誌記錄: {journal.batch_id}")
+                    continue
+                journal._apply(record)
+        return journal
+
+    @classmethod
+    def claim(cls, path):
+        """
+        Lock a journal for this job, then load its current state / 為目前的工作鎖定日誌，再載入其目前狀態
+
+        Loading after locking means the state cannot change under the caller, unlike a journal / 鎖定後才載入，狀態不會在呼叫者不知情時改變，
+        listed earlier that another job may have advanced since. / 不同於先前列出、之後可能已被其他工作推進的日誌。
+
+        Args:
+            path: Journal file path / 日誌檔案路徑
+
+        Returns:
+            BatchJournal: Locked journal, None if another job holds it / 已鎖定的日誌，其他工作持有時為 None
+        """
+        fd = _try_lock(path)
+        if fd is None:
+            return None
+        try:
+            journal = cls.load(path)
+        except BaseException:
+            os.close(fd)
+            raise
+        journal._lock_fd = fd
+        return journal
+
+    def release(self):
+        """
+        Release the owner lock (safe to call more than once) / 釋放擁有者鎖（可重複呼叫）
+        """
+        fd, self._lock_fd = self._lock_fd, None
+        if fd is not None:
+            os.close(fd)
+
+    def _apply(self, record):
+        record_type = record.get("type")
+        if record_type == "batch":
+            self.action = record["action"]
+            self.files = record["files"]
+            self.params = record.get("params", {})
+            self.created_at = record.get("ts")
+            self.file_states = {file: FILE_PENDING for file in self.files}
+        elif record_type == "file":
+            file = record["file"]
+            self.file_states[file] = record["state"]
+            if record.get("output"):
+                self.outputs[file] = record["output"]
+            if record.get("error"):
+                self.errors[file] = record["error"]
+        elif record_type == "end":
+            self.end_state = record["state"]
+        elif record_type == "resume":
+            self.end_state = None
+
+    def _append(self, record):
+        """
+        Apply record and durably append it to the journal file / 套用記錄並持久附加到日誌檔案
+        """
+        record["ts"] = time.time()
+        self._apply(record)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ==================== State transitions / 狀態轉換 ====================
+
+    def mark_running(self, file, output=None):
+        """
+        Record that a file started processing / 記錄檔案開始處理
+
+        Args:
+            file: Input file / 輸入檔案
+            output: Planned output path (removed on resume if left half-written) / 預計的輸出路徑（恢復時若為未完成檔案會被移除）
+        """
+        self._append({"type": "file", "file": file, "state": FILE_RUNNING, "output": output})
+
+    def mark_done(self, file, output=None):
+        """
+        Record that a file finished successfully / 記錄檔案成功完成
+        """
+        self._append({"type": "file", "file": file, "state": FILE_DONE, "output": output})
+
+    def mark_failed(self, file, error):
+        """
+        Record that a file failed / 記錄檔案處理失敗
+        """
+        self._append({"type": "file", "file": file, "state": FILE_FAILED, "error": str(error)[:1000]})
+
+    def finish(self, state):
+        """
+        Record batch end state / 記錄批次結束狀態
+
+        Args:
+            state: BATCH_COMPLETED, BATCH_CANCELLED or BATCH_FAILED / 批次結束狀態
+        """
+        self._append({"type": "end", "state": state})
+        self.release()
+        if state == BATCH_COMPLETED:
+            prune_journals(self.path.parent)
+
+    def start_resume(self):
+        """
+        Prepare an interrupted batch for resuming / 準備恢復被中斷的批次
+
+        Half-written outputs of in-flight files are removed and those files go back to pending. / 移除處理中檔案的未完成輸出，並將這些檔案改回待處理。
+
+        Returns:
+            list: Files that still need processing / 仍需處理的檔案
+        """
+        for file, state in list(self.file_states.items()):
+            if state == FILE_RUNNING:
+                output = self.outputs.get(file)
+                if output and os.path.exists(output):
+                    logger.info(f"移除中斷時未完成的輸出檔案: {output}")
+                    try:
+                        os.remove(output)
+                    except OSError as e:
+                        logger.warning(f"移除未完成的輸出檔案失敗: {e}")
+                self._append({"type": "file", "file": file, "state": FILE_PENDING})
+        self._append({"type": "resume"})
+        remaining = self.remaining_files()
+        logger.info(f"恢復批次 {self.batch_id}：已完成 {self.done_count()} 個，剩餘 {len(remaining)} 個檔案")
+        return remaining
+
+    # ==================== Queries / 查詢 ====================
+
+    def is_done(self, file):
+        """
+        Check if a file already finished / 檢查檔案是否已完成
+        """
+        return self.file_states.get(file) == FILE_DONE
+
+    def remaining_files(self):
+        """
+        Files not yet finished, in original order / 尚未完成的檔案（依原始順序）
+        """
+        return [file for file in self.files if self.file_states.get(file) != FILE_DONE]
+
+    def done_count(self):
+        """
+        Number of finished files / 已完成的檔案數
+        """
+        return sum(1 for state in self.file_states.values() if state == FILE_DONE)
+
+    @property
+    def is_complete(self):
+        """
+        True if the batch ended normally / 批次正常結束返回 True
+        """
+        return self.end_state == BATCH_COMPLETED
+
+
+def list_journals(journal_dir=None, incomplete_only=False):
+    """
+    List batch journals, newest first / 列出批次日誌（新的在前）
+
+    Args:
+        journal_dir: Directory for journals (default: JOURNAL_DIR) / 日誌目錄（預設 JOURNAL_DIR）
+        incomplete_only: Only return batches that can be resumed (not finished, not held by a live job) / 只返回可恢復的批次（未完成且未被執行中的工作持有）
+
+    Returns:
+        list: BatchJournal instances / BatchJournal 實例列表
+    """
+    journal_dir = Path(journal_dir or JOURNAL_DIR)
+    if not journal_dir.exists():
+        return []
+    journals = []
+    for path in sorted(journal_dir.glob("*.jsonl"), reverse=True):
+        if incomplete_only and is_locked(path):
+            continue
+        try:
+            journal = BatchJournal.load(path)
+        except (OSError, KeyError) as e:
+            logger.warning(f"無法讀取批次日誌 {path.name}: {e}")
+            continue
+        if incomplete_only and (journal.is_complete or not journal.remaining_files()):
+            continue
+        journals.append(journal)
+    return journals
+
+
+def prune_journals(journal_dir=None, keep=None):
+    """
+    Delete completed journals beyond the newest keep / 刪除超過最新 keep 個的已完成日誌
+
+    Journals that can still be resumed or that a live job holds are never deleted. / 仍可恢復或被執行中工作持有的日誌不會被刪除。
+
+    Args:
+        journal_dir: Directory for journals (default: JOURNAL_DIR) / 日誌目錄（預設 JOURNAL_DIR）
+        keep: Completed journals kept (None: JOURNAL_KEEP, 0: all) / 保留的已完成日誌數量（None：JOURNAL_KEEP，0：全部）
+
+    Returns:
+        int: Number of deleted journals / 刪除的日誌數量
+    """
+    if keep is None:
+        from config import config
+        keep = config.JOURNAL_KEEP
+    if not keep:
+        return 0
+    completed = [journal for journal in list_journals(journal_dir) if journal.is_complete]
+    deleted = 0
+    for journal in completed[keep:]:
+        if is_locked(journal.path):
+            continue
+        try:
+            journal.path.unlink()
+            deleted += 1
+        except OSError as e:
+            logger.warning(f"刪除舊的批次日誌失敗 {journal.path.name}: {e}")
+    if deleted:
+        logger.debug(f"已刪除 {deleted} 個舊的批次日誌")
+    return deleted
+
+
+def find_journal(batch_id, journal_dir=None):
+    """
+    Load journal by batch id / 依批次 ID 載入日誌
+
+    Args:
+        batch_id: Batch id (journal file stem) / 批次 ID（日誌檔名）
+
+    Returns:
+        BatchJournal: Loaded journal / 載入的日誌
+
+    Raises:
+        FileNotFoundError: If no journal exists for the id / 找不到對應日誌時拋出
+    """
+    path = Path(journal_dir or JOURNAL_DIR) / f"{batch_id}.jsonl"
+    if not path.exists():
+        raise FileNotFoundError(f"找不到批次日誌: {batch_id}")
+    return BatchJournal.load(path)
@@ -0,0 +1,226 @@
+"""
+Japanese to Katakana conversion module / 日文轉片假名模組
+Converts kanji in SRT subtitle files to Katakana readings / 將 SRT 字幕檔案中的漢字轉換為片假名讀音
+
+Whole kanji runs are converted in a single call (keeps compound-word readings), / 整段連續漢字一次轉換（保留複合詞讀音），
+repeated runs are memoized, and multiple files are fanned out across a process pool. / 重複出現的漢字段會被快取，多個檔案會分散到行程池處理。
+"""
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+from event_bus import bus, CACHE_PREFIX
+
+# Kanji run pattern (CJK Unified Ideographs + Compatibility Ideographs) / 連續漢字的正規表示式（CJK 統一漢字 + 相容漢字）
+KANJI_RUN_PATTERN = re.compile('[\u4E00-\u9FFF\uF900-\uFAFF]+')
+
+# Default memoization size (number of distinct kanji runs) / 預設快取大小（不同漢字段的數量）
+DEFAULT_CACHE_SIZE = 65536
+
+# Per-process converter instance / 每個行程的轉換器實例
+_converter = None
+_converter_lock = threading.Lock()
+
+
+def is_kanji(ch):
+    """
+    Check if character is kanji / 檢查字元是否為漢字
+
+    Args:
+        ch: Single character / 單一字元
+
+    Returns:
+        bool: True if character is kanji / 是漢字返回 True
+    """
+    return '一' <= ch <= '\u9FFF' or '豈' <= ch <= '\uFAFF'
+
+
+def _is_passthrough_line(line):
+    """
+    Check if SRT line should be kept as-is (blank, index or timestamp line) / 檢查 SRT 行是否應保持原樣（空行、序號或時間軸）
+    """
+    stripped = line.strip()
+    return not stripped or '-->' in line or stripped.isdigit()
+
+
+class KatakanaConverter:
+    """
+    Reusable kanji-run to Katakana converter / 可重複使用的漢字段轉片假名轉換器
+    """
+
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            cache_size: Maximum number of memoized kanji runs / 快取的漢字段最大數量
+        """
+        # Lazy import so the module can be imported without pykakasi / 延遲導入，沒有安裝 pykakasi 也能導入此模組
+        from pykakasi import kakasi
+
+        kakasi_instance = kakasi()
+        kakasi_instance.setMode("J", "H")  # Kanji to Hiragana / 漢字轉平假名
+        kakasi_instance.setMode("H", "K")  # Hiragana to Katakana / 平假名轉片假名
+        self._conv = kakasi_instance.getConverter()
+        self.convert_run = lru_cache(maxsize=cache_size)(self._convert_run_uncached)
+
+    def _convert_run_uncached(self, run):
+        return self._conv.do(run)
+
+    def _replace_match(self, match):
+        return self.convert_run(match.group(0))
+
+    def convert_line(self, line):
+        """
+        Convert all kanji runs in a line / 轉換一行中所有的連續漢字
+
+        Args:
+            line: Text line / 文字行
+
+        Returns:
+            str: Converted line / 轉換後的文字行
+        """
+        return KANJI_RUN_PATTERN.sub(self._replace_match, line)
+
+    def convert_lines(self, lines):
+        """
+        Convert SRT lines, keeping index, timestamp and blank lines unchanged / 轉換 SRT 行，序號、時間軸和空行保持不變
+
+        Args:
+            lines: Iterable of SRT lines / SRT 行的可迭代物件
+
+        Returns:
+            list: Converted lines / 轉換後的行列表
+        """
+        convert_line = self.convert_line
+        return [line if _is_passthrough_line(line) else convert_line(line) for line in lines]
+
+    def convert_srt_file(self, input_srt_path, output_srt_path):
+        """
+        Convert Japanese text in SRT file to Katakana / 將 SRT 檔案中的日文文字轉換為片假名
+
+        Args:
+            input_srt_path: Input SRT file path / 輸入 SRT 檔案路徑
+            output_srt_path: Output SRT file path / 輸出 SRT 檔案路徑
+
+        Returns:
+            int: Number of lines processed / 處理的行數
+        """
+        with open(input_srt_path, 'r', encoding='utf-8') as file:
+            lines = file.readlines()
+
+        converted_lines = self.convert_lines(lines)
+
+        with open(output_srt_path, 'w', encoding='utf-8') as file:
+            file.write(''.join(converted_lines))
+        return len(lines)
+
+    def cache_info(self):
+        """
+        Get memoization statistics / 取得快取統計
+
+        Returns:
+            functools._CacheInfo: hits, misses, maxsize, currsize / 命中、未命中、上限、目前大小
+        """
+        return self.convert_run.cache_info()
+
+
+def get_converter():
+    """
+    Get the per-process shared converter (created on first use) / 取得每個行程共用的轉換器（首次使用時建立）
+
+    Returns:
+        KatakanaConverter: Shared converter instance / 共用的轉換器實例
+    """
+    global _converter
+    if _converter is None:
+        with _converter_lock:
+            if _converter is None:
+                _converter = KatakanaConverter()
+    return _converter
+
+
+def convert_srt_file(input_srt_path, output_srt_path):
+    """
+    Convert one SRT file with the shared converter / 使用共用轉換器轉換單一 SRT 檔案
+
+    Args:
+        input_srt_path: Input SRT file path / 輸入 SRT 檔案路徑
+        output_srt_path: Output SRT file path / 輸出 SRT 檔案路徑
+
+    Returns:
+        int: Number of lines processed / 處理的行數
+    """
+    return get_converter().convert_srt_file(input_srt_path, output_srt_path)
+
+
+def _convert_file_job(pair):
+    """
+    Process pool worker entry point / 行程池工作函數
+
+    Returns:
+        tuple: (line count, cache hits, cache misses) for this file / 此檔案的（行數, 快取命中數, 快取未命中數）
+    """
+    input_srt_path, output_srt_path = pair
+    before = get_converter().cache_info()
+    line_count = convert_srt_file(input_srt_path, output_srt_path)
+    after = get_converter().cache_info()
+    return line_count, after.hits - before.hits, after.misses - before.misses
+
+
+def _publish_cache_stats(hits, misses):
+    """
+    Report memoization hits/misses to the event bus (dashboard) / 將快取命中/未命中回報到事件匯流排（儀表板）
+    """
+    bus.add(f"{CACHE_PREFIX}katakana.hits", hits)
+    bus.add(f"{CACHE_PREFIX}katakana.misses", misses)
+
+
+def convert_files(pairs, max_workers=None, pause_flag=None):
+    """
+    Convert multiple SRT files, fanning out across a process pool / 轉換多個 SRT 檔案，分散到行程池處理
+
+    Yields results as files complete (completion order, not input order). / 依完成順序（非輸入順序）產生結果。
+
+    Args:
+        pairs: List of (input_srt_path, output_srt_path) / (輸入路徑, 輸出路徑) 列表
+        max_workers: Process count (None = CPU count, 1 = run in current process) / 行程數（None 為 CPU 數量，1 為在目前行程執行）
+        pause_flag: Pause flag, pending files are skipped once set / 暫停標誌，設定後未開始的檔案會被略過
+
+    Yields:
+        tuple: (input_srt_path, output_srt_path, line_count, error) / (輸入路徑, 輸出路徑, 行數, 錯誤)
+    """
+    pairs = list(pairs)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(pairs)))
+
+    if max_workers == 1:
+        for input_srt_path, output_srt_path in pairs:
+            if pause_flag and pause_flag.is_set():
+                return
+            try:
+                line_count, hits, misses = _convert_file_job((input_srt_path, output_srt_path))
+                _publish_cache_stats(hits, misses)
+                yield input_srt_path, output_srt_path, line_count, None
+            except Exception as e:
+                yield input_srt_path, output_srt_path, 0, e
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_convert_file_job, pair): pair for pair in pairs}
+        try:
+            for future in as_completed(futures):
+                input_srt_path, output_srt_path = futures[future]
+                try:
+                    line_count, hits, misses = future.result()
+                    _publish_cache_stats(hits, misses)
+                    yield input_srt_path, output_srt_path, line_count, None
+                except Exception as e:
+                    yield input_srt_path, output_srt_path, 0, e
+                if pause_flag and pause_flag.is_set():
+                    break
+        finally:
+            # Drop files that have not started yet / 取消尚未開始的檔案
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,141 @@
+"""
+GUI log console module / GUI 日誌主控台模組
+Bounded log buffer and batched rendering into a text widget / 有上限的日誌緩衝區，並批次寫入文字元件
+
+Worker threads only append to a fixed-size ring buffer (O(1) per message). / 工作線程只會附加到固定大小的環形緩衝區（每則訊息 O(1)）。
+The Tk thread drains it once per tick and inserts the whole batch with a single call. / Tk 主線程每個週期取出一次，並以單次呼叫插入整批訊息。
+"""
+import threading
+from collections import deque
+
+from i18n import t
+
+# Default number of lines kept in the widget / 文字元件中保留的預設行數
+DEFAULT_MAX_LINES = 1000
+
+# Default number of pending messages held between ticks / 兩次更新之間保留的預設待處理訊息數
+DEFAULT_BUFFER_CAPACITY = 5000
+
+# Default refresh interval in milliseconds / 預設更新間隔（毫秒）
+DEFAULT_INTERVAL_MS = 100
+
+
+class LogRingBuffer:
+    """
+    Thread-safe bounded ring buffer (drop-oldest under overload) / 執行緒安全的有界環形緩衝區（超載時丟棄最舊訊息）
+
+    Provides put() so it can be used in place of queue.Queue by GUIHandler. / 提供 put()，可直接替代 GUIHandler 使用的 queue.Queue。
+    """
+
+    def __init__(self, capacity=DEFAULT_BUFFER_CAPACITY):
+        """
+        Args:
+            capacity: Maximum pending messages / 最大待處理訊息數
+        """
+        self._items = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    def put(self, msg):
+        """
+        Append message, evicting the oldest one when full / 附加訊息，已滿時移除最舊的訊息
+
+        Args:
+            msg: Formatted log message / 格式化後的日誌訊息
+        """
+        with self._lock:
+            if len(self._items) == self._items.maxlen:
+                self._dropped += 1
+            self._items.append(msg)
+
+    def drain(self):
+        """
+        Take all pending messages / 取出所有待處理訊息
+
+        Returns:
+            tuple: (list of messages, number of messages dropped since last drain) / （訊息列表, 自上次取出後丟棄的訊息數）
+        """
+        with self._lock:
+            items = list(self._items)
+            self._items.clear()
+            dropped = self._dropped
+            self._dropped = 0
+        return items, dropped
+
+    def __len__(self):
+        return len(self._items)
+
+
+class LogConsole:
+    """
+    Renders a LogRingBuffer into a Tk/CustomTkinter textbox / 將 LogRingBuffer 渲染到 Tk/CustomTkinter 文字框
+    """
+
+    def __init__(self, textbox, buffer, max_lines=DEFAULT_MAX_LINES):
+        """
+        Args:
+            textbox: CTkTextbox (or tk.Text) used for display / 用於顯示的 CTkTextbox（或 tk.Text）
+            buffer: LogRingBuffer fed by GUIHandler / 由 GUIHandler 寫入的 LogRingBuffer
+            max_lines: Maximum lines kept in the widget / 文字元件中保留的最大行數
+        """
+        self.textbox = textbox
+        self.buffer = buffer
+        self.max_lines = max_lines
+        self._line_count = 0
+        self.total_dropped = 0
+
+    def tick(self):
+        """
+        Drain the buffer and render one batch (call from Tk main thread) / 取出緩衝區並渲染一批訊息（需在 Tk 主線程呼叫）
+
+        Returns:
+            int: Number of messages rendered / 渲染的訊息數量
+        """
+        messages, dropped = self.buffer.drain()
+        if not messages and not dropped:
+            return 0
+
+        # Messages that would be trimmed right away are not inserted at all / 插入後會立即被裁掉的訊息直接略過
+        # (one line is reserved for the dropped notice) / （保留一行給略過提示）
+        limit = self.max_lines - 1
+        if len(messages) > limit:
+            dropped += len(messages) - limit
+            messages = messages[-limit:]
+
+        if dropped:
+            self.total_dropped += dropped
+            messages.insert(0, t("log.log_lines_dropped", "... {count} log lines dropped ...").format(count=dropped))
+
+        text = "\n".join(messages) + "\n"
+        self._line_count += text.count("\n")
+
+        self.textbox.configure(state="normal")
+        self.textbox.insert("end", text)
+        # Trim oldest lines using the tracked count, no need to read widget content / 使用追蹤的行數裁切最舊的行，不需讀取元件內容
+        excess = self._line_count - self.max_lines
+        if excess > 0:
+            self.textbox.delete("1.0", f"{excess + 1}.0")
+            self._line_count -= excess
+        # Auto-scroll to bottom / 自動滾動到底部
+        self.textbox.see("end")
+        self.textbox.configure(state="disabled")
+        return len(messages)
+
+    def start(self, root, interval_ms=DEFAULT_INTERVAL_MS, on_error=None):
+        """
+        Start periodic rendering with root.after() / 使用 root.after() 開始定期渲染
+
+        Args:
+            root: Tk root window / Tk 主視窗
+            interval_ms: Refresh interval in milliseconds / 更新間隔（毫秒）
+            on_error: Callback receiving exceptions raised while rendering (optional) / 渲染發生例外時的回調（可選）
+        """
+        def _poll():
+            try:
+                self.tick()
+            except Exception as e:
+                if on_error:
+                    on_error(e)
+            root.after(interval_ms, _poll)
+
+        _poll()
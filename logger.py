@@ -3,30 +3,40 @@ Logging management module / 日誌管理模組
 
 Provides unified logging functionality, supports: / 提供統一的日誌功能，支援：
 - Console output (colored) / 控制台輸出（彩色）
-- File output (logs/whisper_gui.log) / 檔案輸出（logs/whisper_gui.log）
+- File output (logs/whisper_gui_YYYYMMDD.log, rotated by day and size, old files gzip'ed) / 檔案輸出（logs/whisper_gui_YYYYMMDD.log，依日期與大小輪替，舊檔案以 gzip 壓縮）
 - GUI output (optional) / GUI 輸出（可選）
 - Different log levels (DEBUG, INFO, WARNING, ERROR) / 不同日誌級別（DEBUG, INFO, WARNING, ERROR）
+
+Worker threads only put records on a queue (QueueHandler); formatting, file writes, rotation / 工作線程只會把記錄放入佇列（QueueHandler）；格式化、檔案寫入、輪替
+and compression run on a background listener thread (QueueListener) started on first use. / 與壓縮都在第一次使用時啟動的背景監聽線程（QueueListener）中執行。
 """
 
+import atexit
+import fcntl
 import logging
 import os
 import queue
-from datetime import datetime
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
-# Log directory / 日誌目錄
+# Log directory (created on first write) / 日誌目錄（第一次寫入時建立）
 LOG_DIR = Path(__file__).parent / "logs"
-LOG_DIR.mkdir(exist_ok=True)
 
-# Log file path (one file per day) / 日誌檔案路徑（每天一個檔案）
-LOG_FILE = LOG_DIR / f"whisper_gui_{datetime.now().strftime('%Y%m%d')}.log"
+# Log file name prefix, files are <prefix>_YYYYMMDD.log / 日誌檔名前綴，檔案為 <prefix>_YYYYMMDD.log
+LOG_PREFIX = "whisper_gui"
+
+# Rotation defaults (overridable via config) / 輪替預設值（可透過 config 覆蓋）
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 30
 
 
 class ColoredFormatter(logging.Formatter):
     """
     Colored log formatter (only for console) / 彩色日誌格式化器（僅用於控制台）
     """
-    
+
     # ANSI color codes / ANSI 顏色代碼
     COLORS = {
         'DEBUG': '\033[36m',      # Cyan / 青色
@@ -36,29 +46,214 @@ class ColoredFormatter(logging.Formatter):
         'CRITICAL': '\033[35m',   # Magenta / 紫色
         'RESET': '\033[0m'        # Reset / 重置
     }
-    
+
     def format(self, record):
-        # Add color / 添加顏色
-        log_color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
-        record.levelname = f"{log_color}{record.levelname}{self.COLORS['RESET']}"
-        return super().format(record)
+        # Add color without touching the shared record (file/GUI handlers format it too) / 添加顏色，但不修改共用的記錄（檔案與 GUI handler 也會格式化它）
+        levelname = record.levelname
+        log_color = self.COLORS.get(levelname, self.COLORS['RESET'])
+        record.levelname = f"{log_color}{levelname}{self.COLORS['RESET']}"
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+
+class DailyRotatingFileHandler(logging.FileHandler):
+    """
+    File handler writing <prefix>_YYYYMMDD.log, rotated by day and by size / 寫入 <prefix>_YYYYMMDD.log 的檔案處理器，依日期與大小輪替
+
+    - A new file is started when the day changes (checked per record, not at import) / 日期改變時開始新檔案（每筆記錄檢查，而不是在匯入時決定）
+    - When the file exceeds max_bytes it is moved to <prefix>_YYYYMMDD.N.log / 檔案超過 max_bytes 時移動為 <prefix>_YYYYMMDD.N.log
+    - Finished files are gzip'ed and only the newest backup_count archives are kept / 完成的檔案會以 gzip 壓縮，只保留最新的 backup_count 個壓縮檔
+
+    Runs on the listener thread, so rotation and compression never block workers. / 在監聽線程中執行，因此輪替與壓縮不會阻塞工作線程。
+
+    Several processes (GUI and CLI) may share the file: rotation is serialized with a lock file, / 多個進程（GUI 與 CLI）可能共用同一個檔案：輪替以鎖定檔序列化，
+    a writer reopens the file when another process rotated it (as WatchedFileHandler does), and a / 其他進程輪替後寫入者會重新開啟檔案（與 WatchedFileHandler 相同），
+    file is only gzip'ed once no writer holds its shared lock. / 檔案只有在沒有寫入者持有其共用鎖時才會被壓縮。
+    """
+
+    def __init__(self, log_dir=LOG_DIR, prefix=LOG_PREFIX, max_bytes=DEFAULT_MAX_BYTES,
+                 backup_count=DEFAULT_BACKUP_COUNT, compress=True):
+        """
+        Args:
+            log_dir: Log directory / 日誌目錄
+            prefix: File name prefix / 檔名前綴
+            max_bytes: Size limit per file, 0 disables size rotation / 單一檔案大小上限，0 代表不依大小輪替
+            backup_count: Number of rotated archives kept, 0 keeps all / 保留的輪替檔數量，0 代表全部保留
+            compress: Gzip rotated files / 以 gzip 壓縮輪替後的檔案
+        """
+        self.log_dir = Path(log_dir)
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self._day = time.strftime('%Y%m%d')
+        self._housekeeping_done = False
+        super().__init__(self._path_for(self._day), encoding='utf-8', delay=True)
+
+    def _path_for(self, day, part=None):
+        name = f"{self.prefix}_{day}.log" if part is None else f"{self.prefix}_{day}.{part}.log"
+        return self.log_dir / name
+
+    def _open(self):
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        if not self._housekeeping_done:
+            self._housekeeping_done = True
+            with self._rotation_lock():
+                self._archive_stale_files()
+        while True:
+            stream = super()._open()
+            # Shared lock: marks the file as in use, so no process archives it under this writer / 共用鎖：標記檔案使用中，其他進程不會在寫入時將其壓縮
+            fcntl.flock(stream.fileno(), fcntl.LOCK_SH)
+            if self._is_current(stream):
+                return stream
+            stream.close()  # Rotated away while waiting for the lock / 等待鎖時已被輪替
+
+    def _is_current(self, stream):
+        """
+        Check if stream is still the file at baseFilename (another process may have rotated it) / 檢查串流是否仍是 baseFilename 的檔案（其他進程可能已將其輪替）
+        """
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(stream.fileno())
+        return (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino)
+
+    @contextmanager
+    def _rotation_lock(self):
+        """
+        Serialize rotation and archiving between processes sharing the log directory (GUI and CLI) / 在共用日誌目錄的進程（GUI 與 CLI）之間序列化輪替與壓縮
+        """
+        with open(self.log_dir / f".{self.prefix}.lock", 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def emit(self, record):
+        try:
+            day = time.strftime('%Y%m%d', time.localtime(record.created))
+            if day != self._day:
+                self._rollover_day(day)
+            elif self.stream is not None and not self._is_current(self.stream):
+                # Another process rotated the file: follow it, like WatchedFileHandler / 其他進程已輪替檔案：與 WatchedFileHandler 一樣跟著重新開啟
+                self._close_stream()
+            elif self.max_bytes and self.stream is not None and self.stream.tell() >= self.max_bytes:
+                self._rollover_size()
+        except Exception:
+            self.handleError(record)
+        super().emit(record)
+
+    def _close_stream(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def _rollover_day(self, day):
+        self._close_stream()
+        self._day = day
+        self.baseFilename = os.path.abspath(self._path_for(day))
+        with self._rotation_lock():
+            self._archive_stale_files()
+
+    def _rollover_size(self):
+        self._close_stream()
+        current = Path(self.baseFilename)
+        with self._rotation_lock():
+            try:
+                if current.stat().st_size < self.max_bytes:
+                    return  # Already rotated by another process / 已被其他進程輪替
+            except FileNotFoundError:
+                return
+            part = 1
+            while self._path_for(self._day, part).exists() or Path(f"{self._path_for(self._day, part)}.gz").exists():
+                part += 1
+            os.replace(current, self._path_for(self._day, part))
+            self._archive_stale_files()
+
+    def _archive(self, path):
+        """
+        Gzip a finished log file that no writer holds (no-op if compression is disabled) / 壓縮沒有寫入者持有的已完成日誌檔案（停用壓縮時不做事）
+
+        Returns:
+            bool: False if a live process still writes to the file / 仍有進程在寫入該檔案時返回 False
+        """
+        if not self.compress:
+            return True
+        import gzip
+        import shutil
+        with open(path, 'rb') as source:
+            try:
+                fcntl.flock(source.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return False
+            with gzip.open(f"{path}.gz", 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.remove(path)
+        return True
+
+    def _archive_stale_files(self):
+        """
+        Compress finished plain log files (rotated parts, previous days) and prune / 壓縮已完成的未壓縮日誌檔案（輪替的分段、前幾天的檔案）並清理
+
+        Files another process still writes to are left for a later rotation or start. / 其他進程仍在寫入的檔案留待之後的輪替或啟動時處理。
+        """
+        current = Path(self.baseFilename).name
+        for path in self.log_dir.glob(f"{self.prefix}_*.log"):
+            if path.name != current:
+                try:
+                    self._archive(path)
+                except OSError:
+                    pass
+        self._prune()
+
+    def _prune(self):
+        """
+        Delete the oldest rotated files beyond backup_count / 刪除超過 backup_count 的最舊輪替檔案
+        """
+        if not self.backup_count:
+            return
+        current = Path(self.baseFilename).name
+        archives = sorted(
+            (p for p in self.log_dir.glob(f"{self.prefix}_*.log*") if p.name != current),
+            key=lambda p: p.stat().st_mtime
+        )
+        for path in archives[:-self.backup_count]:
+            if path.suffix == '.log' and self._held(path):
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _held(path):
+        """
+        Check if a live process writes to a plain log file / 檢查是否有進程正在寫入未壓縮的日誌檔案
+        """
+        try:
+            with open(path, 'rb') as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return True
+        return False
 
 
 class GUIHandler(logging.Handler):
     """
     GUI log handler, outputs logs to GUI text area / GUI 日誌處理器，將日誌輸出到 GUI 文字區域
     """
-    
+
     def __init__(self, log_queue):
         super().__init__()
         self.log_queue = log_queue
         # Simplified formatter (no timestamp and module name, only level and message) / 簡化的格式化器（不包含時間戳和模組名，只顯示級別和訊息）
         self.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
-    
+
     def emit(self, record):
         """
         Send log record to queue / 發送日誌記錄到隊列
-        
+
         Args:
             record: Log record / 日誌記錄
         """
@@ -69,55 +264,156 @@ class GUIHandler(logging.Handler):
             self.handleError(record)
 
 
+class _LogQueueHandler(logging.Handler):
+    """
+    Queue handler doing the minimum on the calling thread / 在呼叫線程中只做最少工作的佇列處理器
+
+    Starts the listener on first record and only merges message arguments; / 第一筆記錄時啟動監聽線程，只合併訊息參數；
+    time formatting, colors and tracebacks are rendered on the listener thread. / 時間格式、顏色與錯誤堆疊都在監聽線程中處理。
+    """
+
+    def __init__(self, log_queue):
+        super().__init__()
+        self.queue = log_queue
+
+    def emit(self, record):
+        try:
+            if _listener is None:
+                _start_listener()
+            # Freeze the message now, arguments may change after the call returns / 現在就固定訊息內容，參數在呼叫返回後可能改變
+            record.msg = record.getMessage()
+            record.args = None
+            self.queue.put_nowait(record)
+        except Exception:
+            self.handleError(record)
+
+
+_log_queue = queue.SimpleQueue()
+_listener = None
+_listener_lock = threading.Lock()
+_console_handler = None
+_console_level = logging.INFO
+
+
+def _build_handlers(level):
+    """
+    Create console and file handlers (called on the first record, reads config) / 建立控制台與檔案 handler（第一筆記錄時呼叫，會讀取 config）
+    """
+    global _console_handler
+    from config import config
+
+    # Console handler (colored output) / 控制台 handler（彩色輸出）
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(level)
+    console_formatter = ColoredFormatter(
+        '%(asctime)s | %(levelname)s | %(name)s | %(message)s',
+        datefmt='%H:%M:%S'
+    )
+    console_handler.setFormatter(console_formatter)
+    _console_handler = console_handler
+
+    # File handler (full output, rotated and compressed) / 檔案 handler（完整輸出，會輪替與壓縮）
+    file_handler = DailyRotatingFileHandler(
+        max_bytes=config.LOG_MAX_BYTES,
+        backup_count=config.LOG_BACKUP_COUNT,
+        compress=config.LOG_COMPRESS,
+    )
+    file_handler.setLevel(logging.DEBUG)  # File records all levels / 檔案記錄所有級別
+    if config.LOG_CALLER_INFO:
+        file_format = '%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s'
+    else:
+        # Skip the caller frame lookup on every logging call (documented logging optimization) / 每次記錄時略過呼叫者堆疊查詢（logging 文件中的最佳化方式）
+        logging._srcfile = None
+        file_format = '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s'
+    file_handler.setFormatter(logging.Formatter(file_format, datefmt='%Y-%m-%d %H:%M:%S'))
+    return [console_handler, file_handler]
+
+
+def _start_listener():
+    global _listener
+    # Resolve config before locking: loading .env may log, which re-enters here / 鎖定前先解析設定：載入 .env 時可能會記錄日誌並重新進入此函數
+    from config import config
+    config.LOG_MAX_BYTES
+    with _listener_lock:
+        if _listener is not None:
+            return
+        from logging.handlers import QueueListener
+        handlers = _build_handlers(_console_level)
+        listener = QueueListener(_log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(stop_listener)
+        _listener = listener
+
+
+def stop_listener():
+    """
+    Flush pending records and stop the background listener / 寫出待處理的記錄並停止背景監聽線程
+
+    Registered with atexit; logging again afterwards restarts the listener. / 已註冊於 atexit；之後若再記錄會重新啟動監聽線程。
+    """
+    global _listener
+    with _listener_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def add_handler(handler):
+    """
+    Attach an extra handler to the background listener (e.g. GUIHandler) / 在背景監聽線程中加入額外的 handler（例如 GUIHandler）
+
+    Args:
+        handler: logging.Handler instance / logging.Handler 實例
+    """
+    if _listener is None:
+        _start_listener()
+    if handler not in _listener.handlers:
+        # Tuple replacement is atomic, the listener picks it up on the next record / 以新的 tuple 取代是原子操作，監聽線程在下一筆記錄時就會使用
+        _listener.handlers = _listener.handlers + (handler,)
+
+
+def set_console_level(level):
+    """
+    Change console output level (file output is unchanged) / 變更控制台輸出級別（檔案輸出不受影響）
+
+    Args:
+        level: Logging level / 日誌級別
+    """
+    global _console_level
+    _console_level = level
+    if _console_handler is not None:
+        _console_handler.setLevel(level)
+
+
 def setup_logger(name="whisper_gui", level=logging.INFO, gui_handler=None):
     """
     Setup logger / 設定日誌器
-    
+
     Args:
         name: Logger name / 日誌器名稱
         level: Log level (default: INFO) / 日誌級別（預設: INFO）
         gui_handler: GUI log handler (optional) / GUI 日誌處理器（可選）
-    
+
     Returns:
         logging.Logger: Configured logger / 配置好的日誌器
     """
+    global _console_level
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
+
     # Avoid duplicate handlers / 避免重複添加 handler
-    if logger.handlers:
-        # If handlers already exist, check if GUI handler needs to be added / 如果已經有 handler，檢查是否需要添加 GUI handler
-        if gui_handler and not any(isinstance(h, GUIHandler) for h in logger.handlers):
-            logger.addHandler(gui_handler)
-        return logger
-    
-    # Console handler (colored output) / 控制台 handler（彩色輸出）
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    console_formatter = ColoredFormatter(
-        '%(asctime)s | %(levelname)s | %(name)s | %(message)s',
-        datefmt='%H:%M:%S'
-    )
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler (full output) / 檔案 handler（完整輸出）
-    file_handler = logging.FileHandler(LOG_FILE, encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)  # File records all levels / 檔案記錄所有級別
-    file_formatter = logging.Formatter(
-        '%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
-    
+    if not logger.handlers:
+        _console_level = level
+        logger.addHandler(_LogQueueHandler(_log_queue))
+
     # GUI handler (if provided) / GUI handler（如果提供）
     if gui_handler:
-        logger.addHandler(gui_handler)
-    
+        add_handler(gui_handler)
+
     return logger
 
 
 # Create global logger (initially without GUI handler) / 建立全域日誌器（初始不包含 GUI handler）
 logger = setup_logger()
-
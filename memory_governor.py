@@ -0,0 +1,305 @@
+"""
+Memory governor module / 記憶體管控模組
+Admission control for engine processes against a memory budget / 依記憶體預算控管引擎進程的啟動
+
+Each engine run reserves its estimated memory (model size + audio length) before it starts and / 每次引擎執行前先預留預估的記憶體（模型大小 + 音訊長度），
+waits while the reservations of running engines would exceed the budget. While the process / 若加上執行中引擎的預留量會超出預算就等待。
+runs its resident set size (whole process group) is sampled; a reservation grows to the measured / 進程執行期間會取樣其常駐記憶體（整個進程組），
+RSS when the estimate was too low, and the peak replaces the static estimate for later runs of the same model. / 預估過低時預留量會提高到實測值，峰值也會取代同一模型之後的靜態預估。
+
+A run is always admitted when nothing else is running, so a single oversized job cannot deadlock. / 沒有其他引擎執行時一定會放行，單一過大的工作不會卡住。
+"""
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+from logger import logger
+from cancellation import raise_if_cancelled
+
+MB = 1024 * 1024
+
+# Resident memory of the openai-whisper (torch) models on CPU, in MB / openai-whisper（torch）模型在 CPU 上的常駐記憶體（MB）
+TORCH_MODEL_MB = {
+    'tiny': 1000,
+    'base': 1000,
+    'small': 2000,
+    'medium': 5000,
+    'large': 10000,
+    'turbo': 6000,
+}
+DEFAULT_TORCH_MODEL_MB = 6000
+
+# faster-whisper (CTranslate2 int8) models, in MB / faster-whisper（CTranslate2 int8）模型（MB）
+CT2_INT8_MODEL_MB = {
+    'tiny': 200,
+    'base': 300,
+    'small': 700,
+    'medium': 1500,
+    'large': 2500,
+    'turbo': 1500,
+    'distil': 1200,
+}
+
+# whisper.cpp: model file size x factor + fixed overhead (compute buffers, CoreML encoder) / whisper.cpp：模型檔案大小 x 倍數 + 固定開銷（計算緩衝區、CoreML 編碼器）
+GGML_MODEL_FACTOR = 1.1
+GGML_OVERHEAD_MB = 500
+DEFAULT_GGML_MODEL_MB = 3500
+
+# Memory per audio second: float32 samples at 16 kHz + 128-bin log-mel at 100 frames/s, / 每秒音訊所需記憶體：16 kHz float32 取樣 + 每秒 100 幀的 128 維 log-mel，
+# openai-whisper also keeps the ffmpeg output buffer / openai-whisper 另外保留 ffmpeg 輸出緩衝區
+AUDIO_BYTES_PER_SECOND = {
+    'coreml': 16000 * 4 + 128 * 100 * 4,
+    'cpu': 16000 * 4 * 2 + 128 * 100 * 4,
+    'faster': 16000 * 4 + 128 * 100 * 4,
+}
+
+# Margin added to a measured peak before it is used as an estimate / 實測峰值用於預估前加上的餘裕
+OBSERVED_HEADROOM = 1.1
+
+# Share of physical memory used when no budget is configured / 未設定預算時使用的實體記憶體比例
+AUTO_BUDGET_FRACTION = 0.75
+
+# Seconds between RSS samples / RSS 取樣間隔（秒）
+DEFAULT_SAMPLE_INTERVAL = 2.0
+
+
+def total_memory():
+    """
+    Physical memory in bytes (0 if unknown) / 實體記憶體位元組數（無法取得時為 0）
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def process_group_rss(pid):
+    """
+    Resident memory of a process and everything in its process group, in bytes / 進程及其進程組內所有進程的常駐記憶體（位元組）
+
+    Engines are started with start_new_session=True, so the group contains ffmpeg and other / 引擎以 start_new_session=True 啟動，
+    helpers too. Uses psutil when installed, otherwise ps (macOS and Linux). / 因此進程組也包含 ffmpeg 等子進程。有安裝 psutil 時使用 psutil，否則使用 ps（macOS 與 Linux）。
+
+    Returns:
+        int: RSS in bytes, 0 if the process is gone / RSS 位元組數，進程已結束時為 0
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    try:
+        output = subprocess.run(['ps', '-A', '-o', 'pgid=,rss='], capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return 0
+    total_kb = 0
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) == 2 and fields[0] == str(pid):
+            total_kb += int(fields[1])
+    return total_kb * 1024
+
+
+def model_memory(engine, model_path_or_name):
+    """
+    Static memory estimate of a loaded model in bytes / 載入模型的靜態記憶體預估（位元組）
+
+    Args:
+        engine: 'coreml' (whisper.cpp ggml file), 'cpu' (openai-whisper model name) or 'faster' / 'coreml'（whisper.cpp ggml 檔案）、'cpu'（openai-whisper 模型名稱）或 'faster'
+        model_path_or_name: ggml model path, or torch / faster-whisper model name / ggml 模型路徑，或 torch / faster-whisper 模型名稱
+    """
+    if engine == 'coreml':
+        try:
+            size = os.path.getsize(model_path_or_name)
+        except (OSError, TypeError):
+            return DEFAULT_GGML_MODEL_MB * MB
+        return int(size * GGML_MODEL_FACTOR) + GGML_OVERHEAD_MB * MB
+    name = str(model_path_or_name or '')
+    # 'large-v3' and 'medium.en' share the footprint of their family / 'large-v3' 與 'medium.en' 與同系列模型用量相同
+    family = name.split('.')[0].split('-')[0]
+    if engine == 'faster':
+        # int8 weights; fp32 compute types need about twice as much / int8 權重；fp32 計算約需兩倍
+        table, default = CT2_INT8_MODEL_MB, CT2_INT8_MODEL_MB['turbo']
+    else:
+        table, default = TORCH_MODEL_MB, DEFAULT_TORCH_MODEL_MB
+    return table.get(name, table.get(family, default)) * MB
+
+
+class Reservation:
+    """
+    Memory reserved for one engine run / 一次引擎執行預留的記憶體
+    """
+
+    def __init__(self, governor, engine, model, audio_seconds, estimate, label=None):
+        self.governor = governor
+        self.engine = engine
+        self.model = model
+        self.audio_seconds = audio_seconds or 0
+        self.estimate = estimate
+        self.label = label
+        self.rss = 0        # Last sampled RSS / 最近一次取樣的 RSS
+        self.peak_rss = 0   # Highest sampled RSS / 取樣到的最高 RSS
+
+    @property
+    def reserved(self):
+        """
+        Bytes counted against the budget: the estimate, or the measured RSS when higher / 計入預算的位元組數：預估值，若實測 RSS 較高則為實測值
+        """
+        return max(self.estimate, self.rss)
+
+    def sample(self, pid):
+        """
+        Sample the RSS of a running engine process group / 取樣執行中引擎進程組的 RSS
+        """
+        rss = process_group_rss(pid)
+        if rss <= 0:
+            return
+        with self.governor._condition:
+            self.rss = rss
+            self.peak_rss = max(self.peak_rss, rss)
+            # Falling usage can admit waiting runs / 使用量下降時可能可以放行等待中的執行
+            self.governor._condition.notify_all()
+
+
+class MemoryGovernor:
+    """
+    Memory budget shared by all engine runs of the process / 整個進程所有引擎執行共用的記憶體預算
+    """
+
+    def __init__(self, budget_bytes=None, sample_interval=DEFAULT_SAMPLE_INTERVAL):
+        """
+        Args:
+            budget_bytes: Memory budget in bytes (None/0: 75% of physical memory) / 記憶體預算位元組數（None/0：實體記憶體的 75%）
+            sample_interval: Seconds between RSS samples / RSS 取樣間隔（秒）
+        """
+        if not budget_bytes:
+            budget_bytes = int(total_memory() * AUTO_BUDGET_FRACTION)
+        self.budget = budget_bytes  # 0 when physical memory is unknown: admit everything / 無法取得實體記憶體時為 0：全部放行
+        self.sample_interval = sample_interval
+        self._condition = threading.Condition()
+        self._active = []
+        self._observed = {}  # (engine, model) -> peak RSS minus audio term / (引擎, 模型) -> 峰值 RSS 減去音訊部分
+
+    def estimate(self, engine, model, audio_seconds):
+        """
+        Estimated peak memory of an engine run in bytes / 引擎執行的預估峰值記憶體（位元組）
+
+        Uses the peak measured for the same model (plus headroom) once one exists, otherwise the / 同一模型有實測峰值後使用實測值（加上餘裕），
+        static model estimate. / 否則使用靜態模型預估。
+
+        Args:
+            engine: Engine name ('coreml', 'cpu', 'faster') / 引擎名稱（'coreml'、'cpu'、'faster'）
+            model: Engine.model_ref(): ggml model path or model name / Engine.model_ref()：ggml 模型路徑或模型名稱
+            audio_seconds: Audio length (0 if unknown) / 音訊長度（未知時為 0）
+        """
+        with self._condition:
+            observed = self._observed.get((engine, model))
+        base = int(observed * OBSERVED_HEADROOM) if observed else model_memory(engine, model)
+        return base + int((audio_seconds or 0) * AUDIO_BYTES_PER_SECOND.get(engine, 0))
+
+    def in_use(self):
+        """
+        Bytes currently reserved by running engines / 執行中引擎目前預留的位元組數
+        """
+        with self._condition:
+            return self._reserved_locked()
+
+    def _reserved_locked(self):
+        return sum(reservation.reserved for reservation in self._active)
+
+    def _fits(self, need):
+        if not self._active or self.budget <= 0:
+            return True
+        return self._reserved_locked() + need <= self.budget
+
+    @contextmanager
+    def reserve(self, engine, model, audio_seconds, pause_flag=None, label=None):
+        """
+        Wait until an engine run fits the budget and hold its reservation for the block / 等待引擎執行符合預算後，在區塊期間保留其記憶體
+
+        Args:
+            engine: Engine name ('coreml', 'cpu', 'faster') / 引擎名稱（'coreml'、'cpu'、'faster'）
+            model: Engine.model_ref(): ggml model path or model name / Engine.model_ref()：ggml 模型路徑或模型名稱
+            audio_seconds: Audio length / 音訊長度
+            pause_flag: Cancellation token checked while waiting (optional) / 等待時檢查的取消權杖（可選）
+            label: Name used in log messages (optional) / 日誌訊息中使用的名稱（可選）
+
+        Yields:
+            Reservation: Pass to ProcessSupervisor.run(reservation=...), which samples the engine's RSS / 傳給 ProcessSupervisor.run(reservation=...)，由其取樣引擎的 RSS
+
+        Raises:
+            JobCancelled: If cancelled while waiting / 等待時被取消
+        """
+        reservation = Reservation(self, engine, model, audio_seconds,
+                                  self.estimate(engine, model, audio_seconds), label)
+        waited_since = None
+        with self._condition:
+            while not self._fits(reservation.estimate):
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    logger.warning(
+                        f"記憶體預算不足，暫緩啟動引擎 {label or engine}: 需要 {reservation.estimate / MB:.0f} MB，"
+                        f"已預留 {self._reserved_locked() / MB:.0f} MB / 預算 {self.budget / MB:.0f} MB"
+                        f"（{len(self._active)} 個引擎執行中）"
+                    )
+                self._condition.wait(timeout=0.5)
+                raise_if_cancelled(pause_flag)
+            if reservation.estimate > self.budget > 0:
+                logger.warning(f"引擎 {label or engine} 預估需要 {reservation.estimate / MB:.0f} MB，"
+                               f"超過記憶體預算 {self.budget / MB:.0f} MB，因沒有其他引擎執行仍然啟動")
+            self._active.append(reservation)
+        if waited_since is not None:
+            logger.info(f"記憶體已足夠，啟動引擎 {label or engine}（等待 {time.monotonic() - waited_since:.1f} 秒）")
+        completed = False
+        try:
+            yield reservation
+            completed = True
+        finally:
+            with self._condition:
+                self._active.remove(reservation)
+                # Only a finished run reached its real peak / 只有正常完成的執行才達到真正的峰值
+                audio_part = int(reservation.audio_seconds * AUDIO_BYTES_PER_SECOND.get(engine, 0))
+                if completed and reservation.peak_rss > audio_part:
+                    # Remember the model's own footprint for later estimates / 記住模型本身的用量供之後預估
+                    key = (engine, model)
+                    self._observed[key] = max(self._observed.get(key, 0), reservation.peak_rss - audio_part)
+                self._condition.notify_all()
+            if reservation.peak_rss:
+                logger.debug(f"引擎 {label or engine} 峰值記憶體 {reservation.peak_rss / MB:.0f} MB"
+                             f"（預估 {reservation.estimate / MB:.0f} MB）")
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    """
+    Get the process-wide governor (created on first use from config) / 取得整個進程共用的管控器（第一次使用時依 config 建立）
+
+    Returns:
+        MemoryGovernor: Shared governor / 共用的管控器
+    """
+    global _governor
+    if _governor is None:
+        from config import config
+        with _governor_lock:
+            if _governor is None:
+                _governor = MemoryGovernor(config.MEMORY_BUDGET_MB * MB,
+                                           sample_interval=config.MEMORY_SAMPLE_INTERVAL)
+                logger.debug(f"記憶體預算: {_governor.budget / MB:.0f} MB")
+    return _governor
@@ -0,0 +1,333 @@
+"""
+Pipeline metrics module / 處理流程指標模組
+Per-stage timing for every file: wall/CPU time, bytes, audio seconds and real-time factor / 記錄每個檔案各階段的牆鐘/CPU 時間、位元組數、音訊秒數與即時率
+
+Each finished stage is appended to metrics/stages.jsonl and the running totals are / 每個完成的階段都會附加到 metrics/stages.jsonl，累計值會寫入
+rewritten to metrics/whisper_gui.prom (Prometheus textfile collector format). / metrics/whisper_gui.prom（Prometheus textfile collector 格式）。
+
+Usage / 用法:
+    with metrics.stage(metrics.STAGE_ENGINE, file=path, engine='cpu', audio_seconds=42.0) as record:
+        ...
+        record.bytes_out = os.path.getsize(output)
+
+Engines report how far into the audio they are with report_audio_position(), so the live view / 引擎以 report_audio_position() 回報目前處理到的音訊位置，
+counts audio seconds while a file is transcribed, not only when it finishes. / 因此即時檢視在轉錄期間就會累計音訊秒數，而不是只在完成時。
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from cancellation import JobCancelled
+from event_bus import bus, KEY_AUDIO_SECONDS, KEY_TRANSLATE_REQUESTS, RTF_PREFIX
+
+# Default output directory / 預設輸出目錄
+METRICS_DIR = Path(__file__).parent / "metrics"
+STAGES_FILE = "stages.jsonl"
+PROMETHEUS_FILE = "whisper_gui.prom"
+
+# Pipeline stages / 處理階段
+STAGE_PROBE = "probe"          # Read audio duration / 讀取音訊長度
+STAGE_DECODE = "decode"        # Convert video to wav / 影片轉 wav
+STAGE_VAD = "vad"              # Trim silence and non-speech / 裁切靜音與非語音
+STAGE_ENGINE = "engine"        # Whisper transcription / Whisper 轉錄
+STAGE_WRITE = "write"          # Write final output / 寫入最終輸出
+STAGE_TRANSLATE = "translate"  # Translate subtitles / 翻譯字幕
+
+# Labels used to aggregate Prometheus series / 用於彙總 Prometheus 序列的標籤
+AGGREGATE_LABELS = ("stage", "engine")
+
+# Innermost stage being measured on each thread / 每個線程目前量測中最內層的階段
+_active = threading.local()
+
+
+def _cpu_seconds():
+    """
+    CPU time of this thread plus all waited-for child processes / 目前線程加上已結束子進程的 CPU 時間
+
+    Child time is process-wide, so concurrent engine jobs share it (approximate). / 子進程時間是整個進程共用的，同時執行多個引擎工作時為近似值。
+    """
+    times = os.times()
+    return time.thread_time() + times.children_user + times.children_system
+
+
+class StageRecord:
+    """
+    Measurements of one stage for one file / 單一檔案單一階段的量測結果
+    """
+
+    def __init__(self, stage, file=None, audio_seconds=None, bytes_in=None, **labels):
+        """
+        Args:
+            stage: Stage name (STAGE_*) / 階段名稱
+            file: Input file / 輸入檔案
+            audio_seconds: Audio length handled by the stage / 此階段處理的音訊長度
+            bytes_in: Bytes read / 讀取的位元組數
+            **labels: Extra labels (engine, model, language, batch_id, ...) / 額外標籤
+        """
+        self.stage = stage
+        self.file = file
+        self.audio_seconds = audio_seconds
+        self.bytes_in = bytes_in
+        self.bytes_out = None
+        self.labels = labels
+        self.extra = {}
+        self.started_at = time.time()
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.ok = True
+        self.error = None
+        self.audio_done = 0.0  # Audio seconds already published to the live view / 已發布到即時檢視的音訊秒數
+
+    def advance(self, seconds):
+        """
+        Publish the audio position reached so far to the live view (KEY_AUDIO_SECONDS) / 將目前處理到的音訊位置發布到即時檢視（KEY_AUDIO_SECONDS）
+
+        Positions only move forward and stop at audio_seconds. / 位置只會往前，且不超過 audio_seconds。
+        """
+        if self.audio_seconds:
+            seconds = min(seconds, self.audio_seconds)
+        delta = seconds - self.audio_done
+        if delta > 0:
+            self.audio_done = seconds
+            bus.add(KEY_AUDIO_SECONDS, delta)
+
+    @property
+    def rtf(self):
+        """
+        Real-time factor (wall seconds per audio second), None without audio length / 即時率（每秒音訊花費的牆鐘秒數），沒有音訊長度時為 None
+        """
+        if not self.audio_seconds:
+            return None
+        return self.wall_seconds / self.audio_seconds
+
+    def to_dict(self):
+        data = {
+            "ts": round(self.started_at, 3),
+            "stage": self.stage,
+            "file": self.file,
+            "wall_s": round(self.wall_seconds, 4),
+            "cpu_s": round(self.cpu_seconds, 4),
+            "audio_s": round(self.audio_seconds, 3) if self.audio_seconds else self.audio_seconds,
+            "rtf": round(self.rtf, 4) if self.rtf is not None else None,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ok": self.ok,
+        }
+        data.update(self.labels)
+        data.update(self.extra)
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class MetricsRecorder:
+    """
+    Collects stage records, writes JSON lines and a Prometheus textfile / 收集階段記錄，寫出 JSON lines 與 Prometheus textfile
+    """
+
+    def __init__(self, directory=None, enabled=True):
+        """
+        Args:
+            directory: Output directory (default: METRICS_DIR) / 輸出目錄（預設 METRICS_DIR）
+            enabled: Write files (listeners are notified either way) / 是否寫出檔案（無論如何都會通知監聽者）
+        """
+        self.directory = Path(directory or METRICS_DIR)
+        self.enabled = enabled
+        self._totals = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """
+        Register a callback receiving every StageRecord (called from worker threads) / 註冊接收每個 StageRecord 的回調（在工作線程中呼叫）
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    @contextmanager
+    def stage(self, stage, file=None, audio_seconds=None, bytes_in=None, **labels):
+        """
+        Measure a stage / 量測一個階段
+
+        The yielded StageRecord can be updated inside the block (bytes_out, audio_seconds, extra). / 區塊中可以更新產生的 StageRecord（bytes_out、audio_seconds、extra）。
+        Failed and cancelled stages are recorded with ok=False and the exception is re-raised. / 失敗與取消的階段會以 ok=False 記錄，並重新拋出例外。
+        """
+        record = StageRecord(stage, file=file, audio_seconds=audio_seconds, bytes_in=bytes_in, **labels)
+        outer, _active.record = getattr(_active, "record", None), record
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_seconds()
+        try:
+            yield record
+        except JobCancelled:
+            record.ok = False
+            record.error = "cancelled"
+            raise
+        except Exception as e:
+            record.ok = False
+            record.error = str(e)[:200]
+            raise
+        finally:
+            _active.record = outer
+            record.wall_seconds = time.perf_counter() - wall_start
+            record.cpu_seconds = _cpu_seconds() - cpu_start
+            self.record(record)
+
+    def record(self, record):
+        """
+        Store a finished StageRecord / 儲存已完成的 StageRecord
+        """
+        key = tuple(record.labels.get(label) if label != "stage" else record.stage for label in AGGREGATE_LABELS)
+        with self._lock:
+            totals = self._totals.setdefault(key, {
+                "runs": 0, "failures": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                "audio_s": 0.0, "bytes_in": 0, "bytes_out": 0, "last_rtf": None,
+            })
+            totals["runs"] += 1
+            totals["failures"] += 0 if record.ok else 1
+            totals["wall_s"] += record.wall_seconds
+            totals["cpu_s"] += record.cpu_seconds
+            totals["audio_s"] += record.audio_seconds or 0.0
+            totals["bytes_in"] += record.bytes_in or 0
+            totals["bytes_out"] += record.bytes_out or 0
+            if record.ok and record.rtf is not None:
+                totals["last_rtf"] = record.rtf
+            if self.enabled:
+                try:
+                    self._write(record)
+                except OSError as e:
+                    from logger import logger
+                    logger.warning(f"寫入效能指標失敗: {e}")
+        # Live view: the audio not reported while the engine ran, and engine speed / 即時檢視：引擎執行時未回報的音訊，以及引擎速度
+        if record.ok and record.stage == STAGE_ENGINE and record.rtf is not None:
+            record.advance(record.audio_seconds)
+            bus.set(f"{RTF_PREFIX}{record.labels.get('engine')}", record.rtf)
+        for callback in list(self._listeners):
+            try:
+                callback(record)
+            except Exception as e:
+                from logger import logger
+                logger.warning(f"效能指標監聽器執行失敗: {e}")
+
+    def snapshot(self):
+        """
+        Copy of the running totals / 累計值的副本
+
+        Returns:
+            dict: {(stage, engine): totals} / {(階段, 引擎): 累計值}
+        """
+        with self._lock:
+            return {key: dict(value) for key, value in self._totals.items()}
+
+    def _write(self, record):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / STAGES_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+        # Write to a temp file and rename, so the collector never reads a partial file / 先寫入暫存檔再改名，collector 不會讀到不完整的檔案
+        target = self.directory / PROMETHEUS_FILE
+        temp = target.with_suffix(".prom.tmp")
+        temp.write_text(self._render_prometheus(), encoding='utf-8')
+        os.replace(temp, target)
+
+    def _render_prometheus(self):
+        series = [
+            ("runs", "whisper_gui_stage_runs_total", "counter", "Finished stage runs"),
+            ("failures", "whisper_gui_stage_failures_total", "counter", "Failed or cancelled stage runs"),
+            ("wall_s", "whisper_gui_stage_wall_seconds_total", "counter", "Wall-clock seconds spent in stage"),
+            ("cpu_s", "whisper_gui_stage_cpu_seconds_total", "counter", "CPU seconds spent in stage (incl. child processes)"),
+            ("audio_s", "whisper_gui_stage_audio_seconds_total", "counter", "Audio seconds handled by stage"),
+            ("bytes_in", "whisper_gui_stage_read_bytes_total", "counter", "Bytes read by stage"),
+            ("bytes_out", "whisper_gui_stage_written_bytes_total", "counter", "Bytes written by stage"),
+            ("last_rtf", "whisper_gui_stage_last_rtf", "gauge", "Real-time factor of the last successful run"),
+        ]
+        lines = []
+        for field, name, metric_type, help_text in series:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for key, totals in sorted(self._totals.items(), key=lambda item: tuple(str(v) for v in item[0])):
+                value = totals[field]
+                if value is None:
+                    continue
+                labels = ",".join(
+                    f'{label}="{_escape_label(value_)}"'
+                    for label, value_ in zip(AGGREGATE_LABELS, key) if value_ is not None
+                )
+                lines.append(f"{name}{{{labels}}} {value:g}" if labels else f"{name} {value:g}")
+        lines.append(f"whisper_gui_metrics_updated_timestamp_seconds {time.time():.3f}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    """
+    Get the process-wide recorder (created on first use from config) / 取得整個進程共用的記錄器（第一次使用時依 config 建立）
+
+    Returns:
+        MetricsRecorder: Shared recorder / 共用的記錄器
+    """
+    global _recorder
+    if _recorder is None:
+        from config import config
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = MetricsRecorder(config.METRICS_DIR or None, enabled=config.METRICS_ENABLED)
+    return _recorder
+
+
+def stage(stage_name, file=None, audio_seconds=None, bytes_in=None, **labels):
+    """
+    Measure a stage with the shared recorder / 使用共用記錄器量測一個階段
+    """
+    return get_recorder().stage(stage_name, file=file, audio_seconds=audio_seconds, bytes_in=bytes_in, **labels)
+
+
+def report_audio_position(seconds):
+    """
+    Audio position reached by the engine stage running on this thread (no-op outside one) / 本線程執行中的引擎階段處理到的音訊位置（不在引擎階段中時不做任何事）
+    """
+    record = getattr(_active, "record", None)
+    if record is not None and record.stage == STAGE_ENGINE:
+        record.advance(seconds)
+
+
+def audio_position_reporter():
+    """
+    report_audio_position bound to this thread's engine stage, for callbacks run on other threads / 綁定本線程引擎階段的 report_audio_position，供在其他線程執行的回調使用
+
+    Returns:
+        callable: Reporter taking the position in seconds, None outside an engine stage / 接收位置秒數的回報函數，不在引擎階段中時為 None
+    """
+    record = getattr(_active, "record", None)
+    return record.advance if record is not None and record.stage == STAGE_ENGINE else None
+
+
+def report_translate_request():
+    """
+    Count one API request sent on this thread, retries included (extra['requests'] of the translation stage) / 計算本線程送出的一次 API 請求，包含重試（翻譯階段的 extra['requests']）
+    """
+    bus.add(KEY_TRANSLATE_REQUESTS)
+    record = getattr(_active, "record", None)
+    if record is not None and record.stage == STAGE_TRANSLATE:
+        record.extra['requests'] = record.extra.get('requests', 0) + 1
+
+
+def file_size(path):
+    """
+    File size in bytes, None if the file does not exist / 檔案大小（位元組），檔案不存在時為 None
+    """
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return None
@@ -0,0 +1,224 @@
+"""
+Engine output capture module / 引擎輸出擷取模組
+Decides which lines an engine prints reach the log, instead of logging every line / 決定引擎輸出的哪些行寫入日誌，而不是每行都記錄
+
+Policy per process / 每個進程的策略:
+    - Lines with the same shape (only numbers or progress bars change) are folded, the latest one / 形狀相同的行（只有數字或進度條改變）會合併，
+      is logged every AGGREGATE_SECONDS with the number of lines it stands for / 每 AGGREGATE_SECONDS 秒記錄最新一行及其代表的行數
+    - Other lines pass a token bucket (ENGINE_LOG_LINES_PER_SECOND, ENGINE_LOG_BURST); lines over / 其他行經過權杖桶（ENGINE_LOG_LINES_PER_SECOND、ENGINE_LOG_BURST）；
+      the rate are counted and reported, not logged / 超過速率的行只計數並回報，不寫入日誌
+    - The complete stream can be kept gzip'ed in ENGINE_OUTPUT_RAW_DIR for diagnosis / 完整串流可以 gzip 壓縮保存在 ENGINE_OUTPUT_RAW_DIR 供診斷使用
+    - Segment lines ('[00:01.000 --> 00:04.500] text', whisper.cpp and openai-whisper) report the / 段落行（'[00:01.000 --> 00:04.500] 文字'，whisper.cpp 與 openai-whisper）
+      audio position reached to on_position / 會將處理到的音訊位置回報給 on_position
+
+The tail kept for error messages is bounded by the process supervisor (ENGINE_OUTPUT_TAIL_LINES). / 錯誤訊息使用的尾端由進程監管器限制（ENGINE_OUTPUT_TAIL_LINES）。
+
+Usage / 用法:
+    with OutputCapture("Whisper", name=audio_file) as capture:
+        result = get_supervisor().run(cmd, on_line=capture, tail_lines=config.ENGINE_OUTPUT_TAIL_LINES)
+"""
+import itertools
+import logging
+import os
+import re
+import time
+
+from logger import logger
+
+# Seconds between samples of a run of similar lines / 一連串相似行之間的取樣間隔（秒）
+AGGREGATE_SECONDS = 10.0
+
+# Progress bars (tqdm) and numbers do not make a line different / 進度條（tqdm）與數字不會讓一行變得不同
+_BAR = re.compile(r"\|[^|]*\|")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_UNSAFE_NAME = re.compile(r"[^\w.-]+")
+# End time of a printed segment, [hh:]mm:ss.mmm / 輸出段落的結束時間，[hh:]mm:ss.mmm
+_SEGMENT_END = re.compile(r"^\[[\d:.]+ --> ((?:\d+:)?\d+:\d+(?:\.\d+)?)\]")
+
+# Makes raw file names unique within the process / 使原始輸出檔名在進程內不重複
+_raw_counter = itertools.count(1)
+
+
+def segment_end(line):
+    """
+    End time in seconds of a segment line, None for other lines / 段落行的結束時間（秒），其他行為 None
+    """
+    match = _SEGMENT_END.match(line)
+    if not match:
+        return None
+    seconds = 0.0
+    for part in match.group(1).split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def line_shape(line):
+    """
+    Line with numbers and progress bars masked, equal for repeated progress output / 遮蔽數字與進度條後的行，重複的進度輸出會相同
+    """
+    return _NUMBER.sub("#", _BAR.sub("|#|", line))
+
+
+class OutputCapture:
+    """
+    on_line callback for ProcessSupervisor.run applying the capture policy / 套用擷取策略的 ProcessSupervisor.run on_line 回調
+
+    Called only on the supervisor loop thread, one instance per process. / 只在監管器的事件迴圈線程上呼叫，每個進程一個實例。
+    """
+
+    def __init__(self, label, name=None, level=logging.INFO, lines_per_second=None, burst=None, raw_dir=None,
+                 raw_keep=None, on_position=None):
+        """
+        Args:
+            label: Prefix of logged lines, e.g. "Whisper" / 記錄行的前綴，例如 "Whisper"
+            name: Input file, used in the raw file name (optional) / 輸入檔案，用於原始輸出檔名（可選）
+            level: Log level of passed lines / 通過的行的日誌級別
+            lines_per_second: Logged lines per second (None: ENGINE_LOG_LINES_PER_SECOND, 0: no limit) / 每秒記錄的行數（None：ENGINE_LOG_LINES_PER_SECOND，0：不限制）
+            burst: Lines logged at once before the rate applies (None: ENGINE_LOG_BURST) / 套用速率前可一次記錄的行數（None：ENGINE_LOG_BURST）
+            raw_dir: Directory for the gzip'ed raw stream (None: ENGINE_OUTPUT_RAW_DIR, '': off) / gzip 原始串流的目錄（None：ENGINE_OUTPUT_RAW_DIR，''：停用）
+            raw_keep: Raw files kept in raw_dir (None: ENGINE_OUTPUT_RAW_KEEP, 0: all) / raw_dir 中保留的原始輸出檔數量（None：ENGINE_OUTPUT_RAW_KEEP，0：全部）
+            on_position: Called with the end time of every segment line (optional) / 每個段落行的結束時間會傳給此回調（可選）
+        """
+        from config import config
+
+        self.label = label
+        self.level = level
+        self.rate = config.ENGINE_LOG_LINES_PER_SECOND if lines_per_second is None else lines_per_second
+        self.burst = max(1, config.ENGINE_LOG_BURST if burst is None else burst)
+        self.raw_dir = config.ENGINE_OUTPUT_RAW_DIR if raw_dir is None else raw_dir
+        self.raw_keep = config.ENGINE_OUTPUT_RAW_KEEP if raw_keep is None else raw_keep
+        self.raw_path = None
+        self.on_position = on_position
+        self.lines = 0
+        self.logged = 0
+        self.dropped = 0     # Over the rate since the last logged line / 自上次記錄以來超過速率的行數
+        self.suppressed = 0  # Not logged in total / 未記錄的總行數
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._shape = None
+        self._repeat_line = None
+        self._repeats = 0
+        self._repeat_logged_at = 0.0
+        self._raw = None
+        if self.raw_dir:
+            self._open_raw(name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def _open_raw(self, name):
+        import gzip
+
+        try:
+            os.makedirs(self.raw_dir, exist_ok=True)
+            base = _UNSAFE_NAME.sub("_", os.path.splitext(os.path.basename(name or ""))[0]) or "output"
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            file_name = f"{stamp}_{self.label.lower()}_{base}_{os.getpid()}-{next(_raw_counter)}.log.gz"
+            self.raw_path = os.path.join(self.raw_dir, file_name)
+            self._raw = gzip.open(self.raw_path, "wt", encoding="utf-8", compresslevel=6)
+        except OSError as e:
+            logger.warning(f"無法建立原始輸出檔案，略過保存: {e}")
+            self.raw_path = self._raw = None
+            return
+        self._prune_raw()
+
+    def _prune_raw(self):
+        """
+        Delete the oldest raw files beyond raw_keep / 刪除超過 raw_keep 的最舊原始輸出檔
+        """
+        if not self.raw_keep:
+            return
+        try:
+            paths = [os.path.join(self.raw_dir, name) for name in os.listdir(self.raw_dir) if name.endswith(".log.gz")]
+            paths.sort(key=os.path.getmtime)
+        except OSError:
+            return
+        for path in paths[:-self.raw_keep]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def __call__(self, stream, line):
+        self.lines += 1
+        if self._raw is not None:
+            try:
+                self._raw.write(f"{line}\n" if stream == "stdout" else f"[{stream}] {line}\n")
+            except OSError as e:
+                logger.warning(f"寫入原始輸出檔案失敗，停止保存: {e}")
+                self._close_raw()
+                self.raw_path = None
+        if self.on_position is not None:
+            position = segment_end(line.lstrip())
+            if position is not None:
+                self.on_position(position)
+        now = time.monotonic()
+        shape = line_shape(line)
+        if shape == self._shape:
+            # Same line with new numbers: log a sample now and then / 只有數字不同的同一行：偶爾記錄一個樣本
+            self._repeat_line = line
+            self._repeats += 1
+            if now - self._repeat_logged_at >= AGGREGATE_SECONDS:
+                self._flush_repeats(now)
+            return
+        self._flush_repeats(now, rate_limited=True)
+        self._shape = shape
+        if self._take_token(now):
+            self._log(line)
+            self._repeat_logged_at = now
+        else:
+            self.dropped += 1
+            self.suppressed += 1
+
+    def _take_token(self, now):
+        if not self.rate:
+            return True
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _flush_repeats(self, now, rate_limited=False):
+        if not self._repeats:
+            return
+        repeats, self._repeats = self._repeats, 0
+        self._repeat_logged_at = now
+        if rate_limited and not self._take_token(now):
+            self.dropped += repeats
+            self.suppressed += repeats
+            return
+        self.suppressed += repeats - 1
+        self._log(f"{self._repeat_line}（{repeats} 行相似輸出）" if repeats > 1 else self._repeat_line)
+
+    def _log(self, message):
+        if self.dropped:
+            logger.log(self.level, f"{self.label}: …（超過速率，略過 {self.dropped} 行）")
+            self.dropped = 0
+        logger.log(self.level, f"{self.label}: {message}")
+        self.logged += 1
+
+    def close(self):
+        """
+        Log what is pending and close the raw file / 記錄尚未輸出的內容並關閉原始輸出檔
+        """
+        self._flush_repeats(time.monotonic())
+        self._close_raw()
+        if self.suppressed:
+            where = f"，完整輸出: {self.raw_path}" if self.raw_path else ""
+            logger.log(self.level, f"{self.label}: 共 {self.lines} 行輸出，略過 {self.suppressed} 行{where}")
+        elif self.raw_path:
+            logger.debug(f"{self.label}: 完整輸出已保存: {self.raw_path}")
+
+    def _close_raw(self):
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        try:
+            raw.close()
+        except OSError as e:
+            logger.warning(f"寫入原始輸出檔案失敗: {e}")
@@ -0,0 +1,399 @@
+"""
+Batch planner module / 批次規劃模組
+Real-time factor history and batch ETA prediction / 即時率歷史記錄與批次完成時間預估
+
+Finished engine and translation stages (see metrics.py) update a small history keyed by / 完成的引擎與翻譯階段（見 metrics.py）會更新以
+engine, model, language and machine. Before a run it predicts each file's processing time, / 引擎、模型、語言、機器為鍵值的歷史記錄。執行前預估每個檔案的處理時間、
+the batch ETA and, for translation, API calls and tokens. The same history scales engine / 批次完成時間，翻譯則預估 API 呼叫次數與 token 數。
+timeouts to the file length instead of a fixed hour. / 同一份記錄也用來依檔案長度調整引擎超時，取代固定的一小時。
+"""
+import json
+import os
+import threading
+import time
+
+import metrics
+
+HISTORY_FILE = "rtf_history.json"
+
+# Timeout used when the audio length is unknown / 無法得知音訊長度時使用的超時
+DEFAULT_ENGINE_TIMEOUT = 3600
+
+# Priors used before any history exists / 尚無歷史記錄時使用的預設值
+DEFAULT_RTF = {'coreml': 0.15, 'cpu': 1.0, 'faster': 0.35}
+DEFAULT_SECONDS_PER_REQUEST = 3.0
+
+# Weight of the newest sample in the moving average / 移動平均中最新樣本的權重
+EWMA_ALPHA = 0.3
+
+# Live refinement: actual/predicted ratio is clamped to this range / 即時修正：實際/預估比例的限制範圍
+CORRECTION_RANGE = (0.2, 5.0)
+
+TRANSLATION_ENGINE = 'openai'
+# Prompt wrapped around every chunk (see ai_translate.translate_text) / 每個區塊外加的提示詞（見 ai_translate.translate_text）
+TRANSLATION_USER_PREFIX = "請幫我翻譯以下內容:\n\n"
+# Chat format overhead per request (role markers, priming) / 每次請求的對話格式額外 token
+TOKENS_PER_REQUEST_OVERHEAD = 11
+
+
+def machine_id():
+    """
+    Identify this machine (host, architecture, core count) / 識別目前機器（主機、架構、核心數）
+    """
+    import platform
+    return f"{platform.node()}/{platform.machine()}/{os.cpu_count() or 1}"
+
+
+def estimate_tokens(text):
+    """
+    Rough token count: ~4 ASCII characters or 1 CJK character per token / 粗略 token 數：約 4 個 ASCII 字元或 1 個中日韓字元為一個 token
+
+    Args:
+        text: Text to measure / 要估算的文字
+
+    Returns:
+        int: Estimated tokens / 估計的 token 數
+    """
+    ascii_count = sum(1 for ch in text if ch < '\x80')
+    return (ascii_count + 3) // 4 + (len(text) - ascii_count)
+
+
+def format_duration(seconds):
+    """
+    Format seconds as a short duration (e.g. '1h05m', '3m20s', '42s') / 將秒數格式化為簡短時長（例如 '1h05m'、'3m20s'、'42s'）
+    """
+    seconds = int(round(seconds or 0))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class FileEstimate:
+    """
+    Predicted (and, once finished, actual) processing time of one file / 單一檔案的預估（完成後為實際）處理時間
+    """
+
+    __slots__ = ("file", "audio_seconds", "predicted_seconds", "timeout", "actual_seconds")
+
+    def __init__(self, file, audio_seconds, predicted_seconds, timeout=None):
+        self.file = file
+        self.audio_seconds = audio_seconds
+        self.predicted_seconds = predicted_seconds
+        self.timeout = timeout
+        self.actual_seconds = None
+
+    def to_dict(self):
+        return {
+            "file": self.file,
+            "audio_s": round(self.audio_seconds, 3),
+            "predicted_s": round(self.predicted_seconds, 1),
+            "timeout_s": round(self.timeout) if self.timeout else None,
+            "actual_s": round(self.actual_seconds, 1) if self.actual_seconds is not None else None,
+        }
+
+
+class BatchPlan:
+    """
+    Per-file predictions of a batch, refined as files complete / 批次中每個檔案的預估，會隨檔案完成而修正
+    """
+
+    def __init__(self, estimates):
+        """
+        Args:
+            estimates: List of FileEstimate in processing order / 依處理順序排列的 FileEstimate 列表
+        """
+        self.estimates = list(estimates)
+        self._by_file = {estimate.file: estimate for estimate in self.estimates}
+
+    @property
+    def total_predicted(self):
+        return sum(estimate.predicted_seconds for estimate in self.estimates)
+
+    def get(self, file):
+        return self._by_file.get(file)
+
+    def complete(self, file, actual_seconds):
+        """
+        Record the actual time of a finished file / 記錄已完成檔案的實際時間
+        """
+        estimate = self._by_file.get(file)
+        if estimate is not None:
+            estimate.actual_seconds = actual_seconds
+
+    def correction(self):
+        """
+        Actual/predicted ratio of finished files, applied to the rest / 已完成檔案的實際/預估比例，套用到剩餘檔案
+        """
+        done = [e for e in self.estimates if e.actual_seconds is not None and e.predicted_seconds > 0]
+        if not done:
+            return 1.0
+        ratio = sum(e.actual_seconds for e in done) / sum(e.predicted_seconds for e in done)
+        low, high = CORRECTION_RANGE
+        return min(max(ratio, low), high)
+
+    def remaining_seconds(self):
+        """
+        Refined prediction for the files not finished yet / 尚未完成檔案的修正後預估
+        """
+        factor = self.correction()
+        return sum(e.predicted_seconds for e in self.estimates if e.actual_seconds is None) * factor
+
+    def eta(self, now=None):
+        """
+        Predicted wall-clock finish time (epoch seconds) / 預估完成時間（epoch 秒）
+        """
+        return (time.time() if now is None else now) + self.remaining_seconds()
+
+    def to_dict(self):
+        return {
+            "files": [estimate.to_dict() for estimate in self.estimates],
+            "total_predicted_s": round(self.total_predicted, 1),
+            "remaining_s": round(self.remaining_seconds(), 1),
+            "eta": round(self.eta()),
+        }
+
+
+class TranslationPlan:
+    """
+    Expected API calls, tokens and time of a translation batch / 翻譯批次預期的 API 呼叫、token 與時間
+    """
+
+    def __init__(self):
+        self.files = []
+        self.unreadable = []  # SRT files that could not be read or parsed / 無法讀取或解析的 SRT 檔案
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.predicted_seconds = 0.0
+
+    @property
+    def tokens(self):
+        return self.prompt_tokens + self.completion_tokens
+
+    def to_dict(self):
+        return {
+            "files": self.files,
+            "unreadable": self.unreadable,
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens": self.tokens,
+            "predicted_s": round(self.predicted_seconds, 1),
+        }
+
+
+class RTFHistory:
+    """
+    Persistent moving averages per (engine, model, language, machine) / 依（引擎, 模型, 語言, 機器）保存的移動平均
+
+    Engines store the real-time factor, translation stores seconds per API request. / 引擎儲存即時率，翻譯儲存每次 API 請求的秒數。
+    """
+
+    def __init__(self, path, machine=None):
+        """
+        Args:
+            path: JSON file holding the history / 保存歷史記錄的 JSON 檔案
+            machine: Machine id (default: this machine) / 機器識別（預設為目前機器）
+        """
+        self.path = path
+        self.machine = machine or machine_id()
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f).get("entries", {})
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp = f"{self.path}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({"entries": self._entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temp, self.path)
+
+    def _key(self, engine, model, language, machine=None):
+        return "|".join(str(part) for part in (engine, model, language, machine or self.machine))
+
+    def update(self, engine, model, language, value):
+        """
+        Add a sample (RTF or seconds per request) / 加入一個樣本（即時率或每次請求秒數）
+        """
+        if value is None or value <= 0:
+            return
+        key = self._key(engine, model, language)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"mean": value, "samples": 0}
+            else:
+                entry["mean"] += EWMA_ALPHA * (value - entry["mean"])
+            entry["samples"] += 1
+            entry["updated"] = round(time.time())
+            self._entries[key] = entry
+            try:
+                self._save()
+            except OSError as e:
+                from logger import logger
+                logger.warning(f"儲存即時率歷史失敗: {e}")
+
+    def lookup(self, engine, model, language):
+        """
+        Best known value, falling back from exact match to broader matches / 最佳已知值，由完全符合逐步放寬
+
+        Order: same language, any language, any model (all on this machine), then other machines. / 順序：相同語言、任何語言、任何模型（皆在本機），然後是其他機器。
+
+        Returns:
+            tuple: (value or None, number of samples) / （值或 None, 樣本數）
+        """
+        levels = [
+            lambda e, m, l, h: (e, m, l, h) == (engine, model, language, self.machine),
+            lambda e, m, l, h: (e, m, h) == (engine, model, self.machine),
+            lambda e, m, l, h: (e, h) == (engine, self.machine),
+            lambda e, m, l, h: (e, m, l) == (engine, model, language),
+            lambda e, m, l, h: e == engine,
+        ]
+        with self._lock:
+            parsed = [(key.split("|", 3), entry) for key, entry in self._entries.items()]
+        for matches in levels:
+            found = [entry for parts, entry in parsed if len(parts) == 4 and matches(*parts)]
+            if found:
+                samples = sum(entry["samples"] for entry in found)
+                return sum(entry["mean"] * entry["samples"] for entry in found) / samples, samples
+        return None, 0
+
+    def rtf(self, engine, model, language):
+        """
+        Expected real-time factor / 預期即時率
+        """
+        value, _ = self.lookup(engine, str(model), str(language))
+        return value if value is not None else DEFAULT_RTF.get(engine, 1.0)
+
+    def seconds_per_request(self, model, language):
+        """
+        Expected seconds per translation API request / 預期每次翻譯 API 請求的秒數
+        """
+        value, _ = self.lookup(TRANSLATION_ENGINE, str(model), str(language))
+        return value if value is not None else DEFAULT_SECONDS_PER_REQUEST
+
+    def observe(self, record):
+        """
+        metrics listener: learn from finished engine and translation stages / metrics 監聽者：從完成的引擎與翻譯階段學習
+        """
+        if not record.ok:
+            return
+        labels = record.labels
+        if record.stage == metrics.STAGE_ENGINE and record.rtf is not None:
+            self.update(labels.get('engine'), str(labels.get('model')), str(labels.get('language')), record.rtf)
+        elif record.stage == metrics.STAGE_TRANSLATE and record.extra.get('requests'):
+            self.update(TRANSLATION_ENGINE, str(labels.get('model')), str(labels.get('language')),
+                        record.wall_seconds / record.extra['requests'])
+
+    def engine_timeout(self, engine, model, language, audio_seconds):
+        """
+        Engine timeout scaled to the file length / 依檔案長度調整的引擎超時
+
+        Returns:
+            float: max(ENGINE_TIMEOUT_MIN, predicted time x ENGINE_TIMEOUT_FACTOR) seconds, / max(ENGINE_TIMEOUT_MIN, 預估時間 x ENGINE_TIMEOUT_FACTOR) 秒，
+                DEFAULT_ENGINE_TIMEOUT when the length is unknown / 長度未知時為 DEFAULT_ENGINE_TIMEOUT
+        """
+        if not audio_seconds:
+            return DEFAULT_ENGINE_TIMEOUT
+        from config import config
+        predicted = self.rtf(engine, model, language) * audio_seconds
+        return max(config.ENGINE_TIMEOUT_MIN, predicted * config.ENGINE_TIMEOUT_FACTOR)
+
+    def plan_batch(self, engine, model, language, durations):
+        """
+        Predict a transcription batch / 預估轉錄批次
+
+        Args:
+            engine: Engine name / 引擎名稱
+            model: Model name / 模型名稱
+            language: Spoken language / 語言
+            durations: {file: audio seconds} in processing order / 依處理順序的 {檔案: 音訊秒數}
+
+        Returns:
+            BatchPlan: Per-file predictions and timeouts / 每個檔案的預估與超時
+        """
+        rtf = self.rtf(engine, model, language)
+        return BatchPlan(
+            FileEstimate(file, seconds, seconds * rtf, self.engine_timeout(engine, model, language, seconds))
+            for file, seconds in durations.items()
+        )
+
+    def plan_translation(self, srt_files, target_language):
+        """
+        Predict API calls, tokens and time to translate SRT files / 預估翻譯 SRT 檔案所需的 API 呼叫、token 與時間
+
+        Mirrors ai_translate: one request per TRANSLATE_CHUNK_SIZE characters of each subtitle. / 與 ai_translate 相同：每條字幕每 TRANSLATE_CHUNK_SIZE 個字元一次請求。
+        Files that cannot be read or parsed are logged and left out, translating them reports the error. / 無法讀取或解析的檔案會記錄後略過，翻譯時再回報錯誤。
+
+        Args:
+            srt_files: SRT file paths / SRT 檔案路徑
+            target_language: Target language / 目標語言
+
+        Returns:
+            TranslationPlan: Expected calls, tokens and time / 預期的呼叫、token 與時間
+        """
+        import srt
+        from config import config
+
+        chunk_size = config.TRANSLATE_CHUNK_SIZE
+        prompt_overhead = (
+            estimate_tokens(config.TRANSLATE_SYSTEM_PROMPT.format(target_language=target_language or '目標語言'))
+            + estimate_tokens(TRANSLATION_USER_PREFIX) + TOKENS_PER_REQUEST_OVERHEAD
+        )
+        seconds_per_request = self.seconds_per_request(config.OPENAI_MODEL, target_language)
+
+        plan = TranslationPlan()
+        for srt_file in srt_files:
+            try:
+                with open(srt_file, 'r', encoding='utf-8') as f:
+                    subtitles = list(srt.parse(f.read()))
+            except (OSError, UnicodeDecodeError, ValueError, srt.SRTParseError) as e:
+                from logger import logger
+                logger.warning(f"無法讀取字幕，不列入預估: {os.path.basename(srt_file)}: {e}")
+                plan.unreadable.append(srt_file)
+                continue
+            requests = tokens_in = tokens_out = 0
+            for subtitle in subtitles:
+                for i in range(0, len(subtitle.content), chunk_size):
+                    chunk_tokens = estimate_tokens(subtitle.content[i:i + chunk_size])
+                    requests += 1
+                    tokens_in += prompt_overhead + chunk_tokens
+                    tokens_out += chunk_tokens
+            plan.files.append({"file": srt_file, "subtitles": len(subtitles), "requests": requests,
+                               "tokens": tokens_in + tokens_out,
+                               "predicted_s": round(requests * seconds_per_request, 1)})
+            plan.requests += requests
+            plan.prompt_tokens += tokens_in
+            plan.completion_tokens += tokens_out
+        plan.predicted_seconds = plan.requests * seconds_per_request
+        return plan
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_history():
+    """
+    Get the shared history (loaded on first use and subscribed to metrics) / 取得共用的歷史記錄（第一次使用時載入並訂閱 metrics）
+
+    Returns:
+        RTFHistory: Shared history / 共用的歷史記錄
+    """
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                recorder = metrics.get_recorder()
+                _history = RTFHistory(os.path.join(recorder.directory, HISTORY_FILE))
+                recorder.add_listener(_history.observe)
+    return _history
@@ -0,0 +1,327 @@
+"""
+Process supervisor module / 進程監管模組
+One asyncio event loop in one background thread runs every engine child process / 單一背景線程中的 asyncio 事件迴圈管理所有引擎子進程
+
+Output is read without blocking as it arrives and only the last lines of each stream are kept / 輸出在產生時以非阻塞方式讀取，每個串流只保留最後幾行
+for error reports. Timeouts, cancellation, progress ticks and memory samples are timers on / 供錯誤報告使用。超時、取消、進度更新與記憶體取樣都是事件迴圈上的計時器，
+the loop instead of polling threads, so many concurrent engine runs cost a few threads in total. / 而不是輪詢線程，因此大量同時執行的引擎總共只需要少數幾個線程。
+
+Usage / 用法:
+    result = get_supervisor().run(cmd, timeout=600, pause_flag=token,
+                                  on_line=lambda stream, line: logger.info(line))
+    if result.timed_out: ...
+    if result.returncode != 0: ... result.stderr ...   # Tail of the stream / 串流的尾端
+
+Child processes get their own session (process group), so killing them also kills helpers / 子進程擁有自己的工作階段（進程組），終止時也會終止 ffmpeg 等輔助進程。
+such as ffmpeg. POSIX only, like the rest of the engine handling. / 與其他引擎處理相同，僅支援 POSIX。
+"""
+import asyncio
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+from collections import deque, namedtuple
+
+from cancellation import CancelToken, DEFAULT_KILL_GRACE_SECONDS
+from logger import logger
+
+# Lines kept per stream for error reports / 每個串流保留供錯誤報告使用的行數
+DEFAULT_TAIL_LINES = 200
+
+# A line longer than this is cut (progress bars without newlines) / 超過此長度的行會被截斷（沒有換行的進度條）
+MAX_LINE_BYTES = 64 * 1024
+
+# Longest wait between exit checks once the output has closed (no pidfd) / 輸出關閉後兩次結束檢查之間的最長等待（沒有 pidfd 時）
+EXIT_POLL_MAX_SECONDS = 0.5
+
+STDOUT = "stdout"
+STDERR = "stderr"
+
+# \r ends a line too, like text-mode pipes did / \r 也視為行尾，與文字模式管道相同
+_LINE_END = re.compile(rb"[\r\n]")
+
+ProcessResult = namedtuple('ProcessResult', 'returncode stdout stderr timed_out lines pid started_at')
+ProcessResult.__doc__ = """
+Outcome of a supervised process / 受監管進程的結果
+
+returncode: Exit code (negative: killed by signal) / 退出碼（負數：被訊號終止）
+stdout, stderr: Last lines of each stream joined with newlines / 各串流的最後幾行（以換行連接）
+timed_out: Killed because the timeout expired / 因超時而被終止
+lines: Total lines read per stream, e.g. {'stdout': 1234} / 每個串流讀取的總行數
+"""
+
+
+class _LineReader(asyncio.Protocol):
+    """
+    Pipe protocol splitting the stream into lines / 將串流切分為行的管道協定
+    """
+
+    def __init__(self, run, stream):
+        self.run = run
+        self.stream = stream
+        self.buffer = bytearray()
+        self.closed = run.loop.create_future()
+
+    def data_received(self, data):
+        self.buffer += data
+        parts = _LINE_END.split(self.buffer)
+        self.buffer = bytearray(parts.pop())
+        for part in parts:
+            self.run.line(self.stream, part)
+        if len(self.buffer) > MAX_LINE_BYTES:
+            self.run.line(self.stream, bytes(self.buffer))
+            self.buffer.clear()
+
+    def eof_received(self):
+        return False  # Close the transport / 關閉傳輸
+
+    def connection_lost(self, exc):
+        if self.buffer:
+            self.run.line(self.stream, bytes(self.buffer))
+            self.buffer.clear()
+        if not self.closed.done():
+            self.closed.set_result(None)
+
+
+class _Run:
+    """
+    State of one supervised process, only touched on the loop thread / 單一受監管進程的狀態，只在事件迴圈線程上存取
+    """
+
+    def __init__(self, loop, process, on_line, tail_lines, kill_grace):
+        self.loop = loop
+        self.process = process
+        self.on_line = on_line
+        self.kill_grace = kill_grace
+        self.tails = {STDOUT: deque(maxlen=tail_lines), STDERR: deque(maxlen=tail_lines)}
+        self.lines = {STDOUT: 0, STDERR: 0}
+        self.exited = False
+        self.timed_out = False
+        self._escalation = None
+
+    def line(self, stream, data):
+        text = data.decode('utf-8', 'replace').rstrip()
+        if not text:
+            return
+        self.lines[stream] += 1
+        self.tails[stream].append(text)
+        if self.on_line is not None:
+            try:
+                self.on_line(stream, text)
+            except Exception as e:
+                logger.warning(f"處理進程輸出時發生錯誤: {e}")
+
+    def expire(self):
+        self.timed_out = True
+        self.kill()
+
+    def kill(self):
+        """
+        SIGTERM to the process group, SIGKILL after the grace period / 對進程組送出 SIGTERM，寬限期後送出 SIGKILL
+        """
+        if self.exited or self._escalation is not None:
+            return
+        logger.warning(f"終止進程組 (PID: {self.process.pid})")
+        self._signal(signal.SIGTERM)
+        self._escalation = self.loop.call_later(self.kill_grace, self._force_kill)
+
+    def _force_kill(self):
+        if not self.exited:
+            logger.warning(f"進程未在 {self.kill_grace} 秒內結束，強制終止 (PID: {self.process.pid})")
+            self._signal(signal.SIGKILL)
+
+    def _signal(self, sig):
+        try:
+            os.killpg(self.process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def mark_exited(self):
+        self.exited = True
+        if self._escalation is not None:
+            self._escalation.cancel()
+
+
+class ProcessSupervisor:
+    """
+    Runs child processes on a shared event loop / 在共用的事件迴圈上執行子進程
+    """
+
+    def __init__(self, kill_grace=DEFAULT_KILL_GRACE_SECONDS):
+        """
+        Args:
+            kill_grace: Seconds between SIGTERM and SIGKILL when no CancelToken gives one / 沒有 CancelToken 指定時 SIGTERM 與 SIGKILL 之間的秒數
+        """
+        self.kill_grace = kill_grace
+        self._loop = None
+        self._lock = threading.Lock()
+        self._active = 0
+
+    @property
+    def active(self):
+        """
+        Number of processes currently supervised / 目前受監管的進程數
+        """
+        return self._active
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None:
+                # Selector loop: pipes are watched with select/kqueue/epoll / 選擇器迴圈：以 select/kqueue/epoll 監看管道
+                loop = asyncio.SelectorEventLoop()
+                threading.Thread(target=loop.run_forever, name="process-supervisor", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, cmd, timeout=None, pause_flag=None, on_line=None, merge_stderr=False, tail_lines=DEFAULT_TAIL_LINES,
+            tick=None, reservation=None, env=None):
+        """
+        Run a command to completion; blocks the calling thread only / 執行指令直到結束；只阻塞呼叫的線程
+
+        Args:
+            cmd: Command list / 指令列表
+            timeout: Seconds before the process group is killed (None: no limit) / 終止進程組前的秒數（None：不限制）
+            pause_flag: CancelToken kills the process group on cancellation; a plain Event is left to the caller / CancelToken 在取消時終止進程組；一般 Event 由呼叫端檢查
+            on_line: Called as on_line(stream, line) for each output line, on the loop thread (optional) / 每行輸出時以 on_line(stream, line) 呼叫，在事件迴圈線程上執行（可選）
+            merge_stderr: Send stderr into stdout / 將 stderr 合併到 stdout
+            tail_lines: Lines kept per stream for the result / 結果中每個串流保留的行數
+            tick: (interval, callback) called every interval seconds while running (optional) / 執行期間每 interval 秒呼叫的 (interval, callback)（可選）
+            reservation: Memory reservation whose RSS is sampled while running (optional) / 執行期間取樣 RSS 的記憶體預留（可選）
+            env: Environment for the child (default: inherited) / 子進程的環境變數（預設繼承）
+
+        Returns:
+            ProcessResult: Exit code and output tails / 退出碼與輸出尾端
+
+        Raises:
+            OSError: If the command cannot be started / 無法啟動指令時拋出
+        """
+        loop = self._get_loop()
+        runs = []
+        future = asyncio.run_coroutine_threadsafe(
+            self._supervise(cmd, timeout, pause_flag, on_line, merge_stderr, tail_lines, tick, reservation, env, runs),
+            loop)
+        try:
+            return future.result()
+        except BaseException:
+            # Interrupted caller (e.g. Ctrl+C): do not leave the engine running / 呼叫端被中斷（如 Ctrl+C）：不讓引擎繼續執行
+            if runs:
+                loop.call_soon_threadsafe(runs[0].kill)
+            raise
+
+    async def _supervise(self, cmd, timeout, pause_flag, on_line, merge_stderr, tail_lines, tick, reservation, env, runs):
+        loop = asyncio.get_running_loop()
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT if merge_stderr else subprocess.PIPE,
+            env=env,
+            start_new_session=True  # Own process group, killed as a whole / 獨立進程組，整組終止
+        )
+        started_at = time.time()
+        run = _Run(loop, process, on_line, tail_lines, getattr(pause_flag, 'kill_grace', self.kill_grace))
+        runs.append(run)
+        self._active += 1
+        logger.debug(f"監管進程已啟動 (PID: {process.pid}，監管中 {self._active} 個)")
+
+        timers = []
+        if timeout:
+            timers.append(loop.call_later(timeout, run.expire))
+
+        def on_cancel():
+            loop.call_soon_threadsafe(run.kill)
+
+        if isinstance(pause_flag, CancelToken):
+            pause_flag.add_callback(on_cancel)
+        tasks = []
+        if tick is not None:
+            tasks.append(loop.create_task(self._every(tick[0], tick[1])))
+        if reservation is not None:
+            tasks.append(loop.create_task(self._every(reservation.governor.sample_interval, reservation.sample,
+                                                      process.pid, blocking=True)))
+        try:
+            readers = []
+            streams = [(STDOUT, process.stdout)] + ([] if merge_stderr else [(STDERR, process.stderr)])
+            for stream, pipe in streams:
+                _, reader = await loop.connect_read_pipe(lambda stream=stream: _LineReader(run, stream), pipe)
+                readers.append(reader.closed)
+            await asyncio.gather(*readers)
+            returncode = await self._wait_exit(process)
+        except BaseException:
+            run.kill()
+            raise
+        finally:
+            run.mark_exited()
+            for timer in timers:
+                timer.cancel()
+            for task in tasks:
+                task.cancel()
+            if isinstance(pause_flag, CancelToken):
+                pause_flag.remove_callback(on_cancel)
+            self._active -= 1
+        return ProcessResult(returncode, '\n'.join(run.tails[STDOUT]), '\n'.join(run.tails[STDERR]), run.timed_out,
+                             dict(run.lines), process.pid, started_at)
+
+    @staticmethod
+    async def _every(interval, callback, *args, blocking=False):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                if blocking:
+                    # Sampling may run ps, keep it off the loop thread / 取樣可能執行 ps，不在事件迴圈線程上執行
+                    await loop.run_in_executor(None, callback, *args)
+                else:
+                    callback(*args)
+            except Exception as e:
+                logger.warning(f"定期回調執行失敗: {e}")
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    async def _wait_exit(process):
+        """
+        Wait for the child to exit once its output has closed / 在輸出關閉後等待子進程結束
+        """
+        loop = asyncio.get_running_loop()
+        pidfd = None
+        if hasattr(os, 'pidfd_open'):
+            try:
+                pidfd = os.pidfd_open(process.pid)
+            except OSError:
+                pidfd = None
+        if pidfd is not None:
+            # Linux: the descriptor becomes readable on exit, no polling / Linux：進程結束時描述符變為可讀，不需輪詢
+            exited = loop.create_future()
+            loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+            try:
+                await exited
+            finally:
+                loop.remove_reader(pidfd)
+                os.close(pidfd)
+            return process.wait()
+        # Output closes right before exit, so a few short waits are enough / 輸出在結束前才關閉，短暫等待幾次即可
+        delay = 0.005
+        while process.poll() is None:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, EXIT_POLL_MAX_SECONDS)
+        return process.returncode
+
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+
+def get_supervisor():
+    """
+    Get the process-wide supervisor (its loop thread starts on first run) / 取得整個進程共用的監管器（第一次執行時啟動事件迴圈線程）
+
+    Returns:
+        ProcessSupervisor: Shared supervisor / 共用的監管器
+    """
+    global _supervisor
+    if _supervisor is None:
+        with _supervisor_lock:
+            if _supervisor is None:
+                _supervisor = ProcessSupervisor()
+    return _supervisor
@@ -0,0 +1,104 @@
+"""
+Speed profile module / 速度設定檔模組
+Named decoding presets that trade accuracy for speed, translated into each engine's options / 以準確度換取速度的具名解碼預設，轉換為各引擎的選項
+
+Profiles / 設定檔:
+    fast     - greedy decoding, no temperature fallback: several times faster, more errors / 貪婪解碼、不做溫度回退：快數倍，錯誤較多
+    balanced - engine defaults (beam search 5, fallback on), same as before profiles existed / 引擎預設值（beam search 5、啟用回退），與加入設定檔前相同
+    accurate - wider beam, more fallback candidates and word-level timestamps / 更寬的 beam、更多回退候選與逐字時間戳
+
+whisper.cpp has no word timestamps in SRT output, so 'accurate' only widens its search. / whisper.cpp 的 SRT 輸出沒有逐字時間戳，因此 'accurate' 只加寬搜尋。
+"""
+PROFILE_FAST = "fast"
+PROFILE_BALANCED = "balanced"
+PROFILE_ACCURATE = "accurate"
+PROFILES = (PROFILE_FAST, PROFILE_BALANCED, PROFILE_ACCURATE)
+
+
+class SpeedProfile:
+    """
+    Decoding parameters of one profile (None keeps the engine default) / 一個設定檔的解碼參數（None 表示使用引擎預設值）
+    """
+
+    def __init__(self, name, beam_size=None, best_of=None, temperature_fallback=True, word_timestamps=False):
+        """
+        Args:
+            name: Profile name / 設定檔名稱
+            beam_size: Beam search width (1 = greedy) / Beam search 寬度（1 = 貪婪解碼）
+            best_of: Candidates sampled when falling back to a higher temperature / 回退到較高溫度時取樣的候選數
+            temperature_fallback: Retry failed windows at higher temperatures / 對失敗的視窗以較高溫度重試
+            word_timestamps: Align segment boundaries on word timestamps / 以逐字時間戳對齊段落邊界
+        """
+        self.name = name
+        self.beam_size = beam_size
+        self.best_of = best_of
+        self.temperature_fallback = temperature_fallback
+        self.word_timestamps = word_timestamps
+
+    def whisper_cpp_args(self):
+        """
+        Extra whisper-cli arguments / whisper-cli 的額外參數
+        """
+        args = []
+        if self.beam_size is not None:
+            args += ['-bs', str(self.beam_size)]
+        if self.best_of is not None:
+            args += ['-bo', str(self.best_of)]
+        if not self.temperature_fallback:
+            args.append('-nf')
+        return args
+
+    def openai_whisper_args(self):
+        """
+        Extra openai-whisper CLI arguments / openai-whisper 命令列的額外參數
+        """
+        args = []
+        if self.beam_size is not None:
+            args += ['--beam_size', str(self.beam_size)]
+        if self.best_of is not None:
+            args += ['--best_of', str(self.best_of)]
+        if not self.temperature_fallback:
+            args += ['--temperature_increment_on_fallback', 'None']
+        if self.word_timestamps:
+            args += ['--word_timestamps', 'True']
+        return args
+
+    def faster_whisper_options(self, default_beam_size):
+        """
+        Keyword arguments for faster-whisper transcribe() / faster-whisper transcribe() 的關鍵字參數
+
+        Args:
+            default_beam_size: Beam size when the profile keeps the default (FASTER_WHISPER_BEAM_SIZE) / 設定檔使用預設值時的 beam 寬度（FASTER_WHISPER_BEAM_SIZE）
+        """
+        options = {'beam_size': self.beam_size or default_beam_size, 'word_timestamps': self.word_timestamps}
+        if self.best_of is not None:
+            options['best_of'] = self.best_of
+        if not self.temperature_fallback:
+            options['temperature'] = 0.0
+        return options
+
+
+_PROFILES = {
+    PROFILE_FAST: SpeedProfile(PROFILE_FAST, beam_size=1, best_of=1, temperature_fallback=False),
+    PROFILE_BALANCED: SpeedProfile(PROFILE_BALANCED),
+    PROFILE_ACCURATE: SpeedProfile(PROFILE_ACCURATE, beam_size=8, best_of=8, word_timestamps=True),
+}
+
+
+def get_profile(name=None):
+    """
+    Look up a profile / 取得設定檔
+
+    Args:
+        name: Profile name (default: SPEED_PROFILE) / 設定檔名稱（預設為 SPEED_PROFILE）
+
+    Raises:
+        ValueError: If no profile has this name / 沒有此名稱的設定檔時
+    """
+    if name is None:
+        from config import config
+        name = config.SPEED_PROFILE
+    try:
+        return _PROFILES[name]
+    except KeyError:
+        raise ValueError(f"未知的速度設定檔: {name}（可用: {', '.join(PROFILES)}）") from None
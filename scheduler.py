@@ -0,0 +1,146 @@
+"""
+Batch scheduling module / 批次排程模組
+Orders the files of a transcription batch once their durations are known / 在得知音訊長度後決定轉錄批次中檔案的處理順序
+
+Policies / 策略:
+    fifo     - order the files were added / 加入的順序
+    shortest - shortest audio first: earliest first result, lowest mean latency / 最短優先：最早產生第一個結果、平均延遲最低
+    longest  - longest audio first: best packing when several workers share the batch / 最長優先：多個工作者共同處理時最能填滿時間
+    priority - explicit priority rules (higher first), FIFO among equals / 明確的優先權規則（高者優先），相同時維持先進先出
+
+Time-to-first-result and mean completion latency can be simulated for every policy from the / 可依 planner 的預估時間模擬每個策略的
+planner's predictions and are measured for the policy actually used. / 首個結果時間與平均完成延遲，實際使用的策略則會實測。
+"""
+import fnmatch
+import os
+
+POLICY_FIFO = "fifo"
+POLICY_SHORTEST = "shortest"
+POLICY_LONGEST = "longest"
+POLICY_PRIORITY = "priority"
+POLICIES = (POLICY_FIFO, POLICY_SHORTEST, POLICY_LONGEST, POLICY_PRIORITY)
+
+
+def parse_priorities(spec):
+    """
+    Parse priority rules 'pattern=N,pattern=N' (fnmatch on file name) / 解析優先權規則 'pattern=N,pattern=N'（以 fnmatch 比對檔名）
+
+    Args:
+        spec: Rule string, or an iterable of 'pattern=N' / 規則字串，或 'pattern=N' 的可迭代物件
+
+    Returns:
+        list: [(pattern, priority)] in the given order / 依原順序的 [(樣式, 優先權)]
+
+    Raises:
+        ValueError: If a rule is malformed / 規則格式錯誤時
+    """
+    if not spec:
+        return []
+    items = spec.split(",") if isinstance(spec, str) else spec
+    rules = []
+    for item in items:
+        item = item.strip()
+        if not item:
+            continue
+        pattern, sep, value = item.rpartition("=")
+        if not sep or not pattern:
+            raise ValueError(f"優先權規則格式錯誤（應為 pattern=N）: {item}")
+        rules.append((pattern.strip(), int(value)))
+    return rules
+
+
+def file_priority(file, rules):
+    """
+    Priority of a file: the first matching rule wins, 0 if none matches / 檔案的優先權：第一個符合的規則為準，都不符合時為 0
+    """
+    name = os.path.basename(file)
+    for pattern, priority in rules:
+        if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(file, pattern):
+            return priority
+    return 0
+
+
+def order_files(files, policy, durations=None, priorities=None):
+    """
+    Order files according to a policy (stable: ties keep FIFO order) / 依策略排序檔案（穩定排序：相同時維持先進先出）
+
+    Files with unknown duration (0) are placed last by the duration policies. / 長度未知（0）的檔案在依長度排序的策略中排在最後。
+
+    Args:
+        files: Files in the order they were added / 依加入順序的檔案
+        policy: One of POLICIES / POLICIES 之一
+        durations: {file: audio seconds} / {檔案: 音訊秒數}
+        priorities: Priority rules from parse_priorities() / parse_priorities() 產生的優先權規則
+
+    Returns:
+        list: Files in processing order / 依處理順序的檔案
+
+    Raises:
+        ValueError: If the policy is unknown / 策略未知時
+    """
+    files = list(files)
+    durations = durations or {}
+    if policy == POLICY_FIFO:
+        return files
+    if policy == POLICY_SHORTEST:
+        return sorted(files, key=lambda f: (not durations.get(f), durations.get(f, 0)))
+    if policy == POLICY_LONGEST:
+        return sorted(files, key=lambda f: (not durations.get(f), -durations.get(f, 0)))
+    if policy == POLICY_PRIORITY:
+        rules = priorities or []
+        return sorted(files, key=lambda f: -file_priority(f, rules))
+    raise ValueError(f"未知的排程策略: {policy}")
+
+
+def latency_summary(completion_times):
+    """
+    Time-to-first-result, mean completion latency and makespan / 首個結果時間、平均完成延遲與總完成時間
+
+    Args:
+        completion_times: Seconds from batch start until each file finished / 從批次開始到每個檔案完成的秒數
+
+    Returns:
+        dict: first_result_s, mean_latency_s, makespan_s (None when empty) / 空列表時為 None
+    """
+    times = list(completion_times)
+    if not times:
+        return {"first_result_s": None, "mean_latency_s": None, "makespan_s": None}
+    return {
+        "first_result_s": min(times),
+        "mean_latency_s": sum(times) / len(times),
+        "makespan_s": max(times),
+    }
+
+
+def simulate(ordered_files, predicted_seconds, workers=1):
+    """
+    Simulate processing in order on a pool of workers (greedy list scheduling) / 模擬依序在工作者池上處理（貪婪列表排程）
+
+    Args:
+        ordered_files: Files in processing order / 依處理順序的檔案
+        predicted_seconds: {file: predicted processing seconds} / {檔案: 預估處理秒數}
+        workers: Number of files processed at the same time / 同時處理的檔案數
+
+    Returns:
+        dict: latency_summary() of the simulated completion times / 模擬完成時間的 latency_summary()
+    """
+    free_at = [0.0] * max(1, workers)
+    completions = []
+    for file in ordered_files:
+        slot = min(range(len(free_at)), key=free_at.__getitem__)
+        free_at[slot] += predicted_seconds.get(file, 0.0)
+        completions.append(free_at[slot])
+    return latency_summary(completions)
+
+
+def compare_policies(files, durations, predicted_seconds, priorities=None, workers=1):
+    """
+    Simulated latency of every policy for the same batch / 同一批次在每個策略下的模擬延遲
+
+    Returns:
+        dict: {policy: latency_summary()} / {策略: latency_summary()}
+    """
+    return {
+        policy: simulate(order_files(files, policy, durations, priorities), predicted_seconds, workers)
+        for policy in POLICIES
+    }
@@ -0,0 +1,254 @@
+"""
+Scratch space module / 暫存空間模組
+Managed directory for decoded intermediates, shared by batches and engines / 管理解碼中間檔的目錄，供各批次與引擎共用
+
+Intermediates are keyed by source identity (real path, size, modification time) and a variant / 中間檔以來源識別（實際路徑、大小、修改時間）與變體為鍵，
+name, so repeated runs on the same file reuse the decoded WAV instead of converting it again. / 因此對同一檔案重複執行時會重用已解碼的 WAV，而不是再轉換一次。
+When the directory grows past SCRATCH_QUOTA_MB the least recently used entries are removed; / 目錄超過 SCRATCH_QUOTA_MB 時移除最久未使用的項目；
+entries in use by this process are never removed. Nothing is written beside the source files. / 本進程使用中的項目不會被移除。不會在來源檔案旁寫入任何東西。
+
+Usage / 用法:
+    entry = get_scratch().acquire(source, produce)   # produce(path) writes the intermediate / produce(path) 寫出中間檔
+    try:
+        ... use entry.path ...
+    finally:
+        entry.release()
+"""
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+
+from logger import logger
+
+MB = 1024 * 1024
+
+DEFAULT_DIR_NAME = "whisper_gui_scratch"
+DEFAULT_QUOTA_MB = 2048
+
+# Variant of the decoded audio expected by whisper.cpp / whisper.cpp 需要的解碼音訊變體
+VARIANT_WAV16K = "wav16k"
+
+# Entry file names; other files in the directory (partial writes, trimmed audio) are not managed / 項目檔名；目錄中的其他檔案（未完成的寫入、裁切音訊）不受管理
+_ENTRY_NAME = re.compile(r"^[0-9a-f]{40}\.wav$")
+_PARTIAL_PREFIX = ".partial-"
+
+# Partial files older than this were left by a crashed run / 超過此時間的未完成檔案為當機的執行所遺留
+STALE_PARTIAL_SECONDS = 3600
+
+
+def source_key(source, variant=VARIANT_WAV16K):
+    """
+    Key of a source file: changes when the file is replaced or modified / 來源檔案的鍵：檔案被取代或修改時改變
+
+    Args:
+        source: Source file path / 來源檔案路徑
+        variant: Kind of intermediate / 中間檔類型
+
+    Returns:
+        str: 40 hex characters / 40 個十六進位字元
+    """
+    stat = os.stat(source)
+    identity = f"{os.path.realpath(source)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{variant}"
+    return hashlib.sha1(identity.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class ScratchEntry:
+    """
+    Intermediate file held by a caller until release() / 呼叫者持有到 release() 為止的中間檔
+    """
+
+    def __init__(self, scratch, key, path, reused):
+        self.scratch = scratch
+        self.key = key
+        self.path = path
+        self.reused = reused  # Found in the scratch space, nothing was decoded / 在暫存空間中找到，沒有重新解碼
+        self._released = False
+
+    def release(self):
+        """
+        Allow the entry to be evicted again (idempotent) / 允許此項目再次被移除（可重複呼叫）
+        """
+        if not self._released:
+            self._released = True
+            self.scratch._unpin(self.key)
+
+
+class ScratchSpace:
+    """
+    Quota-limited, LRU-evicted store of decoded intermediates / 有配額限制、以 LRU 移除的解碼中間檔存放區
+    """
+
+    def __init__(self, directory=None, quota_bytes=None):
+        """
+        Args:
+            directory: Scratch directory, e.g. on a RAM disk (default: <tmp>/whisper_gui_scratch) / 暫存目錄，例如 RAM 磁碟上（預設為 <tmp>/whisper_gui_scratch）
+            quota_bytes: Size limit in bytes (None: DEFAULT_QUOTA_MB, 0: unlimited) / 大小上限（位元組，None：DEFAULT_QUOTA_MB，0：不限制）
+        """
+        self.directory = directory or os.path.join(tempfile.gettempdir(), DEFAULT_DIR_NAME)
+        self.quota_bytes = DEFAULT_QUOTA_MB * MB if quota_bytes is None else quota_bytes
+        self._lock = threading.Lock()
+        self._pins = {}       # key -> number of holders / key -> 持有者數量
+        self._key_locks = {}  # key -> lock serializing the decode of one source / key -> 序列化同一來源解碼的鎖
+
+    def ensure_directory(self):
+        """
+        Create the scratch directory if needed, for unmanaged temporary files too / 需要時建立暫存目錄，也供不受管理的暫存檔使用
+
+        Returns:
+            str: Scratch directory / 暫存目錄
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        return self.directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def acquire(self, source, produce, variant=VARIANT_WAV16K):
+        """
+        Get the intermediate of a source, producing it on a miss / 取得來源的中間檔，沒有時產生
+
+        Concurrent callers for the same source wait for one decode. / 同一來源的同時呼叫者會等待同一次解碼。
+
+        Args:
+            source: Source file path / 來源檔案路徑
+            produce: Callable writing the intermediate to the path it is given / 將中間檔寫入所給路徑的函數
+            variant: Kind of intermediate / 中間檔類型
+
+        Returns:
+            ScratchEntry: Pinned entry, release() it when done / 已固定的項目，使用完畢後呼叫 release()
+        """
+        key = source_key(source, variant)
+        path = self._path(key)
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                if os.path.exists(path):
+                    os.utime(path)  # Most recently used / 最近使用
+                    logger.info(f"重用暫存的解碼音訊: {os.path.basename(source)}")
+                    return ScratchEntry(self, key, path, reused=True)
+                self.ensure_directory()
+                partial = os.path.join(self.directory,
+                                       f"{_PARTIAL_PREFIX}{key}-{os.getpid()}-{threading.get_ident()}.wav")
+                try:
+                    produce(partial)
+                    os.replace(partial, path)  # Readers never see a half-written entry / 讀取者不會看到寫了一半的項目
+                finally:
+                    if os.path.exists(partial):
+                        os.remove(partial)
+            self.evict()
+            return ScratchEntry(self, key, path, reused=False)
+        except BaseException:
+            self._unpin(key)
+            raise
+
+    def _unpin(self, key):
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+            else:
+                self._pins.pop(key, None)
+                self._key_locks.pop(key, None)
+
+    def entries(self):
+        """
+        Managed entries, least recently used first / 受管理的項目，最久未使用者在前
+
+        Returns:
+            list: (mtime, size, key, path) / (修改時間, 大小, 鍵, 路徑)
+        """
+        found = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return found
+        now = time.time()
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # Removed by another process / 被其他進程移除
+            if _ENTRY_NAME.match(name):
+                found.append((stat.st_mtime, stat.st_size, name[:-4], path))
+            elif name.startswith(_PARTIAL_PREFIX) and now - stat.st_mtime > STALE_PARTIAL_SECONDS:
+                self._remove(path)
+        found.sort()
+        return found
+
+    def usage(self):
+        """
+        Bytes used by managed entries / 受管理項目使用的位元組數
+        """
+        return sum(size for _, size, _, _ in self.entries())
+
+    def evict(self):
+        """
+        Remove least recently used entries not in use until the quota is met / 移除最久未使用且未使用中的項目，直到符合配額
+
+        Returns:
+            int: Bytes freed / 釋放的位元組數
+        """
+        if not self.quota_bytes:
+            return 0
+        entries = self.entries()
+        used = sum(size for _, size, _, _ in entries)
+        freed = 0
+        for _, size, key, path in entries:
+            if used - freed <= self.quota_bytes:
+                break
+            with self._lock:
+                if key in self._pins:
+                    continue
+            if self._remove(path):
+                freed += size
+        if freed:
+            logger.info(f"暫存空間超過配額，已移除 {freed / MB:.0f} MB 最久未使用的解碼音訊"
+                        f"（使用 {(used - freed) / MB:.0f} / {self.quota_bytes / MB:.0f} MB）")
+        return freed
+
+    def clear(self):
+        """
+        Remove all entries not in use / 移除所有未使用中的項目
+        """
+        for _, _, key, path in self.entries():
+            with self._lock:
+                if key in self._pins:
+                    continue
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"移除暫存檔失敗: {e}")
+            return False
+
+
+_scratch = None
+_scratch_lock = threading.Lock()
+
+
+def get_scratch():
+    """
+    Get the process-wide scratch space (created on first use from config) / 取得整個進程共用的暫存空間（第一次使用時依 config 建立）
+
+    Returns:
+        ScratchSpace: Shared scratch space / 共用的暫存空間
+    """
+    global _scratch
+    if _scratch is None:
+        from config import config
+        with _scratch_lock:
+            if _scratch is None:
+                _scratch = ScratchSpace(config.SCRATCH_DIR or None, max(0, config.SCRATCH_QUOTA_MB) * MB)
+    return _scratch
@@ -0,0 +1,8 @@
+"""
+pytest configuration / pytest 設定
+Modules live in the repository root, like for benchmarks/ / 模組位於專案根目錄，與 benchmarks/ 相同
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,47 @@
+"""
+Tests for the in-process WAV resampler / 進程內 WAV 重新取樣器測試
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from audio_decode import TARGET_RATE, _Resampler  # noqa: E402
+
+SECONDS = 2
+TONE_HZ = 6000
+
+
+def tone(rate, seconds=SECONDS, frequency=TONE_HZ):
+    return (0.5 * np.sin(2 * np.pi * frequency * np.arange(int(rate * seconds)) / rate)).astype(np.float32)
+
+
+def resample(samples, rate, chunk):
+    resampler = _Resampler(rate, len(samples))
+    parts = [resampler.feed(samples[i:i + chunk]) for i in range(0, len(samples), chunk)]
+    parts.append(resampler.flush())
+    return np.concatenate(parts)
+
+
+@pytest.mark.parametrize("rate", [48000, 44100, 32000, 22050])
+def test_output_length(rate):
+    frames = rate * SECONDS + 123
+    output = resample(np.zeros(frames, dtype=np.float32), rate, 4096)
+    assert len(output) == int(round(frames / (rate / TARGET_RATE)))
+
+
+@pytest.mark.parametrize("rate", [48000, 44100])
+@pytest.mark.parametrize("chunk", [4096, 777, 1])
+def test_output_does_not_depend_on_chunk_size(rate, chunk):
+    samples = tone(rate, seconds=0.25)
+    expected = resample(samples, rate, len(samples))
+    np.testing.assert_allclose(resample(samples, rate, chunk), expected, atol=1e-6)
+
+
+@pytest.mark.parametrize("rate, max_rms", [(48000, 0.002), (32000, 0.002), (44100, 0.03)])
+def test_tone_error(rate, max_rms):
+    output = resample(tone(rate), rate, 4096)
+    reference = tone(TARGET_RATE)
+    # Skip the filter's ramp-up and ramp-down at the edges / 略過邊緣濾波器的起始與結束過渡
+    middle = slice(200, len(output) - 200)
+    rms = np.sqrt(np.mean((output[middle] - reference[middle]) ** 2))
+    assert rms <= max_rms
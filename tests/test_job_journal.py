@@ -0,0 +1,86 @@
+"""
+Tests for batch journal replay and retention / 批次日誌重播與保留測試
+"""
+import job_journal
+from job_journal import BatchJournal
+
+
+def make_journal(journal_dir, index, end_state=None, done=True):
+    # Named like create() so that file name order is creation order / 與 create() 相同的命名，檔名順序即建立順序
+    journal = BatchJournal(journal_dir / f"20260101_0000{index:02d}_cpu_{index:06x}.jsonl")
+    journal._append({"type": "batch", "action": "cpu", "files": ["a.wav", "b.wav"], "params": {}})
+    journal.mark_done("a.wav", "a.srt")
+    if done:
+        journal.mark_done("b.wav", "b.srt")
+    if end_state:
+        journal._append({"type": "end", "state": end_state})
+    return journal
+
+
+def test_load_replays_states(tmp_path):
+    journal = make_journal(tmp_path, 1, done=False)
+    journal.mark_running("b.wav", str(tmp_path / "b.srt"))
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"type": "file", "fi')  # Truncated by a crash / 因當機而截斷
+    loaded = BatchJournal.load(journal.path)
+    assert loaded.file_states == {"a.wav": job_journal.FILE_DONE, "b.wav": job_journal.FILE_RUNNING}
+    assert loaded.remaining_files() == ["b.wav"]
+    assert not loaded.is_complete
+
+
+def test_prune_keeps_newest_completed(tmp_path):
+    completed = [make_journal(tmp_path, i, job_journal.BATCH_COMPLETED) for i in range(5)]
+    assert job_journal.prune_journals(tmp_path, keep=2) == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == [j.path.name for j in completed[3:]]
+
+
+def test_prune_never_deletes_resumable_journals(tmp_path):
+    interrupted = make_journal(tmp_path, 0, done=False)
+    cancelled = make_journal(tmp_path, 1, job_journal.BATCH_CANCELLED, done=False)
+    for i in range(2, 5):
+        make_journal(tmp_path, i, job_journal.BATCH_COMPLETED)
+    job_journal.prune_journals(tmp_path, keep=1)
+    remaining = {journal.batch_id for journal in job_journal.list_journals(tmp_path)}
+    assert remaining == {interrupted.batch_id, cancelled.batch_id, "20260101_000004_cpu_000004"}
+
+
+def test_prune_keep_zero_keeps_all(tmp_path):
+    for i in range(3):
+        make_journal(tmp_path, i, job_journal.BATCH_COMPLETED)
+    assert job_journal.prune_journals(tmp_path, keep=0) == 0
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_finish_prunes_completed(tmp_path, monkeypatch):
+    from config import config
+    monkeypatch.setattr(config, "JOURNAL_KEEP", 2)
+    for i in range(3):
+        make_journal(tmp_path, i, job_journal.BATCH_COMPLETED)
+    make_journal(tmp_path, 3).finish(job_journal.BATCH_COMPLETED)
+    assert len(job_journal.list_journals(tmp_path)) == 2
+
+
+def test_live_journal_is_not_resumable(tmp_path):
+    running = BatchJournal.create("cpu", ["a.wav", "b.wav"], journal_dir=tmp_path)
+    assert job_journal.is_locked(running.path)
+    assert job_journal.list_journals(tmp_path, incomplete_only=True) == []
+    assert BatchJournal.claim(running.path) is None
+    running.finish(job_journal.BATCH_CANCELLED)
+    assert not job_journal.is_locked(running.path)
+    assert [j.batch_id for j in job_journal.list_journals(tmp_path, incomplete_only=True)] == [running.batch_id]
+
+
+def test_claim_loads_current_state(tmp_path):
+    running = BatchJournal.create("cpu", ["a.wav", "b.wav"], journal_dir=tmp_path)
+    running.mark_running("a.wav", str(tmp_path / "a.srt"))
+    stale = BatchJournal.load(running.path)  # Listed while a.wav was in flight / a.wav 處理中時列出
+    running.mark_done("a.wav", str(tmp_path / "a.srt"))
+    running.mark_done("b.wav", str(tmp_path / "b.srt"))
+    running.finish(job_journal.BATCH_COMPLETED)
+    assert stale.file_states["a.wav"] == job_journal.FILE_RUNNING
+    claimed = BatchJournal.claim(stale.path)
+    assert claimed.is_complete
+    assert job_journal.is_locked(claimed.path)
+    claimed.release()
+    claimed.release()
+    assert not job_journal.is_locked(claimed.path)
@@ -0,0 +1,63 @@
+"""
+Tests for log file rotation shared between processes / 多進程共用日誌檔案的輪替測試
+"""
+import gzip
+import logging
+import time
+
+from logger import DailyRotatingFileHandler
+
+
+def handler(log_dir, **kwargs):
+    h = DailyRotatingFileHandler(log_dir, **kwargs)
+    h.setFormatter(logging.Formatter('%(message)s'))
+    return h
+
+
+def emit(h, message, created=None):
+    record = logging.LogRecord('test', logging.INFO, '', 0, message, None, None)
+    if created is not None:
+        record.created = created
+    h.emit(record)
+
+
+def read_all(log_dir):
+    lines = []
+    for path in log_dir.glob("*.log*"):
+        text = gzip.open(path, 'rt').read() if path.suffix == '.gz' else path.read_text()
+        lines += text.splitlines()
+    return lines
+
+
+def test_writers_follow_rotation_by_another_writer(tmp_path):
+    # Two handlers on one directory behave like the GUI and the CLI / 同一目錄的兩個處理器等同 GUI 與 CLI
+    a, b = handler(tmp_path, max_bytes=2000, backup_count=0), handler(tmp_path, max_bytes=2000, backup_count=0)
+    expected = []
+    for i in range(300):
+        for name, h in (("A", a), ("B", b)):
+            expected.append(f"{name}{i:04d} " + "x" * 20)
+            emit(h, expected[-1])
+    a.close()
+    b.close()
+    assert sorted(read_all(tmp_path)) == sorted(expected)
+    assert len(list(tmp_path.glob("*.log.gz"))) > 1
+
+
+def test_file_held_by_another_writer_is_not_archived(tmp_path):
+    yesterday = time.time() - 86400
+    day = time.strftime('%Y%m%d', time.localtime(yesterday))
+    old = handler(tmp_path)
+    old._day = day
+    old.baseFilename = str(tmp_path / f"whisper_gui_{day}.log")
+    emit(old, "old 1", created=yesterday)
+    new = handler(tmp_path)
+    emit(new, "new 1")
+    assert (tmp_path / f"whisper_gui_{day}.log").exists()
+    emit(old, "old 2", created=yesterday)
+    emit(old, "old 3")  # Day changes: the finished file is archived / 日期改變：已完成的檔案會被壓縮
+    assert not (tmp_path / f"whisper_gui_{day}.log").exists()
+    with gzip.open(tmp_path / f"whisper_gui_{day}.log.gz", 'rt') as f:
+        assert f.read().splitlines() == ["old 1", "old 2"]
+    old.close()
+    new.close()
+    assert sorted(read_all(tmp_path)) == ["new 1", "old 1", "old 2", "old 3"]
@@ -0,0 +1,61 @@
+"""
+Tests for live progress of engine and translation stages / 引擎與翻譯階段即時進度測試
+"""
+import metrics
+from event_bus import bus, KEY_AUDIO_SECONDS, KEY_TRANSLATE_REQUESTS
+from output_capture import OutputCapture, segment_end
+
+
+def audio_seconds_done():
+    return bus.snapshot()[2].get(KEY_AUDIO_SECONDS, 0.0)
+
+
+def test_segment_end():
+    assert segment_end("[00:00:01.000 --> 00:01:02.500]  text") == 62.5
+    assert segment_end("[00:03.000 --> 00:05.120] text") == 5.12
+    assert segment_end("whisper_init_from_file: loading model") is None
+
+
+def test_audio_published_while_engine_runs():
+    recorder = metrics.MetricsRecorder(enabled=False)
+    before = audio_seconds_done()
+    with recorder.stage(metrics.STAGE_ENGINE, audio_seconds=100.0, engine="test"):
+        capture = OutputCapture("Test", on_position=metrics.audio_position_reporter())
+        capture("stdout", "[00:10.000 --> 00:30.000] text")
+        assert audio_seconds_done() - before == 30.0
+        metrics.report_audio_position(50.0)
+        metrics.report_audio_position(40.0)  # Never moves back / 不會倒退
+        metrics.report_audio_position(500.0)  # Clamped to the stage's audio / 不超過階段的音訊長度
+        assert audio_seconds_done() - before == 100.0
+    # Nothing is counted twice when the stage ends / 階段結束時不會重複計算
+    assert audio_seconds_done() - before == 100.0
+
+
+def test_remainder_published_when_engine_ends():
+    recorder = metrics.MetricsRecorder(enabled=False)
+    before = audio_seconds_done()
+    with recorder.stage(metrics.STAGE_ENGINE, audio_seconds=60.0, engine="test"):
+        metrics.report_audio_position(20.0)
+    assert audio_seconds_done() - before == 60.0
+
+
+def test_no_position_outside_engine_stage():
+    recorder = metrics.MetricsRecorder(enabled=False)
+    before = audio_seconds_done()
+    assert metrics.audio_position_reporter() is None
+    with recorder.stage(metrics.STAGE_DECODE, audio_seconds=60.0):
+        metrics.report_audio_position(20.0)
+    assert audio_seconds_done() == before
+
+
+def test_translate_requests_counted_per_call():
+    recorder = metrics.MetricsRecorder(enabled=False)
+    before = bus.snapshot()[2].get(KEY_TRANSLATE_REQUESTS, 0)
+    with recorder.stage(metrics.STAGE_TRANSLATE, engine="openai") as record:
+        for _ in range(3):  # e.g. one chunk sent twice after a failure, then another / 例如一個區塊失敗後重送，再加另一個區塊
+            metrics.report_translate_request()
+    assert record.extra['requests'] == 3
+    assert bus.snapshot()[2].get(KEY_TRANSLATE_REQUESTS, 0) - before == 3
+    # Outside a translation stage only the live counter moves / 不在翻譯階段中時只更新即時計數器
+    metrics.report_translate_request()
+    assert bus.snapshot()[2].get(KEY_TRANSLATE_REQUESTS, 0) - before == 4
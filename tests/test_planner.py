@@ -0,0 +1,70 @@
+"""
+Tests for real-time factor history, engine timeouts and batch ETA / 即時率歷史、引擎超時與批次完成時間測試
+"""
+import pytest
+
+import planner
+from config import config
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ENGINE_TIMEOUT_MIN", 600)
+    monkeypatch.setattr(config, "ENGINE_TIMEOUT_FACTOR", 4.0)
+    return planner.RTFHistory(str(tmp_path / planner.HISTORY_FILE), machine="test")
+
+
+def test_timeout_unknown_length(history):
+    assert history.engine_timeout("cpu", "base", "ja", 0) == planner.DEFAULT_ENGINE_TIMEOUT
+    assert history.engine_timeout("cpu", "base", "ja", None) == planner.DEFAULT_ENGINE_TIMEOUT
+
+
+def test_timeout_minimum_for_short_files(history):
+    assert history.engine_timeout("coreml", "base", "ja", 30) == 600
+
+
+def test_timeout_scales_with_length_and_prior(history):
+    # cpu prior RTF 1.0: 2 hours of audio x factor 4 / cpu 預設即時率 1.0：2 小時音訊 x 倍數 4
+    assert history.engine_timeout("cpu", "base", "ja", 7200) == pytest.approx(7200 * 4)
+    assert history.engine_timeout("coreml", "base", "ja", 7200) == pytest.approx(7200 * planner.DEFAULT_RTF["coreml"] * 4)
+
+
+def test_timeout_follows_history(history, tmp_path):
+    history.update("cpu", "base", "ja", 0.5)
+    assert history.engine_timeout("cpu", "base", "ja", 3600) == pytest.approx(3600 * 0.5 * 4)
+    # Other languages fall back to the same engine and model, the history is persisted / 其他語言退回相同引擎與模型，歷史會保存
+    reloaded = planner.RTFHistory(history.path, machine="test")
+    assert reloaded.engine_timeout("cpu", "base", "en", 3600) == pytest.approx(3600 * 0.5 * 4)
+
+
+def test_update_ignores_invalid_samples(history):
+    history.update("cpu", "base", "ja", 0)
+    history.update("cpu", "base", "ja", None)
+    assert history.lookup("cpu", "base", "ja") == (None, 0)
+
+
+def test_plan_batch_timeouts_and_eta(history):
+    plan = history.plan_batch("cpu", "base", "ja", {"short.wav": 60, "long.wav": 3600, "unknown.wav": 0})
+    assert [e.timeout for e in plan.estimates] == [600, pytest.approx(3600 * 4), planner.DEFAULT_ENGINE_TIMEOUT]
+    assert plan.total_predicted == pytest.approx(3660)
+    plan.complete("short.wav", 120)
+    assert plan.correction() == pytest.approx(2.0)
+    assert plan.remaining_seconds() == pytest.approx(7200)
+    assert plan.eta(now=1000) == pytest.approx(8200)
+
+
+def test_plan_correction_is_clamped(history):
+    plan = history.plan_batch("cpu", "base", "ja", {"a.wav": 10, "b.wav": 10})
+    plan.complete("a.wav", 1000)
+    assert plan.correction() == planner.CORRECTION_RANGE[1]
+
+
+def test_plan_translation_skips_unreadable_files(history, tmp_path):
+    good = tmp_path / "good.srt"
+    good.write_text("1\n00:00:00,000 --> 00:00:01,000\nこんにちは\n\n", encoding="utf-8")
+    bad = tmp_path / "bad.srt"
+    bad.write_bytes(b"\xff\xfe not utf-8")
+    plan = history.plan_translation([str(good), str(bad), str(tmp_path / "missing.srt")], "English")
+    assert [entry["file"] for entry in plan.files] == [str(good)]
+    assert plan.unreadable == [str(bad), str(tmp_path / "missing.srt")]
+    assert plan.requests == 1
@@ -0,0 +1,55 @@
+"""
+Tests for batch scheduling policies and their simulation / 批次排程策略與模擬測試
+"""
+import pytest
+
+import scheduler
+
+DURATIONS = {"long.wav": 3600, "a.wav": 60, "b.wav": 120, "unknown.wav": 0}
+FILES = list(DURATIONS)
+
+
+def test_order_files_by_duration():
+    assert scheduler.order_files(FILES, scheduler.POLICY_FIFO, DURATIONS) == FILES
+    assert scheduler.order_files(FILES, scheduler.POLICY_SHORTEST, DURATIONS) == ["a.wav", "b.wav", "long.wav", "unknown.wav"]
+    assert scheduler.order_files(FILES, scheduler.POLICY_LONGEST, DURATIONS) == ["long.wav", "b.wav", "a.wav", "unknown.wav"]
+
+
+def test_order_files_by_priority_keeps_fifo_among_equals():
+    rules = scheduler.parse_priorities("b.*=5, unknown.wav=10")
+    assert scheduler.order_files(FILES, scheduler.POLICY_PRIORITY, priorities=rules) == ["unknown.wav", "b.wav", "long.wav", "a.wav"]
+
+
+def test_order_files_unknown_policy():
+    with pytest.raises(ValueError):
+        scheduler.order_files(FILES, "random")
+
+
+def test_parse_priorities_malformed():
+    with pytest.raises(ValueError):
+        scheduler.parse_priorities("urgent_*")
+
+
+def test_simulate_one_worker():
+    summary = scheduler.simulate(["a", "b", "c"], {"a": 10, "b": 20, "c": 30})
+    assert summary == {"first_result_s": 10, "mean_latency_s": (10 + 30 + 60) / 3, "makespan_s": 60}
+
+
+def test_simulate_workers_take_next_free_slot():
+    # a and b start together, c waits for a / a 與 b 同時開始，c 等待 a 完成
+    summary = scheduler.simulate(["a", "b", "c"], {"a": 10, "b": 40, "c": 5}, workers=2)
+    assert summary == {"first_result_s": 10, "mean_latency_s": (10 + 40 + 15) / 3, "makespan_s": 40}
+
+
+def test_simulate_empty_and_unknown_files():
+    assert scheduler.simulate([], {})["makespan_s"] is None
+    assert scheduler.simulate(["x"], {}, workers=0)["makespan_s"] == 0.0
+
+
+def test_shortest_first_lowers_latency():
+    predicted = {file: seconds * 0.5 for file, seconds in DURATIONS.items()}
+    results = scheduler.compare_policies(FILES, DURATIONS, predicted)
+    assert set(results) == set(scheduler.POLICIES)
+    assert results["shortest"]["first_result_s"] < results["fifo"]["first_result_s"]
+    assert results["shortest"]["mean_latency_s"] < results["fifo"]["mean_latency_s"]
+    assert results["shortest"]["makespan_s"] == results["fifo"]["makespan_s"]
@@ -0,0 +1,68 @@
+"""
+Tests for silence trimming timestamp remapping / 靜音裁切時間戳對應測試
+"""
+import pytest
+
+from vad import TimeMap, speech_spans
+
+
+class Segment:
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+
+@pytest.fixture
+def time_map():
+    # Trimmed 0-2 s is original 1-3 s, trimmed 2-3 s is original 5-6 s / 裁切後 0-2 秒為原始 1-3 秒，2-3 秒為原始 5-6 秒
+    return TimeMap([(1.0, 3.0), (5.0, 6.0)])
+
+
+def test_to_original_inside_spans(time_map):
+    assert time_map.speech_seconds == 3.0
+    assert time_map.to_original(0.0) == 1.0
+    assert time_map.to_original(1.5) == 2.5
+    assert time_map.to_original(2.5) == 5.5
+
+
+def test_to_original_span_boundary(time_map):
+    # A start on the boundary belongs to the later span, an end to the earlier one / 邊界上的開始屬於後一個區段，結束屬於前一個區段
+    assert time_map.to_original(2.0) == 5.0
+    assert time_map.to_original(2.0, end=True) == 3.0
+    assert time_map.to_original(0.0, end=True) == 1.0
+
+
+def test_to_original_clamped_to_last_span(time_map):
+    assert time_map.to_original(10.0) == 6.0
+    assert time_map.to_original(10.0, end=True) == 6.0
+
+
+def test_to_original_without_spans():
+    assert TimeMap([]).to_original(4.2) == 4.2
+
+
+def test_remap_segments(time_map):
+    segments = time_map.remap_segments([Segment(0.5, 2.0), Segment(2.0, 2.5), Segment(1.8, 2.4)])
+    assert [(s.start, s.end) for s in segments] == [(1.5, 3.0), (5.0, 5.5), (2.8, 5.4)]
+
+
+def test_remap_segments_end_never_before_start(time_map):
+    segment, = time_map.remap_segments([Segment(2.0, 2.0)])
+    assert segment.end >= segment.start
+
+
+def test_speech_spans_padding():
+    spans = speech_spans([(0.0, 1.0), (3.0, 5.0)], 6.0, 0.2)
+    assert spans == [(pytest.approx(0.8), pytest.approx(3.2)), (pytest.approx(4.8), 6.0)]
+
+
+def test_speech_spans_merge_when_padding_overlaps():
+    assert speech_spans([(2.0, 2.3)], 5.0, 0.2) == [(0.0, 5.0)]
+
+
+def test_speech_spans_without_silence():
+    assert speech_spans([], 5.0, 0.2) == [(0.0, 5.0)]
+
+
+def test_speech_spans_all_silence():
+    assert speech_spans([(0.0, 5.0)], 5.0, 0.2) == []
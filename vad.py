@@ -0,0 +1,203 @@
+"""
+Silence trimming module / 靜音裁切模組
+Energy-based non-speech detection before transcription, with timestamp remapping / 轉錄前以能量偵測非語音區段，並將時間戳對應回原始時間
+
+ffmpeg's silencedetect filter finds regions below VAD_NOISE_DB that last at least / 使用 ffmpeg 的 silencedetect 濾鏡找出低於 VAD_NOISE_DB
+VAD_MIN_SILENCE_SECONDS. The speech spans in between (padded by VAD_PADDING_SECONDS) are / 且持續至少 VAD_MIN_SILENCE_SECONDS 的區段。其間的語音區段
+concatenated into a shorter 16 kHz wav that is sent to the engine; the resulting segments are / （前後各保留 VAD_PADDING_SECONDS）串接成較短的 16 kHz wav 交給引擎；
+mapped back to the original timeline with TimeMap. / 產生的段落再以 TimeMap 對應回原始時間軸。
+
+Usage / 用法:
+    trimmed = vad.trim_silence(audio_path, tmp_dir, duration, pause_flag)
+    if trimmed:
+        ... transcribe trimmed.path ...
+        segments = trimmed.time_map.remap_segments(segments)
+"""
+import bisect
+import os
+import re
+import subprocess
+import tempfile
+
+from cancellation import raise_if_cancelled, watch_process
+from config import config
+from logger import logger
+
+# Trimming below this share of the audio is not worth a second pass / 可裁切比例低於此值時不值得再處理一次
+MIN_SKIP_RATIO = 0.05
+
+_SILENCE_START = re.compile(r"silence_start: (-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end: (-?[\d.]+)")
+
+
+class TimeMap:
+    """
+    Maps times in the trimmed audio back to the original audio / 將裁切後音訊中的時間對應回原始音訊
+    """
+
+    def __init__(self, spans):
+        """
+        Args:
+            spans: Kept (start, end) spans of the original audio, sorted, non-overlapping / 保留的原始音訊 (start, end) 區段，已排序且不重疊
+        """
+        self.spans = list(spans)
+        self._trimmed_starts = []
+        position = 0.0
+        for start, end in self.spans:
+            self._trimmed_starts.append(position)
+            position += end - start
+        self.speech_seconds = position
+
+    def to_original(self, seconds, end=False):
+        """
+        Original time of a trimmed time / 裁切後時間對應的原始時間
+
+        Args:
+            seconds: Time in the trimmed audio / 裁切後音訊中的時間
+            end: Map a boundary to the end of the earlier span (for segment ends) / 邊界對應到前一個區段的結尾（用於段落結束時間）
+        """
+        if not self.spans:
+            return seconds
+        search = bisect.bisect_left if end else bisect.bisect_right
+        index = max(0, search(self._trimmed_starts, seconds) - 1)
+        start, stop = self.spans[index]
+        return min(start + seconds - self._trimmed_starts[index], stop)
+
+    def remap_segments(self, segments):
+        """
+        Move segments from the trimmed timeline to the original one (in place) / 將段落從裁切後的時間軸移回原始時間軸（就地修改）
+
+        Returns:
+            list: The same segments / 相同的段落
+        """
+        for segment in segments:
+            segment.start = self.to_original(segment.start)
+            segment.end = max(segment.start, self.to_original(segment.end, end=True))
+        return segments
+
+
+class TrimmedAudio:
+    """
+    Speech-only audio written by trim_silence() / trim_silence() 寫出的純語音音訊
+    """
+
+    def __init__(self, path, time_map, original_seconds):
+        self.path = path
+        self.time_map = time_map
+        self.original_seconds = original_seconds
+
+    @property
+    def skipped_seconds(self):
+        return max(0.0, self.original_seconds - self.time_map.speech_seconds)
+
+    def remap_srt(self, srt_path):
+        """
+        Rewrite an SRT produced from the trimmed audio with original timestamps / 以原始時間戳改寫由裁切音訊產生的 SRT
+        """
+        import engines
+
+        engines.write_srt(self.time_map.remap_segments(engines.read_srt(srt_path)), srt_path)
+
+    def cleanup(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _run_ffmpeg(cmd, pause_flag):
+    """
+    Run ffmpeg (killed on cancellation) and return its stderr / 執行 ffmpeg（取消時終止）並返回 stderr
+    """
+    logger.debug(f"執行 ffmpeg 指令: {' '.join(cmd)}")
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                               start_new_session=True)
+    with watch_process(pause_flag, process):
+        _, stderr = process.communicate()
+    raise_if_cancelled(pause_flag)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
+    return stderr
+
+
+def detect_silence(audio_path, duration, pause_flag=None):
+    """
+    Non-speech regions of an audio file / 音訊檔案中的非語音區段
+
+    Returns:
+        list: (start, end) silences in seconds / 以秒表示的 (start, end) 靜音區段
+    """
+    stderr = _run_ffmpeg([
+        'ffmpeg', '-hide_banner', '-nostats', '-i', audio_path, '-vn',
+        '-af', f"silencedetect=noise={config.VAD_NOISE_DB}dB:d={config.VAD_MIN_SILENCE_SECONDS}",
+        '-f', 'null', '-',
+    ], pause_flag)
+    silences, start = [], None
+    for line in stderr.splitlines():
+        match = _SILENCE_START.search(line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = _SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    if start is not None:
+        silences.append((start, duration))  # Silent until the end / 靜音直到結尾
+    return silences
+
+
+def speech_spans(silences, duration, padding):
+    """
+    Spans between silences, padded on both sides and merged where they touch / 靜音之間的區段，前後加上保留時間，相接處合併
+    """
+    spans, position = [], 0.0
+    for start, end in silences + [(duration, duration)]:
+        if start > position:
+            span_start, span_end = max(0.0, position - padding), min(duration, start + padding)
+            if spans and span_start <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], span_end)
+            else:
+                spans.append((span_start, span_end))
+        position = max(position, end)
+    return spans
+
+
+def trim_silence(audio_path, output_dir, duration, pause_flag=None):
+    """
+    Write the speech spans of audio_path into a shorter wav / 將 audio_path 的語音區段寫成較短的 wav
+
+    Args:
+        audio_path: Audio or video file / 音訊或影片檔案
+        output_dir: Directory for the trimmed wav / 裁切後 wav 的目錄
+        duration: Audio length in seconds / 音訊長度（秒）
+        pause_flag: Cancellation token (optional) / 取消權杖（可選）
+
+    Returns:
+        TrimmedAudio: Trimmed audio, or None when less than MIN_SKIP_RATIO would be skipped / 裁切後的音訊；可略過的部分少於 MIN_SKIP_RATIO 時為 None
+    """
+    if not duration:
+        return None
+    spans = speech_spans(detect_silence(audio_path, duration, pause_flag), duration, config.VAD_PADDING_SECONDS)
+    time_map = TimeMap(spans)
+    skipped = duration - time_map.speech_seconds
+    if skipped < duration * MIN_SKIP_RATIO or not spans:
+        logger.info(f"非語音比例過低，不裁切: {os.path.basename(audio_path)}（{skipped:.1f} 秒）")
+        return None
+
+    base = os.path.splitext(os.path.basename(audio_path))[0]
+    fd, output = tempfile.mkstemp(prefix=f"{base}_speech_", suffix=".wav", dir=output_dir)
+    os.close(fd)
+    selection = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in spans)
+    try:
+        _run_ffmpeg([
+            'ffmpeg', '-y', '-hide_banner', '-nostats', '-i', audio_path, '-vn',
+            '-af', f"aselect='{selection}',asetpts=N/SR/TB",
+            '-ac', '1', '-ar', '16000', '-acodec', 'pcm_s16le', output,
+        ], pause_flag)
+    except BaseException:
+        os.remove(output)
+        raise
+    logger.info(f"略過 {skipped:.1f} 秒非語音（{skipped / duration:.0%}），"
+                f"送出 {time_map.speech_seconds:.1f} 秒語音: {os.path.basename(audio_path)}")
+    return TrimmedAudio(output, time_map, duration)